@@ -1,11 +1,24 @@
+import io
 import os
-import json
-from flask import Flask, request, jsonify, render_template
+import time
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 import google.generativeai as genai
-from gtts import gTTS
 from dotenv import load_dotenv
-from eligibility_checker import check_admission_eligibility_from_text
-from langdetect import detect
+import eligibility_checker
+from eligibility_checker import check_admission_eligibility_from_text, reload_rules
+from kb_matcher import KBMatcher
+from audio_cache import AudioCache
+from audio_store import AudioStore
+from kb_retriever import KBRetriever
+from llm_cache import LLMCache, normalize_question
+from chatbot_core import Chatbot, preprocess_text
+from intent_engine import IntentEngine, Resolution
+from tts_jobs import TTSJobQueue, JOB_ID_PATTERN
+from kb_reload import KBReloader, changed_tags, kb_version
+from lang_id import LanguageIdentifier
+from response_bundle import load_bundle
+from chat_stream import stream_chat_events, model_token_stream
+from metrics import Metrics, SamplingProfiler
 
 # Load environment variables
 load_dotenv()
@@ -25,19 +38,103 @@ if API_KEY:
 else:
     print("🔴 GOOGLE_API_KEY not found in .env file.")
 
-# --- Knowledge Base ---
-try:
-    with open('knowledge_base.json', 'r', encoding='utf-8') as f:
-        knowledge_base = json.load(f)
-    knowledge_base_string = json.dumps(knowledge_base['intents'], indent=2, ensure_ascii=False)
-    print("✅ Knowledge Base loaded successfully.")
-except FileNotFoundError:
-    print("🔴 knowledge_base.json not found.")
-    knowledge_base = {"intents": []}
-    knowledge_base_string = "[]"
+# Cache of AI fallback answers, keyed on the normalized question + KB version
+llm_cache = LLMCache(
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+    ttl_seconds=int(float(os.getenv("LLM_CACHE_TTL_HOURS", "24")) * 3600),
+    db_path=os.getenv("LLM_CACHE_DB") or None,
+    normalizer=lambda question: normalize_question(question, preprocess_text),
+)
 
-# Ensure audio folder exists
-os.makedirs('static/audio', exist_ok=True)
+# Script fast path for Tamil/Malayalam, seeded + cached detector otherwise
+lang_id = LanguageIdentifier(cache_size=int(os.getenv("LANG_ID_CACHE_SIZE", "4096")))
+
+# Per-stage latency histograms and cache counters, scraped at /metrics.
+# METRICS_PROFILE=1 also samples stacks and dumps those of slow requests.
+METRICS_SLOW_SECONDS = float(os.getenv("METRICS_SLOW_MS", "1000")) / 1000
+profiler = None
+if os.getenv("METRICS_PROFILE", "0") == "1":
+    profiler = SamplingProfiler(os.getenv("METRICS_PROFILE_DIR", "profiles"), threshold=METRICS_SLOW_SECONDS)
+metrics = Metrics(slow_seconds=METRICS_SLOW_SECONDS, profiler=profiler)
+metrics.expose_cache('llm', llm_cache.stats)
+metrics.expose_cache('lang_id', lambda: lang_id.stats()['detector_cache'])
+
+# Resolution tier -> the coarser path label used in request metrics
+RESOLUTION_PATHS = {'eligibility': 'eligibility', 'exact': 'kb', 'classifier': 'kb', 'llm': 'llm'}
+
+# Prebuilt per-language KB answers + audio (python response_bundle.py).
+# When set, a KB hit is a pure lookup: no translation or synthesis.
+RESPONSE_BUNDLE = os.getenv("RESPONSE_BUNDLE")
+response_bundle = load_bundle(RESPONSE_BUNDLE) if RESPONSE_BUNDLE else None
+
+# Content-addressed TTS cache (also ensures the audio folder exists)
+AUDIO_DIR = os.path.join('static', 'audio')
+audio_store = AudioStore(
+    AUDIO_DIR,
+    max_bytes=int(float(os.getenv("AUDIO_STORE_MAX_MB", "200")) * 1024 * 1024),
+    ttl_seconds=int(float(os.getenv("AUDIO_STORE_TTL_HOURS", "72")) * 3600),
+)
+audio_cache = AudioCache(AUDIO_DIR, store=audio_store)
+metrics.expose_cache('tts_audio', audio_cache.stats)
+
+audio_store.start()
+
+# Background synthesis for async-audio replies
+ASYNC_TTS = os.getenv("ASYNC_TTS", "0") == "1"
+tts_jobs = TTSJobQueue(audio_cache, max_workers=int(os.getenv("TTS_WORKERS", "4")))
+
+# --- Knowledge Base (hot-reloadable snapshots) ---
+KB_PATH = 'knowledge_base.json'
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+
+
+def build_kb_components(knowledge_base):
+    """Builds everything derived from one KB version, off the request path."""
+    intents = knowledge_base['intents']
+    version = kb_version(knowledge_base)
+
+    # Compiled once so each /chat request is a single pass over the message
+    matcher = KBMatcher(intents)
+    # BM25 index: the AI fallback only sends the top-k relevant intents
+    retriever = KBRetriever(intents)
+    # Tiered resolver: substring index -> local classifier -> AI fallback
+    chatbot = Chatbot(KB_PATH, confidence_threshold=float(os.getenv("CLASSIFIER_THRESHOLD", "0.70")),
+                      classifier=os.getenv("CHATBOT_CLASSIFIER", "svc"), intents=intents)
+    engine = IntentEngine(
+        intents,
+        classifier=chatbot,
+        matcher=matcher,
+        llm=lambda question: answer_with_ai(question, retriever, version),
+    )
+    return {'matcher': matcher, 'retriever': retriever, 'engine': engine}
+
+
+def kb_audio_filenames(intents):
+    return {audio_cache.filename_for(intent['responses'][0], lang=tts_lang)
+            for intent in intents for tts_lang in ('en', 'ml')}
+
+
+def on_kb_swap(old, new):
+    """Keeps caches warm across a reload, invalidating only changed intents."""
+    changed = changed_tags(old.intent_hashes, new.intent_hashes)
+    kept, dropped = llm_cache.migrate(old.kb_version, new.kb_version, changed)
+    print(f"🔄 Changed intents: {sorted(changed)}; AI answer cache kept {kept}, dropped {dropped}.")
+
+    old_audio, new_audio = kb_audio_filenames(old.intents), kb_audio_filenames(new.intents)
+    for filename in old_audio - new_audio:
+        audio_store.unpin(filename)
+    for filename in new_audio - old_audio:
+        audio_store.pin(filename)
+
+
+kb_reloader = KBReloader(KB_PATH, build_kb_components, on_swap=on_kb_swap,
+                         poll_interval=float(os.getenv("KB_RELOAD_INTERVAL", "2")))
+# KB answers are served over and over: keep their audio pinned.
+for filename in kb_audio_filenames(kb_reloader.load_initial().intents):
+    audio_store.pin(filename)
+kb_reloader.watch(eligibility_checker.RULES_PATH, reload_rules)
+if os.getenv("KB_HOT_RELOAD", "1") == "1":
+    kb_reloader.start()
 
 
 @app.route('/')
@@ -47,6 +144,11 @@ def index():
 
 @app.route('/chat', methods=['POST'])
 def chat():
+    with metrics.request('chat'):
+        return _chat()
+
+
+def _chat():
     response_data = {
         'response': "Sorry, I couldn't process your request.",
         'audio_url': None,
@@ -56,63 +158,339 @@ def chat():
 
     try:
         user_message = request.json.get('message', '').strip()
-        detected_lang = detect(user_message)
+        async_audio = bool(request.json.get('async_audio', ASYNC_TTS))
+        with metrics.span('lang_id'):
+            detected_lang = lang_id.identify(user_message)
         print(f"📝 Detected language: {detected_lang}")
 
-        # --- 1. Eligibility check ---
-        if "%" in user_message:
-            eligibility_result = check_admission_eligibility_from_text(user_message)
-            if "Please mention both" not in eligibility_result:
-                return create_tts_response(eligibility_result, lang_code=detected_lang)
-
-        # --- 2. Direct KB match ---
-        matched_intent = None
-        for intent in knowledge_base['intents']:
-            if any(pattern.lower() in user_message.lower() for pattern in intent['patterns']):
-                matched_intent = intent
-                break
-
-        if matched_intent:
-            response_text = matched_intent['responses'][0]
-            response_data['image_url'] = matched_intent.get('image_url')
-        else:
-            # --- 3. AI Fallback ---
-            if not model:
-                return jsonify({"response": "AI Model is not configured.", "audio_url": None}), 500
-
-            system_prompt = (
-                "You are 'Erode Sengunthar College Bot', a helpful AI assistant for Erode Sengunthar Engineering College. "
-                "Strictly use the provided JSON knowledge base for answers.\n\n"
-                f"KNOWLEDGE BASE:\n{knowledge_base_string}\n\n"
-            )
+        # --- Eligibility check, then KB index -> classifier -> AI fallback ---
+        snapshot = kb_reloader.current
+        with metrics.span('resolve'):
+            resolution = resolve(user_message, snapshot, use_llm=model is not None)
+        if resolution.tier is None:
+            return jsonify({"response": "AI Model is not configured.", "audio_url": None}), 500
+        print(f"🧭 Resolved by: {resolution.tier}")
+        metrics.label(path=RESOLUTION_PATHS.get(resolution.tier, resolution.tier))
 
-            full_prompt = f"{system_prompt}USER QUESTION: {user_message}"
-            ai_response = model.generate_content(full_prompt)
-            response_text = ai_response.text
+        with metrics.span('bundle_lookup'):
+            bundled = bundle_entry(resolution, snapshot, detected_lang)
+        if response_bundle is not None:
+            metrics.inc('cache_hits_total' if bundled is not None else 'cache_misses_total', cache='response_bundle')
+        if bundled is not None:
+            return jsonify({
+                'response': bundled.text,
+                'audio_url': bundled.audio_url,
+                'image_url': resolution.image_url
+            })
 
-        return create_tts_response(response_text, image_url=response_data.get('image_url'), lang_code=detected_lang)
+        response_data['image_url'] = resolution.image_url
+        return create_tts_response(resolution.response, image_url=response_data.get('image_url'),
+                                   lang_code=detected_lang, async_audio=async_audio)
 
     except Exception as e:
         print(f"🔴 Error in /chat: {e}")
         return jsonify({"response": "Internal error", "audio_url": None}), 500
 
 
-def create_tts_response(text, image_url=None, lang_code='en'):
-    """Generates TTS audio and returns structured JSON."""
-    # Force Malayalam if detected
-    if lang_code == "ml":
-        print("🔊 Generating Malayalam audio...")
-        tts = gTTS(text=text, lang='ml', tld='co.in')
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Server-sent events variant of /chat. AI fallback tokens are sent as the
+    model produces them, and each completed sentence gets its own async
+    TTS job ('audio' events). Direct answers arrive as a single token;
+    bundled KB answers also carry their prebuilt audio_url in 'done'.
+    """
+    # Timed until the last event is sent, not just until this returns
+    timing = metrics.request('chat_stream')
+    with timing:
+        return _chat_stream(timing)
+
+
+def _chat_stream(timing):
+    started_at = time.perf_counter()
+    try:
+        user_message = request.json.get('message', '').strip()
+        with metrics.span('lang_id'):
+            detected_lang = lang_id.identify(user_message)
+    except Exception as e:
+        print(f"🔴 Error in /chat/stream: {e}")
+        return jsonify({"response": "Internal error", "audio_url": None}), 500
+
+    tts_lang = 'ml' if detected_lang == "ml" else 'en'
+    submit_audio = lambda sentence: tts_jobs.submit(sentence, lang=tts_lang, tld='co.in')
+    extra = {'image_url': None}
+
+    snapshot = kb_reloader.current
+    with metrics.span('resolve'):
+        resolution = resolve(user_message, snapshot, use_llm=False)
+    if resolution.tier is not None:
+        metrics.label(path=RESOLUTION_PATHS.get(resolution.tier, resolution.tier))
+    elif model:
+        metrics.label(path='llm')
+
+    with metrics.span('bundle_lookup'):
+        bundled = bundle_entry(resolution, snapshot, detected_lang)
+    if response_bundle is not None and resolution.tier is not None:
+        metrics.inc('cache_hits_total' if bundled is not None else 'cache_misses_total', cache='response_bundle')
+    if bundled is not None:
+        # Prebuilt text and audio: nothing to synthesize
+        extra.update(image_url=resolution.image_url, audio_url=bundled.audio_url)
+        tokens = iter([bundled.text])
+        submit_audio = None
+    elif resolution.tier is not None:
+        extra['image_url'] = resolution.image_url
+        tokens = iter([resolution.response])
+    elif not model:
+        tokens = iter(["AI Model is not configured."])
     else:
-        tts = gTTS(text=text, lang='en', tld='co.in')
+        # Same single-flight as /chat: identical questions streamed at the
+        # same time wait for this answer instead of each calling the model.
+        try:
+            cached, finish = llm_cache.begin(user_message, snapshot.kb_version)
+        except Exception as e:  # The identical request we waited on failed
+            print(f"🔴 Error in /chat/stream: {e}")
+            return jsonify({"response": "Internal error", "audio_url": None}), 500
+        if finish is None:
+            tokens = iter([cached])
+        else:
+            try:
+                prompt, deps = build_ai_prompt(user_message, snapshot.retriever)
+            except BaseException as e:
+                finish(error=e)
+                raise
+            tokens = SingleFlightTokens(timed_tokens('llm', model_token_stream(model, prompt)), finish, deps)
+
+    events = stream_chat_events(
+        tokens,
+        started_at=started_at,
+        submit_audio=submit_audio,
+        extra=extra,
+    )
+    body = metrics.stream(timing.detach(), events)
+    return Response(stream_with_context(body), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+class SingleFlightTokens:
+    """
+    Passes a streamed AI answer through, then hands the full text to the
+    cache's finish() for storing and for the requests waiting on it. A
+    failed stream, or one dropped before the end (client gone, even before
+    the first token), releases those requests with an error instead.
+    """
+
+    def __init__(self, tokens, finish, deps):
+        self._tokens = tokens
+        self._finish = finish
+        self._deps = deps
+        self._parts = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finish is None:
+            raise StopIteration
+        try:
+            fragment = next(self._tokens)
+        except StopIteration:
+            self._done(response="".join(self._parts), deps=self._deps)
+            raise
+        except Exception as e:
+            self._done(error=e)
+            raise
+        self._parts.append(fragment)
+        return fragment
+
+    def _done(self, **result):
+        finish, self._finish = self._finish, None
+        if finish is not None:
+            finish(**result)
+
+    def __del__(self):
+        self._done(error=RuntimeError("stream closed before the answer was complete"))
+
+
+def timed_tokens(stage, tokens):
+    """Yields from a token stream, timing the whole stream as one span."""
+    with metrics.span(stage):
+        yield from tokens
+
+
+@app.route('/eligibility/batch', methods=['POST'])
+def batch_eligibility():
+    """
+    Evaluates a CSV/JSONL upload of applicants (multipart field 'file', or
+    the raw request body) and streams the results back chunk by chunk.
+    ?format=csv|jsonl picks the output format (default: the raw body's
+    format, CSV for uploads); ?input_format overrides detection from the
+    file name / content type.
+    """
+    # Imported here: pandas/NumPy would otherwise load in every web worker at startup
+    from eligibility_batch import FORMATS, evaluate_stream, guess_format
+
+    # Multipart bodies are parsed inside the generator: an upload parsed here
+    # would already be closed by the time the response streams.
+    multipart = request.mimetype == 'multipart/form-data'
+    fmt = request.args.get('input_format') or guess_format('', '' if multipart else request.mimetype)
+    output_format = request.args.get('format', fmt)
+    if fmt not in FORMATS or output_format not in FORMATS:
+        return jsonify({"error": f"formats must be one of {', '.join(FORMATS)}"}), 400
+    chunk_size = min(max(request.args.get('chunk_size', 20000, type=int), 1), 100000)
+
+    @stream_with_context
+    def results():
+        source_format = fmt
+        if multipart:
+            upload = request.files['file']
+            source_format = request.args.get('input_format') or guess_format(upload.filename, upload.mimetype)
+            stream = upload.stream
+        else:
+            stream = request.stream
+        source = io.TextIOWrapper(stream, encoding='utf-8')
+        try:
+            chunks = evaluate_stream(source, source_format, chunk_size=chunk_size, output_format=output_format)
+        except ValueError as error:  # Empty, header-only or malformed input
+            yield error
+            return
+        yield None
+        yield from chunks
+
+    # Run the generator up to its first chunk here, so bad input still gets
+    # a 400 instead of failing after the 200 headers have gone out.
+    body = results()
+    error = next(body)
+    if error is not None:
+        body.close()
+        return jsonify({"error": f"could not read applicants: {error}"}), 400
+    mimetype = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    return Response(body, mimetype=mimetype)
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Latency histograms and cache counters in Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/stats')
+def stats():
+    """Per-tier hit rates/latencies and cache counters (internal use)."""
+    snapshot = kb_reloader.current
+    return jsonify({
+        'knowledge_base': {'snapshot': snapshot.number, 'version': snapshot.kb_version},
+        'admission_rules_version': eligibility_checker.RULES_VERSION,
+        'intent_engine': snapshot.engine.stats(),
+        'lang_id': lang_id.stats(),
+        'response_bundle': response_bundle.stats() if response_bundle else None,
+        'llm_cache': llm_cache.stats(),
+        'audio_cache': audio_cache.stats(),
+        'audio_store': audio_store.stats(),
+    })
+
+
+def resolve(user_message, snapshot, use_llm=True):
+    """
+    Answers from the eligibility checker, else through the snapshot's intent engine.
+    Returns a Resolution whose tier is None when only the AI could answer
+    and use_llm is False.
+    """
+    if "%" in user_message:
+        with metrics.span('eligibility'):
+            eligibility_result = check_admission_eligibility_from_text(user_message)
+        if "Please mention both" not in eligibility_result:
+            return Resolution('eligibility', eligibility_result)
+
+    with metrics.span('intent_engine'):
+        return snapshot.engine.resolve(user_message, use_llm=use_llm)
+
+
+def bundle_entry(resolution, snapshot, lang):
+    """
+    Prebuilt text + audio for a KB answer in `lang` (English if the bundle
+    lacks it), or None: no bundle, not a KB answer, or the intent changed
+    since the bundle was built.
+    """
+    if response_bundle is None or resolution.tier not in ('exact', 'classifier'):
+        return None
+    lang = lang if lang in response_bundle.languages else 'en'
+    return response_bundle.lookup(resolution.tag, resolution.response, lang,
+                                  intent_hash=snapshot.intent_hashes.get(resolution.tag))
+
+
+def answer_with_ai(user_message, retriever, version):
+    """LLM tier of the intent engine: cached, single-flight AI fallback."""
+    response_text, cached = llm_cache.get_or_generate(
+        user_message, version, lambda: generate_ai_response(user_message, retriever)
+    )
+    if cached:
+        print("⚡ AI fallback answered from cache.")
+    return response_text
+
+
+def build_ai_prompt(user_message, retriever):
+    """
+    Builds the retrieval-based prompt for the AI fallback.
+    Returns (prompt, tags of the intents it includes).
+    """
+    with metrics.span('kb_retrieval'):
+        kb_context, retrieval_stats = retriever.prompt_context(user_message, k=RETRIEVAL_TOP_K)
+    print(f"📚 Retrieved {retrieval_stats['intents']}, "
+          f"saved ~{retrieval_stats['saved_tokens']} prompt tokens")
+
+    system_prompt = (
+        "You are 'Erode Sengunthar College Bot', a helpful AI assistant for Erode Sengunthar Engineering College. "
+        "Strictly use the provided JSON knowledge base excerpt for answers.\n\n"
+        f"KNOWLEDGE BASE:\n{kb_context}\n\n"
+    )
+
+    return f"{system_prompt}USER QUESTION: {user_message}", retrieval_stats['intents']
+
+
+def generate_ai_response(user_message, retriever):
+    """Calls the AI model; returns (answer, tags of the intents it was built from)."""
+    prompt, deps = build_ai_prompt(user_message, retriever)
+    with metrics.span('llm'):
+        ai_response = model.generate_content(prompt)
+    return ai_response.text, deps
+
+
+@app.route('/audio/<job_id>')
+def audio_status(job_id):
+    """Poll (or long-poll with ?wait=seconds) for an async TTS job."""
+    if not JOB_ID_PATTERN.match(job_id):
+        return jsonify({"status": "unknown", "audio_url": None}), 404
+    wait = min(max(request.args.get('wait', 0, type=float), 0), 30)
+    return jsonify(tts_jobs.status(job_id, wait=wait))
+
+
+def create_tts_response(text, image_url=None, lang_code='en', async_audio=False):
+    """
+    Generates (or reuses cached) TTS audio and returns structured JSON.
+    With async_audio the text is returned immediately along with a job id
+    the client polls at /audio/<job_id>.
+    """
+    # Force Malayalam if detected
+    tts_lang = 'ml' if lang_code == "ml" else 'en'
+
+    if async_audio:
+        with metrics.span('tts_submit'):
+            job_id = tts_jobs.submit(text, lang=tts_lang, tld='co.in')
+        status = tts_jobs.status(job_id) if job_id else {'audio_url': None}
+        return jsonify({
+            'response': text,
+            'audio_url': status['audio_url'],
+            'audio_job': job_id,
+            'audio_status_url': f'/audio/{job_id}' if job_id else None,
+            'image_url': image_url
+        })
 
-    audio_filename = f'{hash(text)}_{lang_code}.mp3'
-    audio_path = os.path.join('static', 'audio', audio_filename)
-    tts.save(audio_path)
+    with metrics.span('tts'):
+        audio_filename = audio_cache.get_or_create(text, lang=tts_lang, tld='co.in')
 
     return jsonify({
         'response': text,
-        'audio_url': f'/static/audio/{audio_filename}',
+        'audio_url': audio_cache.url_for(audio_filename),
         'image_url': image_url
     })
 
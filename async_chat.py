@@ -0,0 +1,659 @@
+"""
+Async (ASGI) serving mode for the chat pipeline.
+
+Same KB snapshots, caches and model as app.py, but upstream calls (Gemini,
+gTTS) are bounded: each upstream has its own concurrency limit, timeout
+and circuit breaker, every request has a deadline, and when too many
+requests are in flight new ones get an immediate degraded answer (KB or
+cached text, no fresh AI answer or synthesis) instead of queueing.
+Degraded replies carry a 'degraded' field naming the reason (in the
+'done' event for POST /chat/stream, which streams AI tokens like app.py).
+
+Run with any ASGI server, e.g.:
+    uvicorn async_chat:app --host 0.0.0.0 --port 5000
+
+Settings (environment): ASYNC_MAX_IN_FLIGHT, REQUEST_DEADLINE,
+LLM_CONCURRENCY, LLM_TIMEOUT, TTS_CONCURRENCY, TTS_TIMEOUT,
+BREAKER_FAILURES, BREAKER_COOLDOWN.
+"""
+import asyncio
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from flask import render_template
+
+import app as chat_app  # Loads the KB, caches and model once
+from chat_stream import ChatEvents, model_token_stream, sse_event
+from intent_engine import Resolution
+from tts_jobs import JOB_ID_PATTERN
+
+
+MAX_IN_FLIGHT = int(os.getenv("ASYNC_MAX_IN_FLIGHT", "64"))
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "10"))
+MAX_BODY_BYTES = 64 * 1024
+STATIC_DIR = os.path.abspath('static')
+
+UNAVAILABLE_TEXT = ("I can't reach the AI assistant right now. Please try again in a moment, "
+                    "or ask me about admissions, courses, fees or facilities.")
+
+_END = object()  # Upstream.stream(): the blocking iterator is exhausted
+
+
+class UpstreamUnavailable(Exception):
+    """An upstream call was not made or did not finish: reason is circuit_open, busy, timeout or error."""
+
+    def __init__(self, upstream, reason):
+        super().__init__(f"{upstream}: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `cooldown` seconds; then lets one probe call through (half-open),
+    closing again if it succeeds. Used from the event loop thread only.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probing = False
+
+    @property
+    def rejecting(self):
+        """True while calls would be refused (without claiming the half-open probe)."""
+        if self.state == 'open':
+            return self.clock() - self.opened_at < self.cooldown
+        return self.state == 'half_open' and self._probing
+
+    def allow(self):
+        if self.state == 'open':
+            if self.clock() - self.opened_at < self.cooldown:
+                return False
+            self.state = 'half_open'
+        if self.state == 'half_open':
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def release(self):
+        """Gives back a half-open probe whose outcome is unknown (the caller went away)."""
+        self._probing = False
+
+    def success(self):
+        self.state = 'closed'
+        self.failures = 0
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.times_opened += 1
+            self.state = 'open'
+            self.opened_at = self.clock()
+
+    def stats(self):
+        return {'state': self.state, 'consecutive_failures': self.failures, 'times_opened': self.times_opened}
+
+
+class Upstream:
+    """
+    A blocking upstream (an SDK call) run on its own thread pool behind a
+    semaphore, a timeout and a circuit breaker. A call that times out keeps
+    its slot until the thread really finishes, so a hung upstream can never
+    hold more than `max_concurrency` threads.
+    """
+
+    def __init__(self, name, max_concurrency=8, timeout=5.0, breaker=None):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f'upstream-{name}')
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    async def _acquire(self, loop, deadline):
+        """Claims a slot (and the breaker's go-ahead); returns (timeout, started_at)."""
+        timeout = self.timeout if deadline is None else min(self.timeout, deadline - loop.time())
+        if self.breaker.rejecting:
+            self.rejected += 1
+            raise UpstreamUnavailable(self.name, 'circuit_open')
+        if timeout <= 0:
+            raise UpstreamUnavailable(self.name, 'timeout')
+
+        started_at = loop.time()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise UpstreamUnavailable(self.name, 'busy')
+        if not self.breaker.allow():
+            self._semaphore.release()
+            self.rejected += 1
+            raise UpstreamUnavailable(self.name, 'circuit_open')
+        self.calls += 1
+        self.in_flight += 1
+        return timeout, started_at
+
+    async def call(self, fn, *args, deadline=None):
+        """Runs fn(*args) on the upstream's pool; raises UpstreamUnavailable instead of waiting past the deadline."""
+        loop = asyncio.get_running_loop()
+        timeout, started_at = await self._acquire(loop, deadline)
+        future = loop.run_in_executor(self.executor, fn, *args)
+        future.add_done_callback(self._finished)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout - (loop.time() - started_at))
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.failure()
+            raise UpstreamUnavailable(self.name, 'timeout')
+        except Exception as e:
+            self.errors += 1
+            self.breaker.failure()
+            print(f"🔴 {self.name} call failed: {e}")
+            raise UpstreamUnavailable(self.name, 'error') from e
+        self.breaker.success()
+        return result
+
+    async def stream(self, fn, *args, deadline=None):
+        """
+        Async generator over the blocking iterable fn(*args) (a streaming
+        SDK call), pulled on the upstream's pool under the same slot and
+        breaker as call(). The timeout bounds the wait for each item; the
+        deadline bounds the whole stream. Raises UpstreamUnavailable,
+        possibly after some items were yielded.
+        """
+        loop = asyncio.get_running_loop()
+        await self._acquire(loop, deadline)
+        items = asyncio.Queue()
+        stop = threading.Event()
+
+        def put(item):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(items.put_nowait, item)
+
+        def pump():
+            try:
+                for item in fn(*args):
+                    if stop.is_set():
+                        return
+                    put((item, None))
+            except Exception as e:
+                put((_END, e))
+            else:
+                put((_END, None))
+
+        future = loop.run_in_executor(self.executor, pump)
+        future.add_done_callback(self._finished)
+        received, settled = False, False
+        try:
+            while True:
+                timeout = self.timeout if deadline is None else min(self.timeout, deadline - loop.time())
+                try:
+                    item, error = await asyncio.wait_for(items.get(), max(timeout, 0))
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    settled = True
+                    self.breaker.failure()
+                    raise UpstreamUnavailable(self.name, 'timeout')
+                if item is _END:
+                    break
+                received = True
+                yield item
+            settled = True
+            if error is not None:
+                self.errors += 1
+                self.breaker.failure()
+                print(f"🔴 {self.name} stream failed: {error}")
+                raise UpstreamUnavailable(self.name, 'error') from error
+            self.breaker.success()
+        finally:
+            # Also reached when the consumer stops early; the thread then
+            # quits at the next item and keeps its slot until it does.
+            stop.set()
+            if not settled and received:
+                self.breaker.success()
+            elif not settled:
+                self.breaker.release()
+
+    async def background(self, submit, *args):
+        """
+        Hands work to a background queue instead of awaiting it (async TTS
+        jobs): refused while the breaker is open, and the job's outcome is
+        fed back into the breaker. submit(*args, on_done=callback) returns a
+        job id, or None when its queue is full.
+        """
+        if self.breaker.rejecting:
+            self.rejected += 1
+            raise UpstreamUnavailable(self.name, 'circuit_open')
+        loop = asyncio.get_running_loop()
+
+        def on_done(error):
+            # Runs on the queue's worker; the breaker belongs to the loop thread
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._job_finished, error)
+
+        job_id = await asyncio.to_thread(submit, *args, on_done=on_done)
+        if job_id is None:
+            self.rejected += 1
+            raise UpstreamUnavailable(self.name, 'busy')
+        return job_id
+
+    def _job_finished(self, error):
+        self.calls += 1
+        if error is None:
+            self.breaker.success()
+        else:
+            self.errors += 1
+            self.breaker.failure()
+
+    def _finished(self, future):
+        self.in_flight -= 1
+        self._semaphore.release()
+        if not future.cancelled():
+            future.exception()  # Retrieved here, so abandoned calls don't log "never retrieved"
+
+    def stats(self):
+        return dict(self.breaker.stats(), in_flight=self.in_flight, limit=self.max_concurrency,
+                    timeout=self.timeout, calls=self.calls, rejected=self.rejected,
+                    timeouts=self.timeouts, errors=self.errors)
+
+
+class AdmissionControl:
+    """Counts requests in flight; past the limit, requests are shed rather than queued."""
+
+    def __init__(self, max_in_flight=64):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def try_enter(self):
+        if self.in_flight >= self.max_in_flight:
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def leave(self):
+        self.in_flight -= 1
+
+    def stats(self):
+        return {'in_flight': self.in_flight, 'limit': self.max_in_flight, 'admitted': self.admitted, 'shed': self.shed}
+
+
+admission = AdmissionControl(MAX_IN_FLIGHT)
+llm = Upstream(
+    'llm',
+    max_concurrency=int(os.getenv("LLM_CONCURRENCY", "8")),
+    timeout=float(os.getenv("LLM_TIMEOUT", "8")),
+    breaker=CircuitBreaker(int(os.getenv("BREAKER_FAILURES", "5")), float(os.getenv("BREAKER_COOLDOWN", "30"))),
+)
+tts = Upstream(
+    'tts',
+    max_concurrency=int(os.getenv("TTS_CONCURRENCY", "4")),
+    timeout=float(os.getenv("TTS_TIMEOUT", "5")),
+    breaker=CircuitBreaker(int(os.getenv("BREAKER_FAILURES", "5")), float(os.getenv("BREAKER_COOLDOWN", "30"))),
+)
+
+
+def kb_only_answer(user_message, snapshot):
+    """Best-effort answer without the AI: the closest KB intent by BM25, else a notice."""
+    intents = snapshot.retriever.top_k(user_message, k=1)
+    if intents:
+        return Resolution('kb_fallback', intents[0]['responses'][0], intents[0]['tag'], intent=intents[0])
+    return Resolution('kb_fallback', UNAVAILABLE_TEXT)
+
+
+async def local_answer(user_message, snapshot, count_cache=False):
+    """
+    The answer that needs no upstream call: eligibility / KB tiers or a
+    cached AI answer, else None. KB matching and cache reads run on worker
+    threads: neither may block the event loop. With count_cache the cache
+    read counts toward the LLM cache hit/miss stats; leave it off when a
+    miss goes on to get_or_generate(), which counts it itself.
+    """
+    resolution = await asyncio.to_thread(chat_app.resolve, user_message, snapshot, False)
+    if resolution.tier is not None:
+        return resolution
+    if count_cache:
+        cached = await asyncio.to_thread(chat_app.llm_cache.lookup, user_message, snapshot.kb_version)
+    else:
+        cached = await asyncio.to_thread(chat_app.llm_cache.get,
+                                         chat_app.llm_cache.make_key(user_message, snapshot.kb_version))
+    return Resolution('llm', cached) if cached is not None else None
+
+
+def ai_refusal(admitted):
+    """Degraded reason when the AI may not be asked at all, else None."""
+    if not admitted:
+        return 'overloaded'
+    if chat_app.model is None:
+        return 'llm_unconfigured'
+    return None
+
+
+async def answer_text(user_message, snapshot, admitted, deadline):
+    """Returns (Resolution, degraded reason or None)."""
+    resolution = await local_answer(user_message, snapshot)
+    if resolution is not None:
+        return resolution, None
+
+    degraded = ai_refusal(admitted)
+    if degraded is None:
+        try:
+            text = await llm.call(chat_app.answer_with_ai, user_message, snapshot.retriever, snapshot.kb_version,
+                                  deadline=deadline)
+            return Resolution('llm', text), None
+        except UpstreamUnavailable as e:
+            degraded = f'llm_{e.reason}'
+    return await asyncio.to_thread(kb_only_answer, user_message, snapshot), degraded
+
+
+async def handle_chat(body):
+    """POST /chat: the same request and reply shape as app.py's /chat."""
+    loop = asyncio.get_running_loop()
+    started_at = time.perf_counter()
+    deadline = loop.time() + REQUEST_DEADLINE
+    user_message = str(body.get('message', '')).strip()
+    async_audio = bool(body.get('async_audio', chat_app.ASYNC_TTS))
+
+    admitted = admission.try_enter()
+    try:
+        detected_lang = await asyncio.to_thread(chat_app.lang_id.identify, user_message)
+        snapshot = chat_app.kb_reloader.current
+        resolution, degraded = await answer_text(user_message, snapshot, admitted, deadline)
+        reply = {'response': resolution.response, 'audio_url': None, 'image_url': resolution.image_url}
+
+        bundled = chat_app.bundle_entry(resolution, snapshot, detected_lang)
+        if bundled is not None:
+            reply.update(response=bundled.text, audio_url=bundled.audio_url)
+        else:
+            tts_lang = 'ml' if detected_lang == "ml" else 'en'
+            filename = await asyncio.to_thread(chat_app.audio_cache.cached, resolution.response, tts_lang, 'co.in')
+            if filename is None and admitted and async_audio:
+                try:
+                    job_id = await tts.background(chat_app.tts_jobs.submit, resolution.response, tts_lang, 'co.in')
+                    reply.update(audio_job=job_id, audio_status_url=f'/audio/{job_id}')
+                except UpstreamUnavailable as e:
+                    degraded = degraded or f'tts_{e.reason}'
+            elif filename is None and admitted:
+                try:
+                    filename = await tts.call(chat_app.audio_cache.get_or_create, resolution.response,
+                                              tts_lang, 'co.in', deadline=deadline)
+                except UpstreamUnavailable as e:
+                    degraded = degraded or f'tts_{e.reason}'
+            if filename is not None:
+                reply['audio_url'] = chat_app.audio_cache.url_for(filename)
+    finally:
+        if admitted:
+            admission.leave()
+
+    if degraded:
+        reply['degraded'] = degraded
+        chat_app.metrics.inc('degraded_total', reason=degraded)
+    path = chat_app.RESOLUTION_PATHS.get(resolution.tier, resolution.tier)
+    chat_app.metrics.observe('request_seconds', time.perf_counter() - started_at, endpoint='async_chat', path=path)
+    return 200, reply
+
+
+def ai_tokens(user_message, retriever, deps):
+    """The AI answer as a token stream (built on the llm pool); the prompt's intent tags go into `deps`."""
+    prompt, tags = chat_app.build_ai_prompt(user_message, retriever)
+    deps.extend(tags)
+    return model_token_stream(chat_app.model, prompt)
+
+
+async def handle_chat_stream(body, send):
+    """
+    POST /chat/stream: app.py's server-sent events under the same admission
+    control, deadline and upstream limits as /chat. AI tokens come from the
+    llm upstream as the model produces them; if it fails before the first
+    token, the KB fallback is sent instead and 'done' names the reason.
+    """
+    loop = asyncio.get_running_loop()
+    started_at = time.perf_counter()
+    deadline = loop.time() + REQUEST_DEADLINE
+    user_message = str(body.get('message', '')).strip()
+    events = ChatEvents(started_at)
+    degraded = None
+    speak = True
+
+    async def send_event(event):
+        await send({'type': 'http.response.body', 'body': event.encode('utf-8'), 'more_body': True})
+
+    async def send_audio(sentences):
+        nonlocal degraded
+        for sentence in sentences:
+            job_id = None
+            if speak and admitted:
+                try:
+                    job_id = await tts.background(chat_app.tts_jobs.submit, sentence, tts_lang, 'co.in')
+                except UpstreamUnavailable as e:
+                    degraded = degraded or f'tts_{e.reason}'
+            event = events.audio(job_id)
+            if event:
+                await send_event(event)
+
+    async def send_fragment(fragment):
+        event, sentences = events.token(fragment)
+        await send_event(event)
+        await send_audio(sentences)
+
+    admitted = admission.try_enter()
+    try:
+        detected_lang = await asyncio.to_thread(chat_app.lang_id.identify, user_message)
+        tts_lang = 'ml' if detected_lang == "ml" else 'en'
+        snapshot = chat_app.kb_reloader.current
+        # Streamed AI answers are put() below, not via get_or_generate(): count here
+        resolution = await local_answer(user_message, snapshot, count_cache=True)
+        if resolution is None:
+            degraded = ai_refusal(admitted)
+    except BaseException:
+        if admitted:
+            admission.leave()
+        raise
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream; charset=utf-8'), (b'cache-control', b'no-cache'),
+                        (b'x-accel-buffering', b'no')],
+        })
+        if resolution is None and degraded is None:
+            deps = []
+            try:
+                async for fragment in llm.stream(ai_tokens, user_message, snapshot.retriever, deps,
+                                                 deadline=deadline):
+                    await send_fragment(fragment)
+            except UpstreamUnavailable as e:
+                degraded = f'llm_{e.reason}'
+                if events.parts:
+                    # Part of the answer is already on screen: end it like app.py does
+                    await send_event(sse_event('error', {'message': 'Internal error'}))
+                    return
+            else:
+                resolution = Resolution('llm', events.text)
+                cache_key = chat_app.llm_cache.make_key(user_message, snapshot.kb_version)
+                await asyncio.to_thread(chat_app.llm_cache.put, cache_key, events.text, deps)
+        if resolution is None:
+            resolution = await asyncio.to_thread(kb_only_answer, user_message, snapshot)
+
+        extra = {'image_url': resolution.image_url}
+        if not events.parts:
+            bundled = chat_app.bundle_entry(resolution, snapshot, detected_lang)
+            if bundled is not None:
+                speak = False
+                extra['audio_url'] = bundled.audio_url
+            await send_fragment(bundled.text if bundled is not None else resolution.response)
+        await send_audio(events.flush())
+        if degraded:
+            extra['degraded'] = degraded
+        await send_event(events.done(**extra))
+    except Exception as e:
+        print(f"🔴 Error in async /chat/stream: {e}")
+        await send_event(sse_event('error', {'message': 'Internal error'}))
+    finally:
+        if admitted:
+            admission.leave()
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        if degraded:
+            chat_app.metrics.inc('degraded_total', reason=degraded)
+        path = chat_app.RESOLUTION_PATHS.get(resolution.tier, resolution.tier) if resolution else 'llm'
+        chat_app.metrics.observe('request_seconds', time.perf_counter() - started_at,
+                                 endpoint='async_chat_stream', path=path)
+
+
+def stats():
+    return {
+        'admission': admission.stats(),
+        'upstreams': {'llm': llm.stats(), 'tts': tts.stats()},
+        'intent_engine': chat_app.kb_reloader.current.engine.stats(),
+        'llm_cache': chat_app.llm_cache.stats(),
+        'audio_cache': chat_app.audio_cache.stats(),
+    }
+
+
+_index_html = None
+
+def index_html():
+    global _index_html
+    if _index_html is None:
+        with chat_app.app.test_request_context('/'):
+            _index_html = render_template('index.html').encode('utf-8')
+    return _index_html
+
+
+def read_static(path):
+    """Contents of a file under static/, or None (missing, or outside the folder)."""
+    full_path = os.path.normpath(os.path.join(STATIC_DIR, path))
+    if not full_path.startswith(STATIC_DIR + os.sep) or not os.path.isfile(full_path):
+        return None
+    with open(full_path, 'rb') as f:
+        return f.read()
+
+
+# --- ASGI plumbing ---
+
+async def read_body(receive):
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_response(send, status, body, content_type='application/json', headers=()):
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type.encode()), (b'content-length', str(len(body)).encode()),
+                    *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            llm.executor.shutdown(wait=False)
+            tts.executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    path, method = scope['path'], scope['method']
+
+    if path in ('/chat', '/chat/stream') and method == 'POST':
+        raw = await read_body(receive)
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            return await send_response(send, 400, {"response": "Request must be a JSON object", "audio_url": None})
+        if path == '/chat/stream':
+            try:
+                return await handle_chat_stream(body, send)
+            except Exception as e:
+                # Only reached before the stream started
+                print(f"🔴 Error in async /chat/stream: {e}")
+                return await send_response(send, 500, {"response": "Internal error", "audio_url": None})
+        try:
+            status, reply = await handle_chat(body)
+        except Exception as e:
+            print(f"🔴 Error in async /chat: {e}")
+            status, reply = 500, {"response": "Internal error", "audio_url": None}
+        return await send_response(send, status, reply)
+
+    if method != 'GET':
+        return await send_response(send, 405, {"error": "method not allowed"})
+    if path == '/':
+        return await send_response(send, 200, index_html(), 'text/html; charset=utf-8')
+    if path == '/stats':
+        return await send_response(send, 200, stats())
+    if path == '/metrics':
+        return await send_response(send, 200, chat_app.metrics.render().encode('utf-8'), 'text/plain; version=0.0.4')
+    if path.startswith('/audio/'):
+        job_id = path[len('/audio/'):]
+        if not JOB_ID_PATTERN.match(job_id):
+            return await send_response(send, 404, {"status": "unknown", "audio_url": None})
+        query = parse_qs(scope.get('query_string', b'').decode())
+        try:
+            wait = min(max(float(query.get('wait', ['0'])[0]), 0), 30)
+        except ValueError:
+            wait = 0
+        status = await asyncio.to_thread(chat_app.tts_jobs.status, job_id, wait)
+        return await send_response(send, 200, status)
+    if path.startswith('/static/'):
+        content = await asyncio.to_thread(read_static, path[len('/static/'):])
+        if content is not None:
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            return await send_response(send, 200, content, content_type)
+    return await send_response(send, 404, {"error": "not found"})
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Install an ASGI server to run this mode, e.g. pip install uvicorn")
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from gtts import gTTS
+
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized TTS audio.
+
+    Files are named after a SHA-256 digest of (text, lang, tld, slow), so the
+    same answer maps to the same mp3 in every process and across restarts.
+    """
+
+    def __init__(self, directory=os.path.join('static', 'audio'), url_prefix='/static/audio', store=None):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.store = store  # Optional AudioStore that tracks access for eviction
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def cache_key(text, lang='en', tld='co.in', slow=False):
+        """Stable digest of everything that changes the synthesized audio."""
+        payload = json.dumps([text, lang, tld, slow], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def filename_for(self, text, lang='en', tld='co.in', slow=False):
+        return f'{self.cache_key(text, lang, tld, slow)[:32]}_{lang}.mp3'
+
+    def url_for(self, filename):
+        return f'{self.url_prefix}/{filename}'
+
+    def cached(self, text, lang='en', tld='co.in', slow=False):
+        """Returns the audio filename if it was already synthesized, else None (not counted as a miss)."""
+        filename = self.filename_for(text, lang, tld, slow)
+        if not os.path.exists(os.path.join(self.directory, filename)):
+            return None
+        with self._lock:
+            self.hits += 1
+        if self.store:
+            self.store.touch(filename)
+        return filename
+
+    def get_or_create(self, text, lang='en', tld='co.in', slow=False):
+        """Returns the audio filename, synthesizing it only on a cache miss."""
+        filename = self.cached(text, lang, tld, slow)
+        if filename is not None:
+            return filename
+
+        filename = self.filename_for(text, lang, tld, slow)
+        path = os.path.join(self.directory, filename)
+        with self._lock:
+            self.misses += 1
+        self._synthesize(text, lang, tld, slow, path)
+        if self.store:
+            self.store.touch(filename, os.path.getsize(path))
+        return filename
+
+    def _synthesize(self, text, lang, tld, slow, path):
+        # Write to a temp file in the same directory and rename it into place,
+        # so concurrent workers never serve a half-written mp3.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.mp3.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                gTTS(text=text, lang=lang, tld=tld, slow=slow).write_to_fp(tmp_file)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,212 @@
+import queue
+import threading
+import time
+
+import speech_recognition as sr
+
+
+def google_recognizer(recognizer=None):
+    """Recognition backend: Google Web Speech via speech_recognition."""
+    recognizer = recognizer or sr.Recognizer()
+    return lambda audio, language: recognizer.recognize_google(audio, language=language)
+
+
+def microphone_source():
+    return sr.Microphone()
+
+
+class PacedAudioFile(sr.AudioFile):
+    """An AudioFile that delivers audio no faster than real time, like a microphone."""
+
+    def __enter__(self):
+        source = super().__enter__()
+        read = self.stream.read
+        bytes_per_second = self.SAMPLE_RATE * self.SAMPLE_WIDTH
+        started_at, delivered = time.monotonic(), 0
+
+        def paced_read(size=-1):
+            nonlocal delivered
+            data = read(size)
+            delivered += len(data)
+            delay = started_at + delivered / bytes_per_second - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            return data
+
+        self.stream.read = paced_read
+        return source
+
+
+def wav_source(path, realtime=False):
+    """
+    Reads a WAV/AIFF/FLAC file instead of the microphone (offline tests,
+    benchmarks); with realtime=True at the pace a microphone would.
+    """
+    return lambda: PacedAudioFile(path) if realtime else sr.AudioFile(path)
+
+
+class Utterance:
+    """One speech segment cut out of the capture stream."""
+
+    def __init__(self, audio, ended_at, lead_in=0.0, trailing=0.0):
+        self.audio = audio
+        self.ended_at = ended_at  # time.monotonic() when the segment was closed
+        # When the speech itself began: the VAD closes a segment only after
+        # `trailing` seconds of silence it doesn't keep, and the audio opens
+        # with up to `lead_in` seconds of pre-roll.
+        self.started_at = ended_at - trailing - self.seconds + min(lead_in, self.seconds)
+
+    @property
+    def seconds(self):
+        return len(self.audio.frame_data) / (self.audio.sample_rate * self.audio.sample_width)
+
+
+class CaptureSession:
+    """
+    Long-lived audio capture: the source is opened and calibrated once, then
+    a background thread segments speech (speech_recognition's energy-based
+    VAD) into a bounded queue of Utterances. The energy threshold keeps
+    adapting to ambient noise between phrases, so no turn pays for a fresh
+    calibration.
+
+    `source_factory` returns an sr.AudioSource (microphone_source or
+    wav_source(path)); `recognize(audio, language)` is the pluggable
+    recognition backend (google_recognizer, fake_backends.FakeRecognizer).
+    """
+
+    def __init__(self, source_factory=microphone_source, recognize=None, calibration_seconds=1.0,
+                 pause_threshold=0.8, phrase_time_limit=15, max_pending=8):
+        self.source_factory = source_factory
+        self.recognizer = sr.Recognizer()
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = pause_threshold
+        self.recognize = recognize or google_recognizer(self.recognizer)
+        self.calibration_seconds = calibration_seconds
+        self.phrase_time_limit = phrase_time_limit
+        self._utterances = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.exhausted = False  # file source fully read
+        self.captured = 0
+        self.dropped = 0
+        self.recognized = 0
+        self.recognition_seconds = 0.0
+        self.error = None
+
+    def start(self):
+        """Opens the source and starts capturing; returns once calibration is done."""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name='audio-capture', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        try:
+            with self.source_factory() as source:
+                if self.calibration_seconds:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=self.calibration_seconds)
+                self._ready.set()
+                while not self._stop.is_set():
+                    try:
+                        # Short timeout so stop() is noticed between phrases.
+                        audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=self.phrase_time_limit)
+                    except sr.WaitTimeoutError:
+                        continue
+                    if not audio.frame_data:
+                        self.exhausted = True  # End of a file source
+                        return
+                    self._push(Utterance(
+                        audio, time.monotonic(),
+                        lead_in=self.recognizer.non_speaking_duration,
+                        trailing=self.recognizer.pause_threshold - self.recognizer.non_speaking_duration,
+                    ))
+        except Exception as e:
+            self.error = e
+            print(f"🔴 Audio capture stopped: {e}")
+        finally:
+            self.exhausted = True
+            self._ready.set()
+
+    def _push(self, utterance):
+        with self._lock:
+            self.captured += 1
+            while True:
+                try:
+                    self._utterances.put_nowait(utterance)
+                    return
+                except queue.Full:
+                    # Nobody is listening: keep the most recent speech.
+                    try:
+                        self._utterances.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def next_utterance(self, timeout=None, since=None):
+        """
+        The next captured Utterance, or None on timeout / end of input.
+        Utterances whose speech started before `since` (e.g. the bot's own
+        voice while it was speaking) are discarded, even if the segment was
+        only closed after it.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                utterance = self._utterances.get(timeout=0.1 if remaining is None else min(remaining, 0.1))
+            except queue.Empty:
+                if self.exhausted and self._utterances.empty():
+                    return None
+                continue
+            if since is not None and utterance.started_at < since:
+                with self._lock:
+                    self.dropped += 1
+                continue
+            return utterance
+
+    def listen(self, language='en', timeout=None, since=None):
+        """Recognized text of the next utterance; "" if none arrived or it was unintelligible."""
+        utterance = self.next_utterance(timeout=timeout, since=since)
+        if utterance is None:
+            print("No speech detected within the timeout period.")
+            return ""
+        print("Processing audio...")
+        started_at = time.perf_counter()
+        try:
+            return self.recognize(utterance.audio, language)
+        except sr.UnknownValueError:
+            print("Sorry, I could not understand audio.")
+            return ""
+        except sr.RequestError as e:
+            print(f"Could not request results from Google Speech Recognition service; {e}")
+            return ""
+        finally:
+            with self._lock:
+                self.recognized += 1
+                self.recognition_seconds += time.perf_counter() - started_at
+
+    def stats(self):
+        with self._lock:
+            return {
+                'captured': self.captured,
+                'dropped': self.dropped,
+                'pending': self._utterances.qsize(),
+                'recognized': self.recognized,
+                'mean_recognition_ms': self.recognition_seconds * 1000 / self.recognized if self.recognized else 0.0,
+                'energy_threshold': round(self.recognizer.energy_threshold, 1),
+            }
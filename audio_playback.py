@@ -0,0 +1,232 @@
+import io
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+
+def synthesize(text, lang='en', tld='com', slow=False):
+    """gTTS straight into memory: no temp files to clobber or clean up."""
+    from gtts import gTTS
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang, tld=tld, slow=slow).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+class PygameSink:
+    """Plays mp3 bytes (or files) through pygame.mixer; stoppable mid-phrase."""
+
+    def __init__(self, poll_interval=0.05):
+        self.poll_interval = poll_interval
+        self._initialized = False
+
+    def _mixer(self):
+        import pygame
+        if not self._initialized:
+            pygame.mixer.init()
+            self._initialized = True
+        return pygame.mixer
+
+    def play(self, source, cancel):
+        """source is mp3 bytes or a file path; returns early once `cancel` is set."""
+        mixer = self._mixer()
+        if isinstance(source, (bytes, bytearray)):
+            mixer.music.load(io.BytesIO(source), 'mp3')
+        else:
+            mixer.music.load(source)
+        mixer.music.play()
+        try:
+            while mixer.music.get_busy():
+                if cancel.wait(self.poll_interval):
+                    mixer.music.stop()
+                    break
+        finally:
+            mixer.music.unload()
+
+
+class NullSink:
+    """Discards audio (optionally taking `duration` seconds); records what it was given."""
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.played = []
+
+    def play(self, source, cancel):
+        self.played.append(source)
+        cancel.wait(self.duration)
+
+
+class PhraseCache:
+    """Bounded LRU of synthesized audio, keyed on everything that changes it."""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (text, lang, tld, slow) -> mp3 bytes
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return audio
+
+    def put(self, key, audio):
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = audio
+            self._size += len(audio)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self._size}
+
+
+class PlaybackItem:
+    """One queued utterance; `done` is set when it finished, failed or was cancelled."""
+
+    def __init__(self, text=None, lang='en', path=None):
+        self.text = text
+        self.lang = lang
+        self.path = path
+        self.done = threading.Event()
+        self.cancelled = False
+        self.error = None
+        self.generation = 0
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class AudioPlayer:
+    """
+    Speaks on a dedicated thread so callers don't block while audio plays.
+
+    speak()/play_file() enqueue and return a PlaybackItem; cancel() stops
+    the current phrase and drops everything queued.
+    Synthesized phrases are kept in a PhraseCache, so fixed prompts are
+    synthesized once (or ahead of time with prefetch()).
+    """
+
+    def __init__(self, sink=None, synthesizer=synthesize, cache=None, tld='com'):
+        self.sink = sink or PygameSink()
+        self.synthesizer = synthesizer
+        self.cache = cache or PhraseCache()
+        self.tld = tld
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._current = None
+        self._generation = 0  # Bumped by cancel(); older queued items are skipped
+        self._lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self.last_finished_at = 0.0  # time.monotonic() when the last item ended
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audio-player', daemon=True)
+                self._thread.start()
+
+    def audio_for(self, text, lang='en'):
+        """Cached mp3 bytes for a phrase, synthesizing on a miss."""
+        key = (text, lang, self.tld, False)
+        audio = self.cache.get(key)
+        if audio is None:
+            audio = self.synthesizer(text, lang=lang, tld=self.tld)
+            self.cache.put(key, audio)
+        return audio
+
+    def speak(self, text, lang='en', block=False):
+        item = PlaybackItem(text=text, lang=lang)
+        self._enqueue(item, block)
+        return item
+
+    def play_file(self, path, block=False):
+        item = PlaybackItem(path=path)
+        self._enqueue(item, block)
+        return item
+
+    def _enqueue(self, item, block):
+        self._ensure_thread()
+        with self._lock:
+            item.generation = self._generation
+        self._queue.put(item)
+        if block:
+            item.wait()
+
+    def prefetch(self, texts, lang='en'):
+        """Synthesizes phrases into the cache on a background thread."""
+        def warm():
+            for text in texts:
+                try:
+                    self.audio_for(text, lang)
+                except Exception as e:
+                    print(f"Error pre-synthesizing {text!r}: {e}")
+        thread = threading.Thread(target=warm, name='audio-prefetch', daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def is_speaking(self):
+        return self._current is not None or not self._queue.empty()
+
+    def cancel(self):
+        """Stops the current phrase and drops everything queued."""
+        with self._lock:
+            self._generation += 1
+            if self._current is not None:
+                self._cancel.set()
+
+    def wait(self):
+        """Blocks until everything queued so far has been played (or cancelled)."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            with self._lock:
+                stale = item.generation != self._generation
+                if not stale:
+                    self._current = item
+                    self._cancel.clear()
+            if stale:
+                item.cancelled = True
+                item.done.set()
+                self._queue.task_done()
+                continue
+            try:
+                source = item.path if item.path else self.audio_for(item.text, item.lang)
+                if not self._cancel.is_set():
+                    self.sink.play(source, self._cancel)
+                item.cancelled = self._cancel.is_set()
+            except Exception as e:
+                item.error = e
+                print(f"Error in text-to-speech: {e}")
+            finally:
+                self._current = None
+                self.last_finished_at = time.monotonic()
+                item.done.set()
+                self._queue.task_done()
+
+    def stop(self):
+        self.cancel()
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def stats(self):
+        return dict(self.cache.stats(), queued=self._queue.qsize(), speaking=self.is_speaking)
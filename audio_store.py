@@ -0,0 +1,244 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class AudioStore:
+    """
+    Size- and age-bounded manager for the static/audio directory.
+
+    The request path only calls touch(), which updates an in-memory entry
+    and, at most once per `touch_interval` per file, the file's atime. The
+    atime is what makes accesses visible to every worker process sharing
+    the directory: each one runs its own sweeper and keeps its own index.
+    A background sweeper thread persists the index and evicts files that are
+    older than the TTL or, least recently used first, until the directory
+    fits in the byte budget. Pinned files are never evicted. The sweep also
+    deletes "*.tmp" files (half-written mp3s or indexes) left behind by a
+    process that died mid-write, once they are `temp_max_age` seconds old.
+    """
+
+    INDEX_NAME = '.audio_index.json'
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, ttl_seconds=3 * 24 * 3600,
+                 sweep_interval=300, grace_seconds=60, touch_interval=30, index_path=None, temp_max_age=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        # Files touched this recently are never evicted, so a URL we just
+        # handed to a client stays valid long enough to be fetched.
+        self.grace_seconds = grace_seconds
+        self.touch_interval = touch_interval
+        # Older than any synthesis or index write can take: nobody is writing it
+        self.temp_max_age = temp_max_age
+        self.index_path = index_path or os.path.join(directory, self.INDEX_NAME)
+
+        # filename -> [size_bytes or None, last_access, pinned]
+        self._entries = {}
+        self._pinned = set()
+        self._persisted = {}  # filename -> when touch() last wrote its atime
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.evictions = 0
+        self.stale_temp_files = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    # --- Request path -------------------------------------------------
+
+    def touch(self, filename, size=None):
+        """Records an access to filename. O(1); writes its atime at most once per touch_interval."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is None:
+                self._entries[filename] = [size, now, filename in self._pinned]
+            else:
+                entry[1] = now
+                if size is not None:
+                    entry[0] = size
+            persist = now - self._persisted.get(filename, 0) >= self.touch_interval
+            if persist:
+                self._persisted[filename] = now
+        if persist:
+            path = os.path.join(self.directory, filename)
+            try:
+                # atime only: the mtime backs the static file's ETag
+                os.utime(path, (now, os.stat(path).st_mtime))
+            except OSError:
+                pass
+
+    def pin(self, filename):
+        """Protects filename from eviction (e.g. audio for KB answers)."""
+        with self._lock:
+            self._pinned.add(filename)
+            entry = self._entries.get(filename)
+            if entry is not None:
+                entry[2] = True
+
+    def unpin(self, filename):
+        with self._lock:
+            self._pinned.discard(filename)
+            entry = self._entries.get(filename)
+            if entry is not None:
+                entry[2] = False
+
+    # --- Background sweeper -------------------------------------------
+
+    def start(self):
+        """Starts the daemon sweeper thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='audio-store-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"🔴 Audio store sweep failed: {e}")
+
+    def sweep(self):
+        """Evicts expired and over-budget files, then persists the index."""
+        self._remove_stale_temp_files()
+        self._adopt_untracked_files()
+        now = time.time()
+
+        with self._lock:
+            snapshot = {name: list(entry) for name, entry in self._entries.items()}
+
+        # Fill in sizes, take other processes' accesses from the atime and
+        # drop entries whose files disappeared.
+        missing = []
+        for name, entry in snapshot.items():
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                missing.append(name)
+                continue
+            entry[0] = stat.st_size
+            entry[1] = max(entry[1], stat.st_atime)
+        for name in missing:
+            del snapshot[name]
+
+        # Another process's last access can be up to touch_interval newer than the atime
+        grace = self.grace_seconds + self.touch_interval
+        evictable = sorted(
+            (entry[1], name) for name, entry in snapshot.items()
+            if not entry[2] and now - entry[1] > grace
+        )
+        total = sum(entry[0] for entry in snapshot.values())
+        victims = []
+        for last_access, name in evictable:
+            expired = now - last_access > self.ttl_seconds
+            if not expired and total <= self.max_bytes:
+                # Sorted oldest first: nothing later is expired either.
+                break
+            victims.append(name)
+            total -= snapshot[name][0]
+
+        for name in victims:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            for name in missing:
+                self._entries.pop(name, None)
+                self._persisted.pop(name, None)
+            for name in victims:
+                entry = self._entries.get(name)
+                # Skip files that were touched again while we were sweeping;
+                # they will be re-synthesized on their next miss if needed.
+                if entry is not None and entry[1] <= snapshot[name][1]:
+                    del self._entries[name]
+                    self._persisted.pop(name, None)
+            for name, entry in snapshot.items():
+                current = self._entries.get(name)
+                if current is not None:
+                    current[0] = entry[0]
+                    current[1] = max(current[1], entry[1])
+            self.evictions += len(victims)
+        self._save_index()
+        return victims
+
+    def _remove_stale_temp_files(self):
+        """Deletes "*.tmp" files whose writer crashed before renaming them into place."""
+        cutoff = time.time() - self.temp_max_age
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith('.tmp')]
+        except FileNotFoundError:
+            return
+        removed = 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass  # Renamed into place or removed by its writer meanwhile
+        if removed:
+            with self._lock:
+                self.stale_temp_files += removed
+
+    # --- Index persistence --------------------------------------------
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._entries = {name: [size, last, bool(pinned)] for name, (size, last, pinned) in data.items()}
+            self._pinned = {name for name, entry in self._entries.items() if entry[2]}
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError) as e:
+            print(f"🔴 Ignoring corrupt audio index {self.index_path}: {e}")
+        self._adopt_untracked_files()
+
+    def _adopt_untracked_files(self):
+        """Tracks mp3s written by other processes or earlier versions."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith('.mp3')]
+        except FileNotFoundError:
+            return
+        with self._lock:
+            for name in names:
+                if name not in self._entries:
+                    try:
+                        stat = os.stat(os.path.join(self.directory, name))
+                    except OSError:
+                        continue
+                    self._entries[name] = [stat.st_size, stat.st_mtime, name in self._pinned]
+
+    def _save_index(self):
+        with self._lock:
+            data = {name: [entry[0], round(entry[1], 1), int(entry[2])] for name, entry in self._entries.items()}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    def stats(self):
+        with self._lock:
+            sizes = [entry[0] or 0 for entry in self._entries.values()]
+            return {
+                'files': len(sizes),
+                'bytes': sum(sizes),
+                'pinned': len(self._pinned),
+                'evictions': self.evictions,
+                'stale_temp_files': self.stale_temp_files,
+            }
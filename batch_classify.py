@@ -0,0 +1,79 @@
+"""
+Classify a JSONL file of questions in bounded-memory batches.
+
+Each input line is a JSON object with a "question" (or "message"/"text")
+field, or a bare JSON string. Each output line echoes the input object
+with "tag", "confidence" and "response" added.
+
+Usage: python batch_classify.py questions.jsonl [-o results.jsonl] [--batch-size 512]
+"""
+import argparse
+import itertools
+import json
+import sys
+
+from chatbot_core import CLASSIFIERS, Chatbot
+
+
+QUESTION_FIELDS = ('question', 'message', 'text')
+
+
+def read_records(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if isinstance(record, str):
+            record = {'question': record}
+        yield record
+
+
+def question_of(record):
+    for field in QUESTION_FIELDS:
+        if field in record:
+            return str(record[field])
+    return ""
+
+
+def classify_stream(chatbot, records, batch_size=512):
+    """Yields annotated records; holds at most batch_size of them at a time."""
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, batch_size))
+        if not chunk:
+            return
+        tags, confidences, responses = chatbot.get_responses([question_of(r) for r in chunk])
+        for record, tag, confidence, response in zip(chunk, tags, confidences, responses):
+            record['tag'] = tag
+            record['confidence'] = round(float(confidence), 4)
+            record['response'] = response
+            yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help="JSONL file of questions, or '-' for stdin")
+    parser.add_argument('-o', '--output', help='output JSONL file (default: stdout)')
+    parser.add_argument('--batch-size', type=int, default=512)
+    parser.add_argument('--classifier', choices=list(CLASSIFIERS), default='svc')
+    args = parser.parse_args()
+
+    chatbot = Chatbot(classifier=args.classifier)
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    sink = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    count = 0
+    try:
+        for record in classify_stream(chatbot, read_records(source), args.batch_size):
+            sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    print(f"Classified {count} questions.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: per-call Recognizer + ambient-noise calibration (the old
+listen_to_user) vs. one long-lived CaptureSession, on a synthetic recording
+played back at microphone pace. Recognition is faked, so no network is used.
+
+Usage: python bench_capture.py [--turns 5] [--wav recording.wav]
+"""
+import argparse
+import math
+import os
+import random
+import struct
+import tempfile
+import time
+import wave
+
+import speech_recognition as sr
+
+from audio_capture import CaptureSession, PacedAudioFile, wav_source
+from fake_backends import FakeRecognizer
+
+
+SAMPLE_RATE = 16000
+
+
+def write_synthetic_recording(path, turns, speech_seconds=1.2, gap_seconds=1.5, seed=0):
+    """Low background noise with `turns` tone bursts standing in for answers."""
+    rng = random.Random(seed)
+    samples = []
+
+    def noise(seconds):
+        samples.extend(int(rng.gauss(0, 60)) for _ in range(int(seconds * SAMPLE_RATE)))
+
+    def speech(seconds):
+        for i in range(int(seconds * SAMPLE_RATE)):
+            t = i / SAMPLE_RATE
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+            samples.append(int(6000 * envelope * math.sin(2 * math.pi * 220 * t) + rng.gauss(0, 60)))
+
+    noise(1.0)
+    for _ in range(turns):
+        speech(speech_seconds)
+        noise(gap_seconds)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(struct.pack(f'<{len(samples)}h', *samples))
+
+
+def per_call_listening(path, turns):
+    """The old listen_to_user: fresh Recognizer and 1 s calibration every turn."""
+    recognize = FakeRecognizer()
+    heard, dead_time = [], 0.0
+    started_at = time.perf_counter()
+    with PacedAudioFile(path) as source:
+        for _ in range(turns):
+            recognizer = sr.Recognizer()
+            calibrating_at = time.perf_counter()
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+            dead_time += time.perf_counter() - calibrating_at
+            try:
+                audio = recognizer.listen(source, timeout=5)
+            except sr.WaitTimeoutError:
+                continue
+            if audio.frame_data:
+                heard.append(recognize(audio, 'en'))
+    return time.perf_counter() - started_at, dead_time, heard
+
+
+def session_listening(path, turns):
+    session_started = time.perf_counter()
+    session = CaptureSession(wav_source(path, realtime=True), recognize=FakeRecognizer()).start()
+    dead_time = time.perf_counter() - session_started  # One calibration for the whole session
+    heard = [text for text in (session.listen(timeout=5) for _ in range(turns)) if text]
+    total = time.perf_counter() - session_started
+    session.stop()
+    return total, dead_time, heard
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--wav', help='use this recording instead of a synthetic one')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.wav
+        if not path:
+            path = os.path.join(tmp, 'conversation.wav')
+            write_synthetic_recording(path, args.turns)
+
+        for name, run in (('per-call', per_call_listening), ('session', session_listening)):
+            total, dead_time, heard = run(path, args.turns)
+            print(f"{name:>8}: {total:5.2f} s wall | {dead_time:5.2f} s calibrating | "
+                  f"{len(heard)}/{args.turns} answers heard")
+
+
+if __name__ == "__main__":
+    main()
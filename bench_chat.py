@@ -0,0 +1,339 @@
+"""
+Offline load test of the /chat pipeline with fake Gemini, gTTS and translation backends.
+
+Replays a question corpus against the Flask app at a fixed concurrency and
+reports p50/p95/p99 latency, requests per second and per-request memory for
+each resolution path (eligibility / kb / llm). With --stream requests go to
+/chat/stream instead and the time to first byte is reported too. Results
+can be saved as JSON and compared with an earlier run to catch regressions
+between commits.
+
+Usage: python bench_chat.py [--requests 2000] [--concurrency 8] [--stream]
+           [--llm-latency lognormal:0.8:0.4] [--tts-latency uniform:0.2:0.5]
+           [--corpus questions.jsonl] [--output bench_chat.json] [--baseline old.json]
+
+Latencies are fixed seconds or latency_sampler specs (see fake_backends).
+A corpus is JSONL with a "message" field per line, or plain text with one
+question per line; by default one is generated from knowledge_base.json.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from audio_store import AudioStore
+from fake_backends import FakeGenerativeModel, FakeTTS, FakeTranslator, latency_sampler
+from lang_id import LanguageIdentifier
+from llm_cache import LLMCache
+
+
+OFF_KB_TOPICS = ["robotics club", "alumni network", "hackathons", "sports facilities", "research labs",
+                 "industry visits", "library timings", "student exchange", "startup incubation", "NSS activities"]
+
+
+def generate_corpus(knowledge_base, rules, size, mix, seed=0):
+    """(message, expected path) pairs drawn from KB patterns, eligibility questions and off-KB questions."""
+    rng = random.Random(seed)
+    patterns = [pattern for intent in knowledge_base['intents'] for pattern in intent['patterns']]
+    courses = [alias for rule in rules.values() for alias in rule['aliases'][:2]]
+    makers = {
+        'kb': lambda: rng.choice(patterns),
+        'eligibility': lambda: f"I scored {rng.randint(55, 99)}% in 12th, am I eligible for {rng.choice(courses)}?",
+        # A small topic space, so repeated questions exercise the AI answer cache too.
+        'llm': lambda: f"Tell me about {rng.choice(OFF_KB_TOPICS)} for {rng.choice(['first', 'second', 'final'])} years",
+    }
+    paths, weights = zip(*mix.items())
+    return [(makers[path](), path) for path in rng.choices(paths, weights=weights, k=size)]
+
+
+def load_corpus(path):
+    messages = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                line = record.get('message') or record.get('question') or ''
+            if line:
+                messages.append((line, None))
+    return messages
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        path, _, weight = part.partition('=')
+        mix[path.strip()] = float(weight)
+    return mix
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_app(args, audio_dir):
+    """Imports app.py with its Google backends replaced by fakes."""
+    os.environ.setdefault("KB_HOT_RELOAD", "0")
+    os.environ.setdefault("METRICS_SLOW_MS", str(10 ** 9))
+    import app
+    import audio_cache
+    import multi_language
+
+    app.model = FakeGenerativeModel(latency=latency_sampler(args.llm_latency, args.seed))
+    audio_cache.gTTS = FakeTTS(latency=latency_sampler(args.tts_latency, args.seed + 1))
+    # /chat itself doesn't translate (bundled answers are prebuilt); anything that does gets the fake.
+    multi_language._service = multi_language.TranslationService(
+        FakeTranslator(latency=latency_sampler(args.translate_latency, args.seed + 2)), db_path=None)
+    # Importing app started the store's sweeper on the real static/audio
+    app.audio_store.stop()
+    reset_caches(app, audio_dir)
+    return app
+
+
+def reset_caches(app, audio_dir):
+    """
+    Empty answer, language and audio caches (audio under `audio_dir`), so
+    the first time each question is asked or spoken it pays for it again.
+    """
+    app.llm_cache = LLMCache(max_entries=app.llm_cache.max_entries, ttl_seconds=app.llm_cache.ttl_seconds,
+                             normalizer=app.llm_cache.normalizer)
+    app.lang_id = LanguageIdentifier(cache_size=int(os.getenv("LANG_ID_CACHE_SIZE", "4096")))
+    app.metrics.expose_cache('llm', app.llm_cache.stats)
+    app.metrics.expose_cache('lang_id', lambda: app.lang_id.stats()['detector_cache'])
+    os.makedirs(audio_dir, exist_ok=True)
+    app.audio_store = AudioStore(audio_dir)
+    app.audio_cache.directory = audio_dir
+    app.audio_cache.store = app.audio_store
+
+
+class Recorder:
+    """Collects (path, client latency, time to first byte) per request; the path comes from app.metrics."""
+
+    def __init__(self, app):
+        self._local = threading.local()
+        self.results = []
+        self.errors = 0
+        self._lock = threading.Lock()
+        app.metrics.add_listener(self._on_request)
+
+    def _on_request(self, trace, seconds):
+        # The test client runs the request (and iterates a streamed body) on the calling thread.
+        self._local.path = trace.labels.get('path', 'none')
+
+    def run(self, client, message, async_audio, stream=False):
+        self._local.path = 'none'
+        started_at = time.perf_counter()
+        first_byte, failed = None, False
+        if stream:
+            response = client.post('/chat/stream', json={'message': message}, buffered=False)
+            for chunk in response.response:
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started_at
+                failed = failed or b'event: error' in chunk
+            response.close()
+        else:
+            response = client.post('/chat', json={'message': message, 'async_audio': async_audio})
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            if response.status_code != 200 or failed:
+                self.errors += 1
+            self.results.append((self._local.path, elapsed, first_byte))
+        return self._local.path
+
+
+def replay(app, recorder, corpus, concurrency, async_audio, stream=False):
+    """Closed-loop replay: `concurrency` workers each send their next request as soon as one finishes."""
+    queue = iter(corpus)
+    lock = threading.Lock()
+
+    def worker():
+        client = app.app.test_client()
+        while True:
+            with lock:
+                item = next(queue, None)
+            if item is None:
+                return
+            recorder.run(client, item[0], async_audio, stream)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started_at
+
+
+def memory_per_path(app, corpus, samples, async_audio, stream=False):
+    """
+    Peak Python allocations (KiB) per request, measured sequentially under
+    tracemalloc. Run it on cold caches: a cache hit allocates next to nothing.
+    """
+    client = app.app.test_client()
+    recorder = Recorder(app)
+    peaks = {}
+    seen = {}
+    tracemalloc.start()
+    try:
+        for message, _ in corpus:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            path = recorder.run(client, message, async_audio, stream)
+            if seen.get(path, 0) >= samples:
+                continue
+            seen[path] = seen.get(path, 0) + 1
+            peaks.setdefault(path, []).append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+            if len(seen) >= 3 and all(count >= samples for count in seen.values()):
+                break
+    finally:
+        tracemalloc.stop()
+    return {path: {'mean_kib': statistics.mean(values), 'max_kib': max(values)} for path, values in peaks.items()}
+
+
+def summarize(results, wall_seconds):
+    by_path = {}
+    for path, elapsed, first_byte in results:
+        by_path.setdefault(path, []).append((elapsed, first_byte))
+    by_path['all'] = [(elapsed, first_byte) for _, elapsed, first_byte in results]
+    summary = {}
+    for path, samples in by_path.items():
+        values = [elapsed for elapsed, _ in samples]
+        summary[path] = {
+            'requests': len(values),
+            'rps': len(values) / wall_seconds if wall_seconds else 0.0,
+            'mean_ms': statistics.mean(values) * 1000,
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+        }
+        first_bytes = [first_byte for _, first_byte in samples if first_byte is not None]
+        if first_bytes:
+            summary[path].update(ttfb_p50_ms=percentile(first_bytes, 0.50) * 1000,
+                                 ttfb_p95_ms=percentile(first_bytes, 0.95) * 1000)
+    return summary
+
+
+def print_report(report, baseline=None):
+    streamed = report['config'].get('stream')
+    print(f"{'path':<12}{'requests':>9}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'mem KiB':>9}"
+          + (f"{'ttfb p50':>10}{'ttfb p95':>10}" if streamed else ""))
+    for path, stats in sorted(report['paths'].items()):
+        memory = report['memory'].get(path, {}).get('mean_kib')
+        print(f"{path:<12}{stats['requests']:>9}{stats['rps']:>9.1f}{stats['p50_ms']:>9.1f}"
+              f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{'' if memory is None else f'{memory:.0f}':>9}"
+              + (f"{stats.get('ttfb_p50_ms', 0):>10.1f}{stats.get('ttfb_p95_ms', 0):>10.1f}" if streamed else ""))
+    print(f"Errors: {report['errors']}; max RSS {report['max_rss_mib']:.0f} MiB; "
+          f"fake upstream calls: {report['upstream_calls']}")
+
+    if baseline:
+        print(f"\nChange vs. baseline ({baseline.get('revision') or 'unknown revision'}):")
+        for path, stats in sorted(report['paths'].items()):
+            old = baseline.get('paths', {}).get(path)
+            if not old:
+                continue
+            deltas = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'ttfb_p95_ms'):
+                if old.get(key) and key in stats:
+                    deltas.append(f"{key} {(stats[key] - old[key]) / old[key] * 100:+.1f}%")
+            print(f"  {path:<12}" + ", ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=50, help='requests sent before measuring')
+    parser.add_argument('--corpus', help='JSONL ("message" field) or one question per line')
+    parser.add_argument('--mix', default='kb=0.7,eligibility=0.1,llm=0.2',
+                        help='path weights for the generated corpus')
+    parser.add_argument('--llm-latency', default='lognormal:0.8:0.4', help='fake Gemini latency (s or spec)')
+    parser.add_argument('--tts-latency', default='uniform:0.2:0.5', help='fake gTTS latency (s or spec)')
+    parser.add_argument('--translate-latency', default='0.1', help='fake translation latency (s or spec)')
+    parser.add_argument('--async-audio', action='store_true', help='send async_audio requests')
+    parser.add_argument('--stream', action='store_true', help='replay against /chat/stream (SSE) instead of /chat')
+    parser.add_argument('--memory-samples', type=int, default=20, help='requests per path measured for memory')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='earlier --output file to compare against')
+    parser.add_argument('--verbose', action='store_true', help="keep the app's per-request logging")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        with open('knowledge_base.json', 'r', encoding='utf-8') as f:
+            knowledge_base = json.load(f)
+        with open('admission_rules.json', 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+        corpus = generate_corpus(knowledge_base, rules, args.requests + args.warmup, parse_mix(args.mix), args.seed)
+    if not corpus:
+        sys.exit("Empty corpus.")
+    # Replay a user-supplied corpus as many times as needed.
+    corpus = [corpus[i % len(corpus)] for i in range(args.requests + args.warmup)]
+
+    with tempfile.TemporaryDirectory() as audio_dir:
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+        with quiet:
+            app = load_app(args, os.path.join(audio_dir, 'warmup'))
+            recorder = Recorder(app)
+            # Absorbs one-time initialization, which would otherwise land in the first measured request
+            replay(app, recorder, corpus[:args.warmup], args.concurrency, args.async_audio, args.stream)
+            reset_caches(app, os.path.join(audio_dir, 'memory'))
+            memory = memory_per_path(app, corpus, args.memory_samples, args.async_audio, args.stream)
+            # The replay warms its own empty caches, so its numbers don't depend on the memory pass
+            reset_caches(app, os.path.join(audio_dir, 'replay'))
+            replay(app, recorder, corpus[:args.warmup], args.concurrency, args.async_audio, args.stream)
+            recorder.results, recorder.errors = [], 0
+            wall_seconds = replay(app, recorder, corpus[args.warmup:], args.concurrency, args.async_audio,
+                                  args.stream)
+            # Let async audio jobs finish before their directory is deleted
+            app.tts_jobs.shutdown(wait=True)
+
+        import audio_cache
+        report = {
+            'revision': git_revision(),
+            'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline', 'verbose')},
+            'wall_seconds': wall_seconds,
+            'errors': recorder.errors,
+            'paths': summarize(recorder.results, wall_seconds),
+            'memory': memory,
+            'max_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'upstream_calls': {'llm': app.model.calls, 'tts': audio_cache.gTTS.calls},
+        }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
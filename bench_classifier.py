@@ -0,0 +1,75 @@
+"""
+Benchmark Chatbot classifier backends on knowledge_base.json: training time,
+per-query latency, accuracy and how often confidence clears the threshold.
+
+Usage: python bench_classifier.py [--repeat 20]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from chatbot_core import CLASSIFIERS, Chatbot
+
+
+def variants(pattern):
+    """The pattern as typed plus a few cheap rewordings."""
+    bare = pattern.rstrip('?.!')
+    return [pattern, bare.lower(), bare.upper() + '?', f"please {bare.lower()}"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--knowledge-base', default='knowledge_base.json')
+    parser.add_argument('--repeat', type=int, default=20, help='timing passes over the query set')
+    args = parser.parse_args()
+
+    with open(args.knowledge_base, 'r', encoding='utf-8') as f:
+        intents = json.load(f)['intents']
+    labelled = [(q, intent['tag']) for intent in intents for p in intent['patterns'] for q in variants(p)]
+    queries = [q for q, _ in labelled]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in CLASSIFIERS:
+            start = time.perf_counter()
+            bot = Chatbot(args.knowledge_base, artifact_dir=os.path.join(tmp, backend), classifier=backend)
+            train_time = time.perf_counter() - start
+
+            processed = [" ".join(bot._preprocess_text(q)) for q in queries]
+            timings = []
+            for _ in range(args.repeat):
+                for text in processed:
+                    start = time.perf_counter()
+                    bot._predict_proba([text])
+                    timings.append(time.perf_counter() - start)
+
+            probabilities = bot._predict_proba(processed)
+            predicted = bot.model.classes_[probabilities.argmax(axis=1)]
+            confidence = probabilities.max(axis=1)
+            correct = sum(p == tag for p, (_, tag) in zip(predicted, labelled))
+            confident = int((confidence >= bot.confidence_threshold).sum())
+
+            results[backend] = {
+                'train_s': train_time,
+                'query_us': statistics.median(timings) * 1e6,
+                'accuracy': correct / len(labelled),
+                'confident': confident / len(labelled),
+            }
+            if bot.pipeline is not None and bot.model is not bot.pipeline:
+                reference = bot.pipeline.predict_proba(processed)
+                results[backend]['max_proba_diff_vs_sklearn'] = float(abs(reference - probabilities).max())
+
+    print(f"Queries: {len(queries)} ({len(intents)} intents)")
+    for backend, r in results.items():
+        line = (f"{backend:>7}: train {r['train_s'] * 1000:8.1f} ms | query {r['query_us']:7.1f} us | "
+                f"accuracy {r['accuracy']:.1%} | confident@threshold {r['confident']:.1%}")
+        if 'max_proba_diff_vs_sklearn' in r:
+            line += f" | max |p - sklearn| {r['max_proba_diff_vs_sklearn']:.1e}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Cold-start benchmark: time from a fresh interpreter to the first Chatbot answer,
+per classifier backend, with the model artifact already on disk.
+
+Usage: python bench_cold_start.py [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from chatbot_core import Chatbot
+imported = time.perf_counter()
+bot = Chatbot(classifier=sys.argv[1])
+ready = time.perf_counter()
+bot.get_response("What courses do you offer?")
+answered = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'init_ms': (ready - imported) * 1000,
+    'first_answer_ms': (answered - ready) * 1000,
+    'total_ms': (answered - start) * 1000,
+    'sklearn_imported': 'sklearn' in sys.modules,
+}))
+"""
+
+
+def probe(classifier):
+    output = subprocess.run([sys.executable, '-c', PROBE, classifier],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    for classifier in ('svc', 'linear'):
+        probe(classifier)  # Make sure the artifact exists before timing.
+        runs = [probe(classifier) for _ in range(args.runs)]
+        summary = {key: statistics.median(r[key] for r in runs)
+                   for key in ('import_ms', 'init_ms', 'first_answer_ms', 'total_ms')}
+        print(f"{classifier:>7}: import {summary['import_ms']:6.0f} ms | Chatbot() {summary['init_ms']:6.0f} ms | "
+              f"first answer {summary['first_answer_ms']:6.1f} ms | total {summary['total_ms']:6.0f} ms | "
+              f"sklearn imported: {runs[-1]['sklearn_imported']}")
+
+
+if __name__ == "__main__":
+    main()
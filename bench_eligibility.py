@@ -0,0 +1,107 @@
+"""
+Micro-benchmark: compiled alias regex vs. the original nested alias scan in
+eligibility_checker.extract_course_and_marks, on a synthetic rules file.
+
+Usage: python bench_eligibility.py [--programmes 5000] [--aliases 4] [--queries 2000]
+"""
+import argparse
+import json
+import os
+import random
+import string
+import tempfile
+import time
+
+import eligibility_checker
+from eligibility_checker import compile_aliases, extract_course_and_marks, load_rules
+
+
+def linear_extract(rules, user_input):
+    """The original course lookup (plain substrings), kept here as the baseline."""
+    user_input = user_input.lower().strip()
+    for course_key, details in rules.items():
+        for alias in details["aliases"]:
+            if alias.lower() in user_input:
+                return course_key
+    return None
+
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+
+def build_synthetic_rules(programmes, aliases_per_programme, rng):
+    rules = {}
+    for i in range(programmes):
+        name = " ".join(random_word(rng) for _ in range(rng.randint(2, 4)))
+        aliases = {name, name.split()[0]} | {
+            " ".join(random_word(rng) for _ in range(rng.randint(1, 3)))
+            for _ in range(aliases_per_programme)
+        }
+        rules[f"Programme {i}: {name.title()}"] = {
+            "aliases": sorted(aliases),
+            "min_marks": rng.randint(50, 95),
+            "notes": "Synthetic programme.",
+        }
+    return rules
+
+
+def build_queries(rules, query_count, rng):
+    courses = list(rules.values())
+    queries = []
+    for _ in range(query_count):
+        filler = " ".join(random_word(rng) for _ in range(8))
+        if rng.random() < 0.7:
+            alias = rng.choice(rng.choice(courses)["aliases"])
+            queries.append(f"Am I eligible for {alias.upper()} with {rng.randint(40, 99)}%? {filler}")
+        else:
+            queries.append(f"{filler} {rng.randint(40, 99)}%")
+    return queries
+
+
+def time_it(func, queries):
+    start = time.perf_counter()
+    results = [func(q) for q in queries]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--programmes', type=int, default=5000)
+    parser.add_argument('--aliases', type=int, default=4, help='extra random aliases per programme')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    synthetic = build_synthetic_rules(args.programmes, args.aliases, rng)
+    queries = build_queries(synthetic, args.queries, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'admission_rules.json')
+        with open(path, 'w') as f:
+            json.dump(synthetic, f)
+        rules = load_rules(path)
+
+    alias_count = sum(len(d["aliases"]) for d in rules.values())
+    start = time.perf_counter()
+    compile_aliases(rules)
+    build_time = time.perf_counter() - start
+
+    linear_time, linear_results = time_it(lambda q: linear_extract(rules, q), queries)
+    extract_course_and_marks(queries[0], rules)  # Compile once, as a rules (re)load does.
+    compiled_time, compiled_results = time_it(lambda q: extract_course_and_marks(q, rules)[0], queries)
+    # Same rules object -> the cached pattern is reused, not rebuilt.
+    assert eligibility_checker._alias_index[0] is rules
+
+    differing = sum(1 for a, b in zip(linear_results, compiled_results) if a != b)
+    print(f"Programmes: {len(rules)}, aliases: {alias_count}, queries: {len(queries)}")
+    print(f"Regex build:      {build_time * 1000:.1f} ms (once per rules load)")
+    print(f"Linear scan:      {linear_time / len(queries) * 1e6:.1f} us/query")
+    print(f"Compiled regex:   {compiled_time / len(queries) * 1e6:.1f} us/query")
+    print(f"Speed-up:         {linear_time / compiled_time:.1f}x")
+    print(f"Different courses (substring hits inside words, leftmost vs. file order): {differing}")
+
+
+if __name__ == "__main__":
+    main()
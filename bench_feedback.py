@@ -0,0 +1,86 @@
+"""
+Sustained feedback submission throughput under concurrent writers:
+one connection + commit per submission (default journal) vs. FeedbackStore's
+WAL group commit.
+
+Usage: python bench_feedback.py [--writers 16] [--per-writer 200]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from feedback_store import SCHEMA, FeedbackStore
+
+
+class PerRequestStore:
+    """Baseline: what a straightforward per-request INSERT + COMMIT does."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db = sqlite3.connect(db_path)
+        db.executescript(SCHEMA)
+        db.commit()
+        db.close()
+
+    def submit(self, user_id, message, rating=None):
+        db = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            with db:
+                return db.execute(
+                    "INSERT INTO feedback (created_at, user_id, rating, message) VALUES (?, ?, ?, ?)",
+                    (datetime.datetime.now().isoformat(), user_id, rating, message),
+                ).lastrowid
+        finally:
+            db.close()
+
+
+def run(store, writers, per_writer):
+    latencies = []
+    lock = threading.Lock()
+
+    def writer(number):
+        for i in range(per_writer):
+            started_at = time.perf_counter()
+            store.submit(f"user{number}", f"Feedback {i} from writer {number}: the chatbot was helpful.", i % 5 + 1)
+            with lock:
+                latencies.append(time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(writer, range(writers)))
+    elapsed = time.perf_counter() - started_at
+    latencies.sort()
+    return elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=16)
+    parser.add_argument('--per-writer', type=int, default=200)
+    args = parser.parse_args()
+    total = args.writers * args.per_writer
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = (
+            ('per-request', PerRequestStore(os.path.join(tmp, 'baseline.sqlite3'))),
+            ('group-commit', FeedbackStore(os.path.join(tmp, 'feedback.sqlite3'))),
+        )
+        for name, store in stores:
+            elapsed, latencies = run(store, args.writers, args.per_writer)
+            line = (f"{name:>12}: {total / elapsed:8.0f} submissions/s | p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms"
+                    f" | p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms")
+            if isinstance(store, FeedbackStore):
+                stats = store.stats()
+                line += f" | {stats['rows_per_commit']:.1f} rows/commit"
+                assert stats['rows'] == total
+                store.close()
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
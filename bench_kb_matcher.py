@@ -0,0 +1,88 @@
+"""
+Micro-benchmark: compiled KBMatcher vs. the original nested pattern loop.
+
+Usage: python bench_kb_matcher.py [--patterns 5000] [--queries 2000]
+"""
+import argparse
+import random
+import string
+import time
+
+from kb_matcher import KBMatcher, tokens
+
+
+def linear_match(intents, user_message):
+    """The original /chat lookup (whole words since the exact tier stopped matching inside words), as the baseline."""
+    message = f" {' '.join(tokens(user_message))} "
+    for intent in intents:
+        if any(f" {' '.join(tokens(pattern))} " in message for pattern in intent['patterns']):
+            return intent
+    return None
+
+
+def random_phrase(rng, words=4):
+    return " ".join(
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+        for _ in range(words)
+    )
+
+
+def build_synthetic_kb(pattern_count, patterns_per_intent, rng):
+    intents = []
+    for start in range(0, pattern_count, patterns_per_intent):
+        count = min(patterns_per_intent, pattern_count - start)
+        intents.append({
+            'tag': f'intent_{len(intents)}',
+            'patterns': [random_phrase(rng, rng.randint(2, 5)) for _ in range(count)],
+            'responses': ['synthetic'],
+        })
+    return intents
+
+
+def build_queries(intents, query_count, rng):
+    queries = []
+    for _ in range(query_count):
+        if rng.random() < 0.5:
+            pattern = rng.choice(rng.choice(intents)['patterns'])
+            queries.append(f"could you tell me {pattern.upper()} please?")
+        else:
+            queries.append(random_phrase(rng, 10))
+    return queries
+
+
+def time_it(func, queries):
+    start = time.perf_counter()
+    results = [func(q) for q in queries]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--patterns', type=int, default=5000)
+    parser.add_argument('--per-intent', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    intents = build_synthetic_kb(args.patterns, args.per_intent, rng)
+    queries = build_queries(intents, args.queries, rng)
+
+    start = time.perf_counter()
+    matcher = KBMatcher(intents)
+    build_time = time.perf_counter() - start
+
+    linear_time, linear_results = time_it(lambda q: linear_match(intents, q), queries)
+    compiled_time, compiled_results = time_it(matcher.match, queries)
+
+    mismatches = sum(1 for a, b in zip(linear_results, compiled_results) if a is not b)
+    print(f"Intents: {len(intents)}, patterns: {matcher.pattern_count}, queries: {len(queries)}")
+    print(f"Automaton build:  {build_time * 1000:.1f} ms (once per KB load)")
+    print(f"Linear loop:      {linear_time / len(queries) * 1e6:.1f} us/query")
+    print(f"Compiled matcher: {compiled_time / len(queries) * 1e6:.1f} us/query")
+    print(f"Speed-up:         {linear_time / compiled_time:.1f}x")
+    print(f"Result mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Offline benchmark of the AI fallback answer cache against a fake Gemini model.
+
+Usage: python bench_llm_cache.py [--requests 2000] [--threads 8] [--latency 0.2]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_backends import FakeGenerativeModel
+from llm_cache import LLMCache, normalize_question
+
+
+def reworded(pattern, rng):
+    """Cheap paraphrases a student might type: case, punctuation, filler."""
+    text = pattern.rstrip('?.!')
+    variants = [text, text.lower(), text.upper(), f"{text}?", f"{text}??", f"please, {text.lower()}", f"{text} !"]
+    return rng.choice(variants)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2, help='fake model latency in seconds')
+    parser.add_argument('--db', default=None, help='optional SQLite path to persist the cache')
+    parser.add_argument('--no-lemmatize', action='store_true', help='skip NLTK lemmatization in the key')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.no_lemmatize:
+        normalizer = normalize_question
+    else:
+        from chatbot_core import preprocess_text
+        normalizer = lambda q: normalize_question(q, preprocess_text)
+
+    with open('knowledge_base.json', 'r', encoding='utf-8') as f:
+        patterns = [p for intent in json.load(f)['intents'] for p in intent['patterns']]
+
+    rng = random.Random(args.seed)
+    questions = [reworded(rng.choice(patterns), rng) for _ in range(args.requests)]
+
+    model = FakeGenerativeModel(latency=args.latency, jitter=args.latency / 4)
+    cache = LLMCache(max_entries=4096, db_path=args.db, normalizer=normalizer)
+
+    def ask(question):
+        start = time.perf_counter()
+        _, cached = cache.get_or_generate(question, 'bench', lambda: model.generate_content(question).text)
+        return time.perf_counter() - start, cached
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(ask, questions))
+    elapsed = time.perf_counter() - start
+
+    hit_latencies = [t for t, cached in results if cached]
+    miss_latencies = [t for t, cached in results if not cached]
+    stats = cache.stats()
+    print(f"Requests: {len(questions)}, threads: {args.threads}, wall time: {elapsed:.2f} s")
+    print(f"Upstream calls: {model.calls} (uncached baseline would make {len(questions)})")
+    print(f"Cache: {stats}")
+    if hit_latencies:
+        print(f"Hit latency:  median {statistics.median(hit_latencies) * 1000:.3f} ms")
+    if miss_latencies:
+        print(f"Miss latency: median {statistics.median(miss_latencies) * 1000:.1f} ms")
+    print(f"Estimated uncached wall time: {len(questions) * args.latency / args.threads:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Per-query text preprocessing time: original NLTK pipeline vs. the fast path
+(regex tokenizer + memoized lemmas) in chatbot_core.preprocess_text.
+
+Usage: python bench_preprocess.py [--repeat 50]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import nltk
+from nltk.stem import WordNetLemmatizer
+
+import chatbot_core
+
+
+def original_preprocess(lemmatizer, text):
+    """The pre-optimization Chatbot._preprocess_text."""
+    tokens = nltk.word_tokenize(text.lower())
+    return [lemmatizer.lemmatize(word) for word in tokens]
+
+
+def per_query_us(func, queries, repeat):
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            func(query)
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6, statistics.mean(timings) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with open('knowledge_base.json', 'r', encoding='utf-8') as f:
+        intents = json.load(f)['intents']
+    queries = [p for intent in intents for p in intent['patterns']]
+    queries += [q.lower().rstrip('?.!') for q in queries]
+
+    # Cold start: the first lemmatize call loads WordNet.
+    start = time.perf_counter()
+    chatbot_core.warm_up(queries)
+    print(f"warm_up(): {(time.perf_counter() - start) * 1000:.0f} ms (paid once at startup)")
+
+    lemmatizer = WordNetLemmatizer()
+    mismatches = sum(original_preprocess(lemmatizer, q) != chatbot_core.preprocess_text(q) for q in queries)
+    fast = sum(chatbot_core._fast_tokenize(q.lower()) is not None for q in queries)
+
+    before = per_query_us(lambda q: original_preprocess(lemmatizer, q), queries, args.repeat)
+    after = per_query_us(chatbot_core.preprocess_text, queries, args.repeat)
+
+    print(f"Queries: {len(queries)}, fast-path eligible: {fast}, output mismatches: {mismatches}")
+    print(f"Before: median {before[0]:.1f} us, mean {before[1]:.1f} us")
+    print(f"After:  median {after[0]:.1f} us, mean {after[1]:.1f} us")
+    print(f"Lemma cache: {chatbot_core._lemmatize.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
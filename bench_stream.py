@@ -0,0 +1,51 @@
+"""
+Offline time-to-first-byte comparison: streamed (SSE) vs. blocking AI answers.
+
+Usage: python bench_stream.py [--runs 20] [--latency 0.4] [--token-latency 0.03]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from chat_stream import model_token_stream, stream_chat_events
+from fake_backends import FakeGenerativeModel
+
+
+ANSWER = ("Erode Sengunthar Engineering College offers B.E. and B.Tech programmes. "
+          "Admissions follow the TNEA counselling process. "
+          "Please contact the admissions office for the latest fee details.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.4, help='fake time to first token (s)')
+    parser.add_argument('--token-latency', type=float, default=0.03, help='fake time per further token (s)')
+    args = parser.parse_args()
+
+    model = FakeGenerativeModel(latency=args.latency, token_latency=args.token_latency,
+                                answer=lambda prompt: ANSWER)
+
+    blocking, streamed_ttfb, streamed_total = [], [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        # Blocking path: the whole answer is generated before the first byte.
+        "".join(model_token_stream(model, "prompt"))
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for event in stream_chat_events(model_token_stream(model, "prompt"), started_at=start):
+            if event.startswith("event: done"):
+                done = json.loads(event.split("data: ", 1)[1])
+                streamed_ttfb.append(done['ttfb_ms'] / 1000)
+                streamed_total.append(done['total_ms'] / 1000)
+
+    print(f"Runs: {args.runs}")
+    print(f"Blocking TTFB:   median {statistics.median(blocking) * 1000:.0f} ms")
+    print(f"Streaming TTFB:  median {statistics.median(streamed_ttfb) * 1000:.0f} ms")
+    print(f"Streaming total: median {statistics.median(streamed_total) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
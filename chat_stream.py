@@ -0,0 +1,119 @@
+import json
+import re
+import time
+
+
+SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+
+
+def sse_event(event, data):
+    """Formats one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def model_token_stream(model, prompt):
+    """Yields text fragments from a Gemini-style model called with stream=True."""
+    for chunk in model.generate_content(prompt, stream=True):
+        text = getattr(chunk, 'text', '')
+        if text:
+            yield text
+
+
+class SentenceSplitter:
+    """Accumulates streamed fragments and releases complete sentences."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, fragment):
+        self._buffer += fragment
+        parts = SENTENCE_END.split(self._buffer)
+        self._buffer = parts.pop()
+        return [p.strip() for p in parts if p.strip()]
+
+    def flush(self):
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class ChatEvents:
+    """
+    Incremental SSE encoding of one streamed reply: token() per fragment
+    returns its event plus the sentences it completed, audio() the event
+    for the next sentence's TTS job, flush() the trailing sentence and
+    done() the final event. stream_chat_events() drives it for blocking
+    iterators; the ASGI app drives it from async code.
+    """
+
+    def __init__(self, started_at=None, extra=None):
+        self.started_at = started_at or time.perf_counter()
+        self.extra = extra or {}
+        self.parts = []
+        self.ttfb = None
+        self._splitter = SentenceSplitter()
+        self._sentence_index = 0
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+    def token(self, fragment):
+        """Returns (token event, sentences completed by this fragment)."""
+        if self.ttfb is None:
+            self.ttfb = time.perf_counter() - self.started_at
+        self.parts.append(fragment)
+        return sse_event('token', {'text': fragment}), self._splitter.feed(fragment)
+
+    def flush(self):
+        return self._splitter.flush()
+
+    def audio(self, job_id):
+        """The 'audio' event for the next sentence, or None when it got no TTS job."""
+        index, self._sentence_index = self._sentence_index, self._sentence_index + 1
+        if not job_id:
+            return None
+        return sse_event('audio', {'index': index, 'audio_job': job_id, 'audio_status_url': f'/audio/{job_id}'})
+
+    def done(self, **extra):
+        total = time.perf_counter() - self.started_at
+        done = {
+            'response': self.text,
+            'ttfb_ms': round((self.ttfb if self.ttfb is not None else total) * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+        }
+        done.update(self.extra, **extra)
+        print(f"⏱️ Stream TTFB {done['ttfb_ms']} ms, total {done['total_ms']} ms")
+        return sse_event('done', done)
+
+
+def stream_chat_events(tokens, started_at=None, submit_audio=None, on_complete=None, extra=None):
+    """
+    Turns a token iterator into SSE strings.
+
+    Emits a 'token' event per fragment, an 'audio' event per completed
+    sentence when `submit_audio(sentence)` returns a job id, then a 'done'
+    event with the full text and the time-to-first-byte. `tokens` can be
+    any iterator (the real model, a fake one, or a single cached string).
+    """
+    events = ChatEvents(started_at, extra)
+
+    def audio_events(sentences):
+        for sentence in sentences:
+            event = events.audio(submit_audio(sentence) if submit_audio else None)
+            if event:
+                yield event
+
+    try:
+        for fragment in tokens:
+            event, sentences = events.token(fragment)
+            yield event
+            yield from audio_events(sentences)
+        yield from audio_events(events.flush())
+    except Exception as e:
+        print(f"🔴 Error while streaming response: {e}")
+        yield sse_event('error', {'message': 'Internal error'})
+        return
+
+    if on_complete:
+        on_complete(events.text)
+    yield events.done()
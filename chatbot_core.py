@@ -1,30 +1,128 @@
 import json
 import random
-import nltk
-from nltk.stem import WordNetLemmatizer
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.svm import SVC
-from sklearn.pipeline import Pipeline
-import pickle
-import os
-
-# Download NLTK data (run once)
-# This block checks if NLTK data is downloaded and gets it if it's missing.
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    print("Wordnet resource not found. Downloading...")
-    nltk.download('wordnet')
-    print("Download complete.")
+import re
+import functools
+from model_artifacts import LinearTfidfModel, load_artifact, make_stamp, save_artifact
+
+# NLTK, NumPy and scikit-learn are imported lazily, where they are first
+# needed: importing this module stays cheap, and a worker that finds a
+# 'linear' model artifact on disk never imports scikit-learn at all.
+
+def ensure_nltk_data():
+    """Checks that the NLTK data we use is downloaded and gets it if missing."""
+    import nltk
+    for resource, package in (('corpora/wordnet', 'wordnet'), ('tokenizers/punkt_tab', 'punkt_tab')):
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            print(f"{package} resource not found. Downloading...")
+            nltk.download(package)
+            print("Download complete.")
+
+_lemmatizer = None
+
+def _get_lemmatizer():
+    global _lemmatizer
+    if _lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = WordNetLemmatizer()
+    return _lemmatizer
+
+# Fast tokenizer path. Lowercased text made only of ASCII letters, digits,
+# whitespace, ? ! , and at most one trailing period tokenizes exactly as
+# nltk.word_tokenize does with this regex, without running Punkt/Treebank.
+# Anything else (apostrophes, hyphens, abbreviations, non-English scripts)
+# goes through NLTK. warm_up() re-checks the equivalence on our corpus.
+_SIMPLE_TEXT = re.compile(r"[a-z0-9\s?!,]*\.?\s*")
+# NLTK keeps a comma glued to a following digit ("1,000", "fees,2024") and
+# to the second of two commas (",,a" -> [',', ',a'])
+_DIGIT_COMMA = re.compile(r",[\d,]")
+_FAST_TOKEN = re.compile(r"[a-z0-9]+|[?!,.]")
+# Words the Treebank tokenizer splits even without punctuation
+_TREEBANK_SPLIT_WORDS = frozenset(['cannot', 'gimme', 'gonna', 'gotta', 'lemme', 'wanna', 'whaddya', 'whatcha'])
+_fast_tokenizer_enabled = True
+
+LEMMA_CACHE_SIZE = 50000
+
+@functools.lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def _lemmatize(word):
+    return _get_lemmatizer().lemmatize(word)
+
+def _fast_tokenize(text):
+    """Returns regex tokens for simple lowercased text, or None if NLTK is needed."""
+    if not _SIMPLE_TEXT.fullmatch(text) or _DIGIT_COMMA.search(text):
+        return None
+    tokens = _FAST_TOKEN.findall(text)
+    if _TREEBANK_SPLIT_WORDS.intersection(tokens):
+        return None
+    return tokens
+
+def tokenize(text):
+    """Lowercases and tokenizes text like nltk.word_tokenize, fast path first."""
+    text = text.lower()
+    if _fast_tokenizer_enabled:
+        tokens = _fast_tokenize(text)
+        if tokens is not None:
+            return tokens
+    import nltk
+    return nltk.word_tokenize(text)
+
+def preprocess_text(text):
+    """Tokenizes, lowercases, and lemmatizes the input text."""
+    return [_lemmatize(word) for word in tokenize(text)]
+
+def warm_up(corpus=()):
+    """
+    Loads WordNet and the Punkt tokenizer now instead of on the first
+    request, and disables the fast tokenizer if it disagrees with
+    nltk.word_tokenize on any text in `corpus`.
+    """
+    global _fast_tokenizer_enabled
+    import nltk
+    from nltk.corpus import wordnet
+    ensure_nltk_data()
+    wordnet.ensure_loaded()
+    _lemmatize('warming')
+    nltk.word_tokenize("Warm up.")
+
+    for text in corpus:
+        text = text.lower()
+        fast = _fast_tokenize(text)
+        if fast is not None and fast != nltk.word_tokenize(text):
+            print(f"Fast tokenizer disagrees with NLTK on {text!r}; using NLTK only.")
+            _fast_tokenizer_enabled = False
+            break
+
+# Intent classifier backends. 'svc' is the original Platt-scaled SVM; 'linear'
+# is multinomial logistic regression, whose probabilities come from a single
+# sparse TF-IDF x dense weight product followed by a softmax.
+def _svc_classifier():
+    from sklearn.svm import SVC
+    return SVC(kernel='linear', probability=True) # probability=True for confidence scores
+
+def _linear_classifier():
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(C=100.0, max_iter=2000)
+
+CLASSIFIERS = {
+    'svc': _svc_classifier,
+    'linear': _linear_classifier,
+}
 
 class Chatbot:
-    def __init__(self, knowledge_base_path='knowledge_base.json', model_path='chatbot_model.pkl'):
+    def __init__(self, knowledge_base_path='knowledge_base.json', artifact_dir='model_artifacts', confidence_threshold=0.70, classifier='svc', intents=None):
+        if classifier not in CLASSIFIERS:
+            raise ValueError(f"Unknown classifier '{classifier}'. Choose one of: {', '.join(CLASSIFIERS)}")
         self.knowledge_base_path = knowledge_base_path
-        self.model_path = model_path
-        self.intents = self._load_knowledge_base()
-        self.lemmatizer = WordNetLemmatizer()
-        self.model = None
-        self.vectorizer = None # Store vectorizer separately if needed for prediction
+        self.artifact_dir = artifact_dir
+        self.classifier = classifier
+        self.confidence_threshold = confidence_threshold # Adjust as needed
+        # Callers that already parsed the knowledge base pass its intents in
+        self.intents = self._load_knowledge_base() if intents is None else intents
+        self.model = None # Anything with predict_proba() and classes_
+        self.pipeline = None # The sklearn Pipeline, only when trained in this process
+        warm_up(pattern for intent in self.intents for pattern in intent['patterns'])
+        self.lemmatizer = _get_lemmatizer()
         self._train_model()
 
     def _load_knowledge_base(self):
@@ -41,16 +139,17 @@ class Chatbot:
 
     def _preprocess_text(self, text):
         """Tokenizes, lowercases, and lemmatizes the input text."""
-        tokens = nltk.word_tokenize(text.lower())
-        return [self.lemmatizer.lemmatize(word) for word in tokens]
+        return preprocess_text(text)
 
     def _train_model(self):
-        """Trains the SVM model for intent classification."""
-        if os.path.exists(self.model_path):
-            print("Loading pre-trained model...")
-            with open(self.model_path, 'rb') as file:
-                self.model = pickle.load(file)
-            print("Model loaded successfully.")
+        """
+        Loads the model artifact stamped for the current knowledge base and
+        library versions, or trains and saves a new one on any mismatch.
+        """
+        stamp = make_stamp(self.intents, self.classifier)
+        self.model = load_artifact(self.artifact_dir, stamp)
+        if self.model is not None:
+            print("Loaded pre-trained model matching the current knowledge base.")
             return
 
         print("Training new model...")
@@ -66,44 +165,103 @@ class Chatbot:
             print("No training data found in knowledge base. Cannot train model.")
             return
 
-        # Create a pipeline with TF-IDF vectorizer and SVM classifier
-        self.model = Pipeline([
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.pipeline import Pipeline
+
+        # Create a pipeline with TF-IDF vectorizer and the selected classifier
+        self.pipeline = Pipeline([
             ('tfidf', TfidfVectorizer()),
-            ('svm', SVC(kernel='linear', probability=True)) # probability=True for confidence scores
+            ('svm' if self.classifier == 'svc' else self.classifier, CLASSIFIERS[self.classifier]())
         ])
 
-        self.model.fit(patterns, tags)
+        self.pipeline.fit(patterns, tags)
+        if self.classifier == 'linear':
+            self.model = LinearTfidfModel.from_pipeline(self.pipeline)
+        else:
+            self.model = self.pipeline
 
         # Save the trained model
-        with open(self.model_path, 'wb') as file:
-            pickle.dump(self.model, file)
+        save_artifact(self.artifact_dir, stamp, self.model)
         print("Model trained and saved successfully.")
 
-    def get_response(self, user_input):
+    def _predict_proba(self, processed_inputs):
+        """Class probabilities for already preprocessed input strings."""
+        return self.model.predict_proba(processed_inputs)
+
+    def classify(self, user_input):
         """
-        Predicts the intent of the user input and returns a random response.
+        Predicts the intent of the user input.
+        Returns (tag, confidence), or (None, 0.0) if the model is not trained.
         """
         if not self.model:
-            return "I'm sorry, my model is not trained yet. Please check the knowledge base and try again."
+            return None, 0.0
 
         processed_input = " ".join(self._preprocess_text(user_input))
-        
+
         # Predict the intent and get probabilities
-        probabilities = self.model.predict_proba([processed_input])[0]
+        probabilities = self._predict_proba([processed_input])[0]
         max_prob_index = probabilities.argmax()
-        predicted_tag = self.model.classes_[max_prob_index]
-        confidence = probabilities[max_prob_index]
+        return self.model.classes_[max_prob_index], float(probabilities[max_prob_index])
 
-        # Set a confidence threshold
-        confidence_threshold = 0.70 # Adjust as needed
+    def classify_batch(self, batch):
+        """
+        Vectorized classify(): preprocesses every input, then runs a single
+        predict over the sparse matrix. Returns (tags, confidences) arrays.
+        """
+        import numpy as np
 
-        if confidence < confidence_threshold:
-            return "I'm not sure I understand. Could you please rephrase your question or ask something else?"
+        batch = list(batch)
+        if not self.model or not batch:
+            return np.full(len(batch), None, dtype=object), np.zeros(len(batch))
+
+        processed_inputs = [" ".join(self._preprocess_text(text)) for text in batch]
+        probabilities = self._predict_proba(processed_inputs)
+        best = probabilities.argmax(axis=1)
+        return self.model.classes_[best], probabilities[np.arange(len(batch)), best]
 
+    def get_responses(self, batch):
+        """
+        Batch version of get_response().
+        Returns (tags, confidences, responses) arrays aligned with the input.
+        """
+        import numpy as np
+
+        tags, confidences = self.classify_batch(batch)
+        responses = np.empty(len(tags), dtype=object)
+        for i, (tag, confidence) in enumerate(zip(tags, confidences)):
+            if tag is None:
+                responses[i] = "I'm sorry, my model is not trained yet. Please check the knowledge base and try again."
+            elif confidence < self.confidence_threshold:
+                responses[i] = "I'm not sure I understand. Could you please rephrase your question or ask something else?"
+            else:
+                intent = self.get_intent(tag)
+                responses[i] = random.choice(intent['responses']) if intent else \
+                    "I'm having trouble understanding that. Could you please provide more details?"
+        return tags, confidences, responses
+
+    def get_intent(self, tag):
+        """Returns the knowledge base intent with the given tag, or None."""
         for intent in self.intents:
-            if intent['tag'] == predicted_tag:
-                return random.choice(intent['responses'])
-        
+            if intent['tag'] == tag:
+                return intent
+        return None
+
+    def get_response(self, user_input):
+        """
+        Predicts the intent of the user input and returns a random response.
+        """
+        if not self.model:
+            return "I'm sorry, my model is not trained yet. Please check the knowledge base and try again."
+
+        predicted_tag, confidence = self.classify(user_input)
+
+        if confidence < self.confidence_threshold:
+            return "I'm not sure I understand. Could you please rephrase your question or ask something else?"
+
+        intent = self.get_intent(predicted_tag)
+        if intent:
+            return random.choice(intent['responses'])
+
         # Fallback if for some reason the predicted tag isn't found (shouldn't happen if model is trained well)
         return "I'm having trouble understanding that. Could you please provide more details?"
 
@@ -117,23 +275,3 @@ if __name__ == "__main__":
             break
         response = chatbot.get_response(user_message)
         print(f"Bot: {response}")
-        import openai
-
-openai.api_key = 'YOUR_API_KEY'
-
-def get_ai_response(user_message):
-    system_prompt = """
-    You are 'Erode Sengunthar College Bot', a helpful AI assistant for the Erode Sengunthar Engineering College. 
-    Your goal is to assist users with their questions about the college. 
-    Be friendly and professional. Only answer questions related to courses, fees, placements, campus life, and admission procedures. 
-    If asked about something unrelated, politely state that you can only answer questions about the college.
-    """
-    
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message}
-        ]
-    )
-    return response.choices[0].message.content
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Vectorized admission eligibility for whole spreadsheets of applicants.
+
+Rows need a course (name or alias) and marks; category, JEE score and state
+entrance rank are optional. Input is CSV or JSONL, read in fixed-size
+chunks so memory stays bounded; each output row echoes the input with
+"course_name", "required_marks", "eligible" and "reason" added.
+
+Usage: python eligibility_batch.py applicants.csv [-o results.jsonl] [--chunk-size 50000]
+"""
+import argparse
+import io
+import itertools
+import sys
+
+import numpy as np
+import pandas as pd
+
+import eligibility_checker
+
+
+# Canonical column -> accepted spellings in the uploaded file
+COLUMNS = {
+    'course': ('course', 'programme', 'program'),
+    'marks': ('marks', 'percentage', 'percent'),
+    'category': ('category',),
+    'jee_score': ('jee_score', 'jee'),
+    'state_rank': ('state_rank', 'state_exam_score', 'state_exam_rank'),
+}
+REASONS = np.array(['eligible', 'unknown_course', 'missing_marks', 'below_cutoff', 'exam_requirement'])
+FORMATS = ('csv', 'jsonl')
+
+
+class RuleTable:
+    """
+    admission_rules.json compiled into NumPy arrays: one row per course,
+    column 0 for min_marks and one more per category the rules list a
+    cut-off for, plus the optional entrance exam thresholds.
+    A trailing all-NaN row is what unknown courses (code -1) index into.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.course_names = np.array(list(rules) + [None], dtype=object)
+        self.course_codes = {}  # lowercased course key or alias -> row
+        for row, (course_key, details) in enumerate(rules.items()):
+            for name in [course_key] + details['aliases'] + details.get('exact_aliases', []):
+                self.course_codes.setdefault(name.lower().strip(), row)
+        categories = eligibility_checker.categories(rules)
+        # Any other category (or none) takes column 0, the course's min_marks
+        self.category_codes = {category: column for column, category in enumerate(categories, start=1)}
+
+        self.cutoffs = np.array([
+            [details['min_marks']] + [eligibility_checker.min_marks_for(details, c) for c in categories]
+            for details in rules.values()
+        ] + [[np.nan] * (len(categories) + 1)], dtype=float)
+        self.min_jee = np.array([details.get('min_jee_score', np.nan) for details in rules.values()] + [np.nan],
+                                dtype=float)
+        self.max_rank = np.array([details.get('max_state_rank', np.nan) for details in rules.values()] + [np.nan],
+                                 dtype=float)
+
+    @staticmethod
+    def _codes(column, table, default):
+        # Spreadsheets repeat a handful of courses/categories: normalize the
+        # distinct values once and broadcast back with the factorized codes.
+        codes, uniques = pd.factorize(column)
+        mapped = np.array([table.get(str(value).lower().strip(), default) for value in uniques] + [default])
+        return mapped[codes]  # code -1 (missing value) picks the trailing default
+
+    @staticmethod
+    def _numbers(column):
+        if not pd.api.types.is_numeric_dtype(column):
+            column = column.astype('string').str.replace('%', '', regex=False).str.strip()
+        return pd.to_numeric(column, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    def evaluate(self, frame):
+        """Adds the result columns to `frame` (canonical column names) and returns it."""
+        rows = len(frame)
+        missing = pd.Series([None] * rows, index=frame.index, dtype=object)
+        course = self._codes(frame['course'] if 'course' in frame else missing, self.course_codes, -1)
+        category = self._codes(frame['category'] if 'category' in frame else missing, self.category_codes, 0)
+        marks = self._numbers(frame['marks']) if 'marks' in frame else np.full(rows, np.nan)
+        jee = self._numbers(frame['jee_score']) if 'jee_score' in frame else np.full(rows, np.nan)
+        rank = self._numbers(frame['state_rank']) if 'state_rank' in frame else np.full(rows, np.nan)
+
+        required = self.cutoffs[course, category]
+        min_jee, max_rank = self.min_jee[course], self.max_rank[course]
+        # NaN compares False, so missing scores/thresholds never qualify on their own.
+        needs_exam = ~np.isnan(min_jee) | ~np.isnan(max_rank)
+        exam_ok = ~needs_exam | (jee >= min_jee) | (rank <= max_rank)
+        reason = np.select(
+            [course < 0, np.isnan(marks), ~(marks >= required), ~exam_ok],
+            [1, 2, 3, 4],
+            default=0,
+        )
+
+        frame['course_name'] = self.course_names[course]
+        frame['required_marks'] = required
+        frame['eligible'] = reason == 0
+        frame['reason'] = REASONS[reason]
+        return frame
+
+
+def canonical_columns(frame):
+    """Renames accepted spellings (case-insensitive) to the COLUMNS keys."""
+    renames = {}
+    for column in frame.columns:
+        name = str(column).lower().strip()
+        for canonical, spellings in COLUMNS.items():
+            if name in spellings and canonical not in renames.values():
+                renames[column] = canonical
+    return frame.rename(columns=renames)
+
+
+def read_chunks(source, fmt, chunk_size=50000):
+    """Yields DataFrames of at most chunk_size rows from a CSV or JSONL file object."""
+    if fmt == 'csv':
+        reader = pd.read_csv(source, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+    else:
+        reader = pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    for chunk in reader:
+        yield canonical_columns(chunk)
+
+
+def format_chunk(frame, fmt, header=True):
+    """Serializes one evaluated chunk; CSV repeats the header only when asked."""
+    if fmt == 'csv':
+        return frame.to_csv(index=False, header=header)
+    text = frame.to_json(orient='records', lines=True, force_ascii=False)
+    return text if text.endswith('\n') else text + '\n'
+
+
+def evaluate_stream(source, fmt, rules=None, chunk_size=50000, output_format=None):
+    """
+    Returns an iterator of serialized result chunks for a CSV/JSONL stream.
+    The rule table is compiled once per call, from one consistent version of
+    the rules. The first chunk is read and checked before this returns, so an
+    empty, header-only or unparsable file raises ValueError here (pandas'
+    EmptyDataError/ParserError are ValueErrors) instead of mid-stream.
+    """
+    table = RuleTable(eligibility_checker.RULES if rules is None else rules)
+    output_format = output_format or fmt
+    chunks = read_chunks(source, fmt, chunk_size)
+    first = next(chunks, None)
+    if first is None or first.empty:
+        raise ValueError("no applicant rows found")
+    missing = [column for column in ('course', 'marks') if column not in first.columns]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+    return (format_chunk(table.evaluate(chunk), output_format, header=number == 0)
+            for number, chunk in enumerate(itertools.chain([first], chunks)))
+
+
+def guess_format(filename, content_type=''):
+    if (filename or '').lower().endswith(('.jsonl', '.ndjson', '.json')) or 'json' in (content_type or ''):
+        return 'jsonl'
+    return 'csv'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help="CSV or JSONL file of applicants, or '-' for stdin")
+    parser.add_argument('-o', '--output', help='output file (default: stdout)')
+    parser.add_argument('--format', choices=FORMATS, help='input format (default: from the file name)')
+    parser.add_argument('--output-format', choices=FORMATS, help='output format (default: from --output, else input)')
+    parser.add_argument('--rules', default=eligibility_checker.RULES_PATH)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    args = parser.parse_args()
+
+    fmt = args.format or guess_format(args.input)
+    output_format = args.output_format or (guess_format(args.output) if args.output else fmt)
+    rules = eligibility_checker.load_rules(args.rules)
+    source = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8') if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    sink = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        for text in evaluate_stream(source, fmt, rules, args.chunk_size, output_format):
+            sink.write(text)
+    except ValueError as error:
+        sys.exit(f"🔴 Could not read applicants: {error}")
+    finally:
+        if args.input != '-':
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,104 @@
 import json
 import re
+import threading
 
-def load_rules():
+RULES_PATH = 'admission_rules.json'
+MARKS_PATTERN = re.compile(r'(\d{1,3})\s*%')
+
+def load_rules(path=RULES_PATH):
     """Loads admission rules from the JSON file."""
-    with open('admission_rules.json', 'r') as f:
+    with open(path, 'r') as f:
         return json.load(f)
 
-# Load the rules once
+def _trie_regex(node):
+    """Regex for a character trie; greedy, so the longest alias is tried first."""
+    branches = [re.escape(char) + _trie_regex(child)
+                for char, child in sorted(node.items()) if char != '']
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        return '(?:' + body + ')?'
+    return body
+
+def compile_aliases(rules):
+    """
+    Compiles every alias into one word-boundary-aware regex, built from a trie
+    so a lookup is a single pass over the input and shares common prefixes.
+    Returns (pattern, {alias: course}); when an alias is listed under
+    several courses the first course in the file wins.
+    """
+    lookup = {}
+    for course_key, details in rules.items():
+        for alias in details["aliases"]:
+            alias = alias.lower().strip()
+            if alias:
+                lookup.setdefault(alias, course_key)
+
+    trie = {}
+    for alias in lookup:
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    if not lookup:
+        return re.compile(r'(?!x)x'), lookup
+    return re.compile(r'(?<!\w)' + _trie_regex(trie) + r'(?!\w)'), lookup
+
+# Load the rules once; reload_rules() swaps in a new version atomically.
 RULES = load_rules()
+RULES_VERSION = 1
+_reload_lock = threading.Lock()
+# (rules, pattern, lookup) for the rules dict the pattern was compiled from
+_alias_index = (RULES,) + compile_aliases(RULES)
+
+def alias_index(rules):
+    """Compiled aliases for `rules`, recompiled only when the rules object changes."""
+    global _alias_index
+    index = _alias_index
+    if index[0] is not rules:
+        index = (rules,) + compile_aliases(rules)
+        _alias_index = index
+    return index[1], index[2]
 
-def extract_course_and_marks(user_input):
-    """Extracts course name and marks from any user input."""
+def reload_rules(path=RULES_PATH):
+    """
+    Re-reads the rules file and publishes it with a single assignment, so a
+    request that already took a reference to the old rules finishes on them.
+    Raises (and keeps the current rules) if the file is invalid.
+    """
+    global RULES, RULES_VERSION, _alias_index
+    rules = load_rules(path)
+    if not all(isinstance(d, dict) and 'aliases' in d and 'min_marks' in d for d in rules.values()):
+        raise ValueError("every course needs 'aliases' and 'min_marks'")
+    if not all(isinstance(d.get('category_cutoffs', {}), dict) for d in rules.values()):
+        raise ValueError("'category_cutoffs' must map categories to marks")
+    index = (rules,) + compile_aliases(rules)
+    with _reload_lock:
+        _alias_index = index
+        RULES = rules
+        RULES_VERSION += 1
+    print(f"🔄 Admission rules reloaded (version {RULES_VERSION}).")
+    return rules
+
+def extract_course_and_marks(user_input, rules=None):
+    """
+    Extracts course name and marks from any user input.
+    The first alias mentioned (longest on overlap) picks the course; aliases
+    only match whole words, so "cse" never matches inside another word.
+    "exact_aliases" (e.g. "it", also a pronoun) are not searched for here.
+    """
+    rules = RULES if rules is None else rules
     user_input = user_input.lower().strip()
 
     # Extract percentage
-    marks_match = re.search(r'(\d{1,3})\s*%', user_input)
+    marks_match = MARKS_PATTERN.search(user_input)
     marks = float(marks_match.group(1)) if marks_match else None
 
     # Extract course using aliases
-    matched_course = None
-    for course_key, details in RULES.items():
-        for alias in details["aliases"]:
-            if alias.lower() in user_input:
-                matched_course = course_key
-                break
-        if matched_course:
-            break
+    pattern, lookup = alias_index(rules)
+    alias_match = pattern.search(user_input)
+    matched_course = lookup[alias_match.group(0)] if alias_match else None
 
     return matched_course, marks
 
@@ -33,14 +106,95 @@ def check_admission_eligibility_from_text(user_input):
     """
     Checks eligibility from any free-text user input.
     """
-    course, marks = extract_course_and_marks(user_input)
+    rules = RULES  # One consistent version for the whole check
+    course, marks = extract_course_and_marks(user_input, rules)
 
     if not course or marks is None:
         return "Please mention both course name and percentage (e.g., 'CSE 92%')."
 
-    rule = RULES[course]
-    if marks >= rule['min_marks']:
+    rule = rules[course]
+    required = min_marks_for(rule, None)
+    if marks >= required:
         return f"Yes! With {marks}%, you meet the minimum requirement for {course}. {rule['notes']}"
     else:
-        return (f"Sorry, the minimum requirement for {course} is {rule['min_marks']}%. "
+        return (f"Sorry, the minimum requirement for {course} is {required}%. "
                 f"With {marks}%, you may not be eligible. {rule['notes']}")
+
+def normalize_category(category):
+    """A category as a "category_cutoffs" key: lowercased and stripped, nothing more."""
+    return str(category or '').lower().strip()
+
+def categories(rules=None):
+    """Every category some course lists in "category_cutoffs", in file order."""
+    rules = RULES if rules is None else rules
+    seen = {}
+    for details in rules.values():
+        for category in details.get('category_cutoffs', {}):
+            seen.setdefault(normalize_category(category), None)
+    return tuple(seen)
+
+def has_category_cutoff(rule, category):
+    """True when the rules file gives this course its own cut-off for the category."""
+    cutoffs = rule.get('category_cutoffs', {})
+    return any(normalize_category(key) == normalize_category(category) for key in cutoffs)
+
+def min_marks_for(rule, category):
+    """
+    Marks cut-off for a category. Only cut-offs the rules file lists are
+    used; any other (or no) category gets the course's min_marks.
+    """
+    wanted = normalize_category(category)
+    for key, marks in rule.get('category_cutoffs', {}).items():
+        if normalize_category(key) == wanted:
+            return marks
+    return rule['min_marks']
+
+def exam_qualifies(rule, jee_score=None, state_exam_score=None):
+    """
+    Courses may set "min_jee_score" and/or "max_state_rank"; then either
+    exam has to qualify. Courses without them need no entrance exam.
+    """
+    min_jee, max_rank = rule.get('min_jee_score'), rule.get('max_state_rank')
+    if min_jee is None and max_rank is None:
+        return True
+    return ((min_jee is not None and jee_score is not None and jee_score >= min_jee) or
+            (max_rank is not None and state_exam_score is not None and state_exam_score <= max_rank))
+
+def find_course(course, rules=None):
+    """
+    Resolves a course name or alias (or a sentence mentioning one) to its
+    rules key. "exact_aliases" only count when they are the whole answer.
+    """
+    rules = RULES if rules is None else rules
+    name = str(course or '').lower().strip()
+    for course_key, details in rules.items():
+        if course_key.lower() == name or name in (a.lower().strip() for a in details.get('exact_aliases', [])):
+            return course_key
+    pattern, lookup = alias_index(rules)
+    alias_match = pattern.search(name)
+    return lookup[alias_match.group(0)] if alias_match else None
+
+def check_admission_eligibility(course, percentage, jee_score=None, state_exam_score=None, category=None, rules=None):
+    """
+    Checks a structured application (as collected by the voice assistant).
+    Returns (eligible, message).
+    """
+    rules = RULES if rules is None else rules
+    course_key = find_course(course, rules)
+    if course_key is None:
+        return False, f"Sorry, I couldn't find a course matching '{course}'. Please try e.g. 'CSE' or 'ECE'."
+    if percentage is None:
+        return False, "Please tell me your 12th standard percentage."
+
+    rule = rules[course_key]
+    required = min_marks_for(rule, category)
+    # Only name the category when the rules actually set a cut-off for it
+    scope = f" ({str(category).strip()} category)" if has_category_cutoff(rule, category) else ""
+    if percentage < required:
+        return False, (f"Sorry, the minimum requirement for {course_key}{scope} is {required}%. "
+                       f"With {percentage}%, you may not be eligible. {rule['notes']}")
+    if not exam_qualifies(rule, jee_score, state_exam_score):
+        return False, (f"With {percentage}%, you meet the marks requirement for {course_key}, but a qualifying "
+                       f"JEE score or state entrance rank is also required. {rule['notes']}")
+    return True, (f"Yes! With {percentage}%, you meet the minimum requirement for {course_key}{scope}. "
+                  f"{rule['notes']}")
@@ -1,14 +1,18 @@
-import smtplib
+import os
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+from email_outbox import get_outbox
+
 def send_query_email(user_name, user_email, query_message, recipient_email="college_support@example.com"):
     """
-    Sends an email notification for a user query.
-    You need to configure your email server details.
+    Queues an email notification for a user query and returns its ticket id
+    (truthy) straight away; email_outbox delivers it in the background,
+    retrying until the mail server accepts it. Returns None if the query
+    could not even be queued.
+    Server details come from the SMTP_* environment variables (see email_outbox).
     """
-    sender_email = "your_chatbot_email@example.com" # Your chatbot's email address
-    sender_password = "your_email_password" # Your chatbot's email password (use environment variables for security!)
+    sender_email = os.getenv("SMTP_SENDER") or os.getenv("SMTP_USER") or "your_chatbot_email@example.com" # Your chatbot's email address
 
     msg = MIMEMultipart()
     msg['From'] = sender_email
@@ -27,19 +31,12 @@ def send_query_email(user_name, user_email, query_message, recipient_email="coll
     msg.attach(MIMEText(body, 'plain'))
 
     try:
-        # For Gmail, use 'smtp.gmail.com' and port 587 with TLS
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls() # Enable TLS encryption
-        server.login(sender_email, sender_password)
-        text = msg.as_string()
-        server.sendmail(sender_email, recipient_email, text)
-        server.quit()
-        print("Query email sent successfully!")
-        return True
+        ticket_id = get_outbox().enqueue(sender_email, recipient_email, msg.as_string())
+        print(f"Query email queued (ticket {ticket_id}).")
+        return ticket_id
     except Exception as e:
-        print(f"Failed to send query email: {e}")
-        print("Please ensure 'Less secure app access' is enabled for your Gmail account if using Gmail, or use app-specific passwords.")
-        return False
+        print(f"Failed to queue query email: {e}")
+        return None
 
 # Integration with Chatbot:
 """
@@ -51,8 +48,9 @@ if predicted_tag == "query_ticket":
     speak_response("Please describe your query in detail.")
     query_description = listen_to_user()
 
-    if send_query_email(user_name, user_email, query_description, "your_college_staff_email@erode-sengunthar.ac.in"):
-        speak_response("Your query has been submitted to our support team. They will contact you shortly at " + user_email)
+    ticket_id = send_query_email(user_name, user_email, query_description, "your_college_staff_email@erode-sengunthar.ac.in")
+    if ticket_id:
+        speak_response(f"Your query has been submitted to our support team as ticket {ticket_id}. They will contact you shortly at " + user_email)
     else:
         speak_response("I apologize, but I was unable to submit your query at this time. Please try again later or contact the college directly.")
 """
@@ -0,0 +1,286 @@
+"""
+Durable outbox for outgoing email.
+
+Messages are written to SQLite first and sent by a background worker that
+keeps one authenticated SMTP connection open across messages, retrying
+transient failures with exponential backoff. Callers get a ticket id
+immediately and never wait on the mail server.
+
+SMTP settings come from the environment: SMTP_HOST, SMTP_PORT, SMTP_USER,
+SMTP_PASSWORD, SMTP_STARTTLS (1/0), SMTP_SENDER, EMAIL_OUTBOX_DB.
+
+Try it against a local stand-in server:
+    python -m aiosmtpd -n -l localhost:8025
+    SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=0 python email_outbox.py --send 20
+"""
+import argparse
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    sender TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+def smtp_settings_from_env():
+    return {
+        'host': os.getenv("SMTP_HOST", "smtp.gmail.com"),
+        'port': int(os.getenv("SMTP_PORT", "587")),
+        'user': os.getenv("SMTP_USER"),
+        'password': os.getenv("SMTP_PASSWORD"),
+        'starttls': os.getenv("SMTP_STARTTLS", "1") == "1",
+        'timeout': float(os.getenv("SMTP_TIMEOUT", "30")),
+    }
+
+
+def smtp_connector(host, port, user=None, password=None, starttls=True, timeout=30):
+    """Returns a callable that opens (and authenticates) a new SMTP connection."""
+    def connect():
+        server = smtplib.SMTP(host, port, timeout=timeout)
+        if starttls:
+            server.starttls()  # Enable TLS encryption
+        if user:
+            server.login(user, password)
+        return server
+    return connect
+
+
+def is_permanent(error):
+    """5xx replies (bad recipient, rejected content) won't succeed on retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500 \
+        and not isinstance(error, smtplib.SMTPAuthenticationError)
+
+
+class EmailOutbox:
+    """
+    SQLite-backed outbox with a single sending thread.
+
+    The connection is opened lazily, reused for every due message and
+    closed after `idle_timeout` seconds without work. A dropped connection
+    is re-opened once before the message counts as failed; failures are
+    retried after base_delay * 2**attempt seconds (with jitter, capped at
+    max_delay) until max_attempts, then the ticket is marked 'failed'.
+    """
+
+    def __init__(self, db_path='email_outbox.sqlite3', connect=None, max_attempts=8, base_delay=2.0,
+                 max_delay=600.0, idle_timeout=30.0):
+        self.connect = connect or smtp_connector(**smtp_settings_from_env())
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.idle_timeout = idle_timeout
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._db_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._server = None
+        self._thread = None
+        self.connections = 0
+        self.sent = 0
+        self.retries = 0
+
+    # --- producer side ---
+
+    def enqueue(self, sender, recipient, message):
+        """Persists a message and returns its ticket id; sending happens in the background."""
+        now = time.time()
+        with self._db_lock, self._db:
+            ticket_id = self._db.execute(
+                "INSERT INTO outbox (created_at, sender, recipient, message, next_attempt_at) VALUES (?, ?, ?, ?, ?)",
+                (now, sender, recipient, message, now),
+            ).lastrowid
+        self._wake.set()
+        return ticket_id
+
+    def status(self, ticket_id):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT status, attempts, last_error, created_at, sent_at FROM outbox WHERE id = ?", (ticket_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('status', 'attempts', 'last_error', 'created_at', 'sent_at'), row))
+
+    def stats(self):
+        with self._db_lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        return {
+            'pending': counts.get('pending', 0),
+            'sent': counts.get('sent', 0),
+            'failed': counts.get('failed', 0),
+            'connections_opened': self.connections,
+            'retries': self.retries,
+        }
+
+    # --- worker ---
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+
+    def _due(self):
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT id, sender, recipient, message, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT 100",
+                (time.time(),),
+            ).fetchall()
+
+    def _next_due_in(self):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def _run(self):
+        idle_since = time.monotonic()
+        while not self._stop.is_set():
+            due = self._due()
+            for ticket_id, sender, recipient, message, attempts in due:
+                if self._stop.is_set():
+                    break
+                self._deliver(ticket_id, sender, recipient, message, attempts)
+            if due:
+                idle_since = time.monotonic()
+                continue
+
+            if self._server is not None and time.monotonic() - idle_since >= self.idle_timeout:
+                self._close()
+            wait = self._next_due_in()
+            if self._server is not None:
+                remaining = self.idle_timeout - (time.monotonic() - idle_since)
+                wait = remaining if wait is None else min(wait, remaining)
+            self._wake.wait(wait)
+            self._wake.clear()
+        self._close()
+
+    def _send(self, sender, recipient, message):
+        if self._server is None:
+            self._server = self.connect()
+            self.connections += 1
+        self._server.sendmail(sender, recipient, message)
+
+    def _deliver(self, ticket_id, sender, recipient, message, attempts):
+        try:
+            reused = self._server is not None
+            try:
+                self._send(sender, recipient, message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                if not reused:
+                    raise
+                # The reused connection went stale: reconnect once before counting a failure.
+                self._close()
+                self._send(sender, recipient, message)
+        except Exception as e:
+            self._failed(ticket_id, attempts + 1, e)
+            return
+        self.sent += 1
+        with self._db_lock, self._db:
+            self._db.execute(
+                "UPDATE outbox SET status = 'sent', attempts = ?, sent_at = ?, last_error = NULL WHERE id = ?",
+                (attempts + 1, time.time(), ticket_id),
+            )
+
+    def _failed(self, ticket_id, attempts, error):
+        if not isinstance(error, smtplib.SMTPResponseException):
+            self._close()  # A server reply leaves the session usable (smtplib sends RSET); anything else may not
+        permanent = is_permanent(error) or attempts >= self.max_attempts
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+        if not permanent:
+            self.retries += 1
+        print(f"Failed to send query email (ticket {ticket_id}, attempt {attempts}): {error}")
+        with self._db_lock, self._db:
+            self._db.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                ('failed' if permanent else 'pending', attempts, time.time() + delay, str(error), ticket_id),
+            )
+
+    def _close(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+
+    def wait_idle(self, timeout=None):
+        """Blocks until nothing is due or pending-without-backoff (tests, CLI). Returns True if idle."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._due():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+def get_outbox():
+    """Process-wide outbox, started on first use."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = EmailOutbox(os.getenv("EMAIL_OUTBOX_DB", "email_outbox.sqlite3")).start()
+        return _outbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--send', type=int, default=0, help='enqueue this many test messages and wait')
+    parser.add_argument('--to', default='support@example.com')
+    parser.add_argument('--ticket', type=int, help='show the status of a ticket')
+    args = parser.parse_args()
+
+    outbox = get_outbox()
+    if args.ticket is not None:
+        print(outbox.status(args.ticket))
+    if args.send:
+        sender = os.getenv("SMTP_SENDER", "your_chatbot_email@example.com")
+        started_at = time.perf_counter()
+        for i in range(args.send):
+            outbox.enqueue(sender, args.to, f"Subject: Outbox test {i}\n\nTest message {i}.\n")
+        enqueued_at = time.perf_counter()
+        outbox.wait_idle()
+        finished_at = time.perf_counter()
+        print(f"Enqueued {args.send} in {(enqueued_at - started_at) * 1000:.1f} ms; "
+              f"delivered in {finished_at - started_at:.2f} s")
+    print(outbox.stats())
+    outbox.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Offline stand-ins for the Google services, for benchmarks and local testing.
+"""
+import random
+import threading
+import time
+
+
+def latency_sampler(spec, seed=0):
+    """
+    Parses a latency distribution into a callable returning seconds:
+    "0.4" (fixed), "uniform:0.2:0.6", "lognormal:0.4:0.5" (median, sigma)
+    or "exp:0.4" (mean).
+    """
+    kind, _, params = str(spec).partition(':')
+    if not params:
+        value = float(kind)
+        return lambda: value
+    args = [float(param) for param in params.split(':')]
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    draw = {
+        'uniform': lambda: rng.uniform(args[0], args[1]),
+        'lognormal': lambda: args[0] * rng.lognormvariate(0.0, args[1]),
+        'exp': lambda: rng.expovariate(1.0 / args[0]),
+    }[kind]
+
+    def sample():
+        with lock:
+            return max(0.0, draw())
+    return sample
+
+
+def _seconds(latency):
+    """Backends take a fixed latency or a latency_sampler()."""
+    return latency() if callable(latency) else latency
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Mimics genai.GenerativeModel.generate_content with a configurable latency
+    (mean seconds plus uniform jitter, or a latency_sampler()) and counts
+    upstream calls. With
+    stream=True the first chunk arrives after `latency` and each following
+    word after `token_latency`.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.0, answer=None, seed=0, token_latency=0.02):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_latency = token_latency
+        self.answer = answer or (lambda prompt: f"[fake answer to] {prompt.rsplit('USER QUESTION:', 1)[-1].strip()}")
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self):
+        with self._lock:
+            self.calls += 1
+            if callable(self.latency):
+                return self.latency()
+            return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def generate_content(self, prompt, stream=False):
+        delay = self._delay()
+        if stream:
+            return self._stream(prompt, delay)
+        time.sleep(delay)
+        return FakeResponse(self.answer(prompt))
+
+    def _stream(self, prompt, delay):
+        time.sleep(delay)
+        words = self.answer(prompt).split(' ')
+        for index, word in enumerate(words):
+            if index:
+                time.sleep(self.token_latency)
+            yield FakeResponse(word if index == len(words) - 1 else word + ' ')
+
+
+class FakeTranslator:
+    """
+    Offline translation backend for multi_language.TranslationService:
+    returns "[dest] text" after `latency` seconds per batch and counts
+    upstream calls and strings.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.strings = 0
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts, dest, src):
+        with self._lock:
+            self.calls += 1
+            self.strings += len(texts)
+        time.sleep(_seconds(self.latency))
+        return [f"[{dest}] {text}" for text in texts]
+
+
+class FakeTTS:
+    """
+    Drop-in for the gtts.gTTS class (assign it to audio_cache.gTTS):
+    write_to_fp() waits `latency` seconds, then writes a small fake mp3.
+    Counts syntheses.
+    """
+
+    def __init__(self, latency=0.3):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text, lang='en', tld='com', slow=False):
+        return _FakeSpeech(self, text, lang)
+
+
+class _FakeSpeech:
+    def __init__(self, tts, text, lang):
+        self.tts = tts
+        self.text = text
+        self.lang = lang
+
+    def write_to_fp(self, fp):
+        with self.tts._lock:
+            self.tts.calls += 1
+        time.sleep(_seconds(self.tts.latency))
+        fp.write(b'ID3' + f"{self.lang}:{self.text}".encode('utf-8'))
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            self.write_to_fp(f)
+
+
+class FakeRecognizer:
+    """
+    Offline speech recognition backend for audio_capture.CaptureSession:
+    returns the scripted transcripts in order (then a description of the
+    audio) after `latency` seconds, and counts calls.
+    """
+
+    def __init__(self, transcripts=(), latency=0.0):
+        self.transcripts = list(transcripts)
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, audio, language):
+        with self._lock:
+            self.calls += 1
+            transcript = self.transcripts.pop(0) if self.transcripts else None
+        time.sleep(_seconds(self.latency))
+        if transcript is not None:
+            return transcript
+        seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+        return f"[{seconds:.1f}s of {language} speech]"
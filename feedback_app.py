@@ -1,11 +1,24 @@
-from flask import Flask, request, jsonify, render_template
-import datetime
+from flask import Flask, Response, request, jsonify, stream_with_context
+from html import escape
+import json
+import re
+from urllib.parse import urlencode
 import os
 
+from feedback_store import FeedbackStore
+
 app = Flask(__name__)
 
-# This is a very simple way to store feedback (NOT for production, use a database like SQLite or Firestore)
+# SQLite (WAL) with group commit; feedback.txt is only read once, by the legacy importer
 FEEDBACK_FILE = 'feedback.txt'
+store = FeedbackStore(os.getenv("FEEDBACK_DB", "feedback.sqlite3"))
+if os.path.exists(FEEDBACK_FILE):
+    imported = store.import_legacy(FEEDBACK_FILE)
+    if imported:
+        print(f"✅ Imported {imported} feedback entries from {FEEDBACK_FILE}.")
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 @app.route('/')
 def index():
@@ -16,40 +29,87 @@ def index():
 @app.route('/submit_feedback', methods=['POST'])
 def submit_feedback():
     """
-    Receives feedback via POST request and saves it to a text file.
-    In a real application, you'd save to a database.
+    Receives feedback via POST request and saves it to the feedback store.
     """
     if request.is_json:
         data = request.get_json()
-        user_id = data.get('user_id', 'anonymous')
+        if not isinstance(data, dict):
+            return jsonify({"status": "error", "message": "Request must be a JSON object"}), 400
+        user_id = str(data.get('user_id', 'anonymous'))
         message = data.get('message', '')
         rating = data.get('rating', None) # Optional: e.g., 1-5 stars
 
+        if not isinstance(message, str):
+            return jsonify({"status": "error", "message": "Feedback message must be a string."}), 400
         if not message:
             return jsonify({"status": "error", "message": "Feedback message cannot be empty."}), 400
-
-        timestamp = datetime.datetime.now().isoformat()
-        feedback_entry = f"[{timestamp}] User ID: {user_id}, Rating: {rating}, Message: {message}\n"
+        if rating is not None:
+            rating = parse_rating(rating)
+            if rating is None:
+                return jsonify({"status": "error", "message": "Rating must be a whole number."}), 400
 
         try:
-            with open(FEEDBACK_FILE, 'a', encoding='utf-8') as f:
-                f.write(feedback_entry)
-            return jsonify({"status": "success", "message": "Feedback submitted successfully!"}), 200
+            feedback_id = store.submit(user_id, message, rating)
+            return jsonify({"status": "success", "message": "Feedback submitted successfully!", "id": feedback_id}), 200
         except Exception as e:
             return jsonify({"status": "error", "message": f"Failed to save feedback: {str(e)}"}), 500
     else:
         return jsonify({"status": "error", "message": "Request must be JSON"}), 400
 
+def parse_rating(value):
+    """Whole-number rating from JSON (5, 5.0 or "5"), else None; 4.5, "4.5" and true are rejected."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str) and re.fullmatch(r'\s*[+-]?\d+\s*', value):
+        return int(value)
+    return None
+
 @app.route('/view_feedback')
 def view_feedback():
     """
     Displays collected feedback (for internal use, not for public access).
+    Filters: user_id, rating, min_rating, since, until (ISO timestamps);
+    paging: limit and before (id cursor, see the "Older" link);
+    format=jsonl for machine-readable output. Rows are streamed.
     """
-    if not os.path.exists(FEEDBACK_FILE):
-        return "No feedback collected yet."
-    with open(FEEDBACK_FILE, 'r', encoding='utf-8') as f:
-        feedback_data = f.read()
-    return f"<pre>{feedback_data}</pre>"
+    filters = {
+        'user_id': request.args.get('user_id'),
+        'rating': request.args.get('rating', type=int),
+        'min_rating': request.args.get('min_rating', type=int),
+        'since': request.args.get('since'),
+        'until': request.args.get('until'),
+    }
+    before_id = request.args.get('before', type=int)
+    limit = min(max(request.args.get('limit', PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    rows = store.query(before_id=before_id, limit=limit, **filters)
+
+    if request.args.get('format') == 'jsonl':
+        return Response(stream_with_context(jsonl_rows(rows)), mimetype='application/x-ndjson')
+    return Response(stream_with_context(html_page(rows, filters, limit)), mimetype='text/html')
+
+def jsonl_rows(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+def html_page(rows, filters, limit):
+    yield ("<!doctype html><meta charset='utf-8'><title>Feedback</title>"
+           "<table border='1' cellpadding='4'><tr><th>ID</th><th>Time</th><th>User ID</th>"
+           "<th>Rating</th><th>Message</th></tr>\n")
+    last_id, count = None, 0
+    for row in rows:
+        last_id, count = row['id'], count + 1
+        yield (f"<tr><td>{row['id']}</td><td>{escape(row['created_at'])}</td><td>{escape(row['user_id'])}</td>"
+               f"<td>{'' if row['rating'] is None else row['rating']}</td><td>{escape(row['message'])}</td></tr>\n")
+    yield "</table>\n"
+    if count == 0:
+        yield "<p>No feedback collected yet.</p>"
+    elif count == limit:
+        query = {k: v for k, v in filters.items() if v is not None}
+        yield f"<p><a href='?{escape(urlencode(dict(query, before=last_id, limit=limit)))}'>Older &rarr;</a></p>"
 
 
 if __name__ == '__main__':
@@ -0,0 +1,232 @@
+import datetime
+import hashlib
+import json
+import queue
+import re
+import sqlite3
+import threading
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    rating INTEGER,
+    message TEXT NOT NULL,
+    legacy_key TEXT
+);
+CREATE INDEX IF NOT EXISTS feedback_created_at ON feedback (created_at);
+CREATE INDEX IF NOT EXISTS feedback_rating ON feedback (rating);
+CREATE INDEX IF NOT EXISTS feedback_user_id ON feedback (user_id);
+CREATE TABLE IF NOT EXISTS feedback_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# "[2025-01-31T10:00:00.123456] User ID: abc, Rating: 5, Message: ..." (the old feedback.txt)
+LEGACY_LINE = re.compile(r'^\[(?P<ts>[^\]]+)\] User ID: (?P<user>.*?), Rating: (?P<rating>.*?), Message: (?P<msg>.*)$')
+
+
+class _PendingWrite:
+    def __init__(self, row):
+        self.row = row
+        self.done = threading.Event()
+        self.id = None
+        self.error = None
+
+
+class FeedbackStore:
+    """
+    SQLite (WAL) feedback storage with group commit.
+
+    Web workers hand rows to a single writer thread, which inserts everything
+    that queued up meanwhile (up to batch_size) in one transaction, so many
+    concurrent submissions share one commit instead of each paying for its
+    own. Reads use per-thread connections and never block the writer.
+    """
+
+    def __init__(self, db_path='feedback.sqlite3', batch_size=256, max_pending=10000):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.commits = 0
+
+        db = self._connect()
+        db.executescript(SCHEMA)
+        db.commit()
+        self._migrate(db)
+        self._writer = threading.Thread(target=self._run, name='feedback-writer', daemon=True)
+        self._writer.start()
+
+    def _migrate(self, db):
+        """Adds feedback.legacy_key to databases created before it existed."""
+        db.execute("BEGIN IMMEDIATE")  # Workers starting together: one migrates
+        try:
+            columns = {row[1] for row in db.execute("PRAGMA table_info(feedback)")}
+            if 'legacy_key' not in columns:
+                db.execute("ALTER TABLE feedback ADD COLUMN legacy_key TEXT")
+                if db.execute("SELECT 1 FROM feedback_meta WHERE key LIKE 'legacy_import:%'").fetchone():
+                    # Imported back when the whole file was the unit: key the
+                    # existing rows the way import_legacy() keys file lines, so
+                    # the next import only adds what was appended since.
+                    rows = db.execute(
+                        "SELECT id, created_at, user_id, rating, message FROM feedback ORDER BY id"
+                    ).fetchall()
+                    db.executemany("UPDATE feedback SET legacy_key = ? WHERE id = ?",
+                                   [(key, row[0]) for row, key in zip(rows, legacy_keys([list(r[1:]) for r in rows]))])
+            db.execute("CREATE UNIQUE INDEX IF NOT EXISTS feedback_legacy_key ON feedback (legacy_key)")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # Durable at each WAL checkpoint; no fsync per commit
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _reader(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    # --- writes ---
+
+    def submit(self, user_id, message, rating=None, created_at=None, wait=True):
+        """
+        Queues one feedback row. With wait=True blocks until it is committed
+        and returns its id (raising if the insert failed).
+        """
+        created_at = created_at or datetime.datetime.now().isoformat()
+        pending = _PendingWrite((created_at, user_id, rating, message))
+        self._pending.put(pending)
+        if not wait:
+            return None
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.id
+
+    def _run(self):
+        db = self._connect()
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            writes = [p for p in batch if p is not None]
+            if writes:
+                self._commit(db, writes)
+            if len(writes) != len(batch):
+                return  # close() sentinel
+
+    def _commit(self, db, writes):
+        try:
+            with db:
+                for pending in writes:
+                    pending.id = db.execute(
+                        "INSERT INTO feedback (created_at, user_id, rating, message) VALUES (?, ?, ?, ?)",
+                        pending.row,
+                    ).lastrowid
+            with self._lock:
+                self.writes += len(writes)
+                self.commits += 1
+        except Exception as e:
+            for pending in writes:
+                pending.error = e
+        finally:
+            for pending in writes:
+                pending.done.set()
+
+    def close(self):
+        """Commits everything queued so far and stops the writer."""
+        self._pending.put(None)
+        self._writer.join()
+
+    # --- reads ---
+
+    def query(self, user_id=None, rating=None, min_rating=None, since=None, until=None, before_id=None, limit=100):
+        """
+        Yields feedback rows (dicts), newest first. `since`/`until` are ISO
+        timestamps (or prefixes such as '2025-01'); `before_id` is the keyset
+        cursor for the next page (the last id of the previous one).
+        """
+        clauses, params = [], []
+        for clause, value in (("user_id = ?", user_id), ("rating = ?", rating), ("rating >= ?", min_rating),
+                              ("created_at >= ?", since), ("created_at < ?", until), ("id < ?", before_id)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = "SELECT id, created_at, user_id, rating, message FROM feedback"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC LIMIT ?"
+        for row in self._reader().execute(sql, params + [limit]):
+            yield dict(row)
+
+    def stats(self):
+        count = self._reader().execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+        with self._lock:
+            return {
+                'rows': count,
+                'writes': self.writes,
+                'commits': self.commits,
+                'rows_per_commit': self.writes / self.commits if self.commits else 0.0,
+                'pending': self._pending.qsize(),
+            }
+
+    # --- legacy import ---
+
+    def import_legacy(self, path):
+        """
+        Imports the old feedback.txt format. Every row is stored with a key
+        derived from its contents (see legacy_keys()), and rows whose key is
+        already present are skipped, so running it again, or after lines
+        were appended to the file, only adds the new rows.
+        Returns the number of rows imported.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        rows = []
+        for line in lines:
+            match = LEGACY_LINE.match(line)
+            if match:
+                rating = match.group('rating').strip()
+                rows.append([match.group('ts'), match.group('user'),
+                             int(rating) if rating.lstrip('-').isdigit() else None, match.group('msg')])
+            elif rows:
+                rows[-1][3] += "\n" + line  # Message that contained a newline
+
+        # INSERT OR IGNORE on the unique legacy_key: when several workers
+        # start at once, each row is still imported exactly once.
+        db = self._reader()
+        with db:
+            imported = db.executemany(
+                "INSERT OR IGNORE INTO feedback (created_at, user_id, rating, message, legacy_key) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [row + [key] for row, key in zip(rows, legacy_keys(rows))],
+            ).rowcount
+        return imported
+
+
+def legacy_keys(rows):
+    """
+    Content keys for legacy rows ([created_at, user_id, rating, message]),
+    in file order. Identical rows are numbered by occurrence, so a genuine
+    duplicate line is kept while re-reading the file adds nothing.
+    """
+    seen = {}
+    keys = []
+    for row in rows:
+        content = json.dumps(list(row), ensure_ascii=False)
+        seen[content] = seen.get(content, 0) + 1
+        keys.append(hashlib.sha256(f"{content}#{seen[content]}".encode('utf-8')).hexdigest())
+    return keys
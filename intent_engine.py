@@ -0,0 +1,103 @@
+import threading
+import time
+
+from kb_matcher import KBMatcher
+
+
+TIERS = ('exact', 'classifier', 'llm')
+
+
+class Resolution:
+    """Outcome of IntentEngine.resolve()."""
+
+    def __init__(self, tier, response=None, tag=None, confidence=None, intent=None):
+        self.tier = tier            # 'exact', 'classifier', 'llm' or None if unresolved
+        self.response = response
+        self.tag = tag
+        self.confidence = confidence
+        self.intent = intent
+
+    @property
+    def image_url(self):
+        return self.intent.get('image_url') if self.intent else None
+
+    def __repr__(self):
+        return f"Resolution(tier={self.tier!r}, tag={self.tag!r}, confidence={self.confidence!r})"
+
+
+class IntentEngine:
+    """
+    Tiered resolver shared by the web app and the voice CLI.
+
+    Cheapest tier first: the compiled substring index, then the trained
+    Chatbot classifier (accepted only above its confidence threshold), then
+    the optional LLM callable. Per-tier attempts, hits and time spent are
+    recorded so we can see how much traffic reaches the expensive tier.
+    """
+
+    def __init__(self, intents, classifier=None, llm=None, matcher=None, choose_response=None):
+        self.intents = list(intents)
+        self.matcher = matcher or KBMatcher(self.intents)
+        self.classifier = classifier    # chatbot_core.Chatbot or None
+        self.llm = llm                  # callable(question) -> answer text, or None
+        self.choose_response = choose_response or (lambda responses: responses[0])
+        self._intents_by_tag = {intent['tag']: intent for intent in self.intents}
+        self._stats = {tier: {'attempts': 0, 'hits': 0, 'seconds': 0.0} for tier in TIERS}
+        self._lock = threading.Lock()
+
+    def _record(self, tier, hit, started_at):
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            stats = self._stats[tier]
+            stats['attempts'] += 1
+            stats['hits'] += int(hit)
+            stats['seconds'] += elapsed
+
+    def resolve(self, text, use_llm=True):
+        """
+        Returns a Resolution. With use_llm=False (or no LLM configured) an
+        unresolved query comes back with tier=None so the caller can decide
+        what to do, e.g. stream the LLM answer itself.
+        """
+        started_at = time.perf_counter()
+        intent = self.matcher.match(text)
+        self._record('exact', intent is not None, started_at)
+        if intent:
+            return Resolution('exact', self.choose_response(intent['responses']), intent['tag'], 1.0, intent)
+
+        if self.classifier is not None:
+            started_at = time.perf_counter()
+            tag, confidence = self.classifier.classify(text)
+            intent = self._intents_by_tag.get(tag)
+            hit = intent is not None and confidence >= self.classifier.confidence_threshold
+            self._record('classifier', hit, started_at)
+            if hit:
+                return Resolution('classifier', self.choose_response(intent['responses']), tag, confidence, intent)
+
+        if use_llm and self.llm is not None:
+            started_at = time.perf_counter()
+            try:
+                answer = self.llm(text)
+            except Exception:
+                self._record('llm', False, started_at)
+                raise
+            self._record('llm', True, started_at)
+            return Resolution('llm', answer)
+
+        return Resolution(None)
+
+    def stats(self):
+        """Per-tier attempts, hits, hit rate and mean latency (ms)."""
+        with self._lock:
+            total = self._stats['exact']['attempts']
+            report = {}
+            for tier, stats in self._stats.items():
+                attempts = stats['attempts']
+                report[tier] = {
+                    'attempts': attempts,
+                    'hits': stats['hits'],
+                    'hit_rate': stats['hits'] / attempts if attempts else 0.0,
+                    'share_of_queries': stats['hits'] / total if total else 0.0,
+                    'mean_ms': stats['seconds'] * 1000 / attempts if attempts else 0.0,
+                }
+            return report
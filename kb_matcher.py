@@ -0,0 +1,97 @@
+import re
+from collections import deque
+
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokens(text):
+    """Lowercased word tokens; punctuation and spacing don't take part in matching."""
+    return TOKEN.findall(text.lower())
+
+
+class KBMatcher:
+    """
+    Aho-Corasick automaton over every pattern in the knowledge base.
+
+    Built once when the knowledge base loads. The automaton runs over word
+    tokens rather than characters, so a pattern only matches whole words:
+    "hi" matches "Hi there" but not "which" or "history". match() scans the
+    message a single time and returns the first intent (in knowledge base
+    order) with a pattern whose tokens appear consecutively in the message.
+    """
+
+    def __init__(self, intents):
+        self.intents = list(intents)
+        # Node arrays: goto transitions (keyed by token), failure links and
+        # the best (lowest) intent index reachable through the output links
+        # of each node.
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+        self.pattern_count = 0
+
+        for index, intent in enumerate(self.intents):
+            for pattern in intent.get('patterns', []):
+                self._add(tokens(pattern), index)
+        self._build_failure_links()
+
+    def _add(self, pattern_tokens, intent_index):
+        self.pattern_count += 1
+        if not pattern_tokens:
+            return  # Nothing a whole-word match could find
+
+        node = 0
+        for token in pattern_tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+                self._goto[node][token] = nxt
+            node = nxt
+
+        current = self._out[node]
+        if current is None or intent_index < current:
+            self._out[node] = intent_index
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(token, 0)
+                self._fail[child] = target if target != child else 0
+
+                # Fold the failure target's output into this node so a
+                # lookup never has to walk the output chain at match time.
+                inherited = self._out[self._fail[child]]
+                own = self._out[child]
+                if inherited is not None and (own is None or inherited < own):
+                    self._out[child] = inherited
+
+    def match_index(self, text):
+        """Returns the index of the first matching intent, or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        best = None
+        node = 0
+        for token in tokens(text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            found = out[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+    def match(self, text):
+        """Returns the first matching intent dict, or None."""
+        index = self.match_index(text)
+        return self.intents[index] if index is not None else None
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def intent_hashes(intents):
+    """Content hash per intent tag, used to find what changed between versions."""
+    return {
+        intent['tag']: hashlib.sha256(
+            json.dumps(intent, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        for intent in intents
+    }
+
+
+def kb_version(knowledge_base):
+    """Short content hash identifying a knowledge base version."""
+    return hashlib.sha256(
+        json.dumps(knowledge_base, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    ).hexdigest()[:12]
+
+
+def changed_tags(old_hashes, new_hashes):
+    """Tags that were added, removed or edited."""
+    return {
+        tag for tag in set(old_hashes) | set(new_hashes)
+        if old_hashes.get(tag) != new_hashes.get(tag)
+    }
+
+
+class KBSnapshot:
+    """
+    Immutable view of one knowledge base version plus everything derived from
+    it (matcher, retriever, engine, ...). Requests take a reference to the
+    current snapshot once and use it throughout, so a reload never changes
+    the data under an in-flight request.
+    """
+
+    def __init__(self, number, knowledge_base, **components):
+        self.number = number
+        self.knowledge_base = knowledge_base
+        self.intents = knowledge_base['intents']
+        self.kb_version = kb_version(knowledge_base)
+        self.intent_hashes = intent_hashes(self.intents)
+        self.loaded_at = time.time()
+        for name, component in components.items():
+            setattr(self, name, component)
+
+
+class FileWatcher:
+    """Detects file changes by polling (mtime_ns, inode, size); no external services."""
+
+    def __init__(self):
+        self._signatures = {}
+
+    @staticmethod
+    def signature(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    def has_changed(self, path):
+        return self.signature(path) != self._signatures.get(path)
+
+    def mark_seen(self, path, signature):
+        self._signatures[path] = signature
+
+
+class KBReloader:
+    """
+    Watches the knowledge base (and any extra files) and hot-swaps snapshots.
+
+    `build(knowledge_base)` returns the derived components for a snapshot.
+    It runs off to the side on the watcher thread; the new snapshot is
+    published with a single reference assignment, then `on_swap(old, new)`
+    runs so caches can drop only the entries tied to changed intents. A file
+    that fails to load (e.g. caught mid-write) keeps the old snapshot and is
+    retried on the next poll.
+    """
+
+    def __init__(self, kb_path, build, on_swap=None, poll_interval=2.0):
+        self.kb_path = kb_path
+        self.build = build
+        self.on_swap = on_swap
+        self.poll_interval = poll_interval
+        self.current = None
+        self._extra = {}  # path -> callback(path)
+        self._watcher = FileWatcher()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load_initial(self):
+        """Builds the first snapshot synchronously (missing KB -> empty KB)."""
+        signature = FileWatcher.signature(self.kb_path)
+        try:
+            knowledge_base = self._read_kb()
+        except FileNotFoundError:
+            print(f"🔴 {self.kb_path} not found.")
+            knowledge_base = {"intents": []}
+        self.current = KBSnapshot(1, knowledge_base, **self.build(knowledge_base))
+        self._watcher.mark_seen(self.kb_path, signature)
+        print(f"✅ Knowledge Base loaded successfully (version {self.current.kb_version}).")
+        return self.current
+
+    def watch(self, path, callback):
+        """Also poll `path` and call callback(path) when it changes."""
+        self._extra[path] = callback
+        self._watcher.mark_seen(path, FileWatcher.signature(path))
+
+    def _read_kb(self):
+        with open(self.kb_path, 'r', encoding='utf-8') as f:
+            knowledge_base = json.load(f)
+        if not isinstance(knowledge_base.get('intents'), list):
+            raise ValueError("knowledge base has no 'intents' list")
+        return knowledge_base
+
+    def reload(self):
+        """Rebuilds and swaps in a new snapshot. Returns it, or None on failure."""
+        with self._reload_lock:
+            signature = FileWatcher.signature(self.kb_path)
+            try:
+                knowledge_base = self._read_kb()
+                old = self.current
+                new = KBSnapshot(old.number + 1 if old else 1, knowledge_base, **self.build(knowledge_base))
+            except Exception as e:
+                print(f"🔴 Knowledge base reload failed, keeping the current version: {e}")
+                return None
+
+            self._watcher.mark_seen(self.kb_path, signature)
+            if old is not None and new.kb_version == old.kb_version:
+                return old
+            self.current = new
+            print(f"🔄 Knowledge base reloaded: snapshot #{new.number} (version {new.kb_version}).")
+            if self.on_swap and old is not None:
+                self.on_swap(old, new)
+            return new
+
+    def check(self):
+        """One poll of every watched file."""
+        if self._watcher.has_changed(self.kb_path):
+            self.reload()
+        for path, callback in list(self._extra.items()):
+            if self._watcher.has_changed(path):
+                signature = FileWatcher.signature(path)
+                try:
+                    callback(path)
+                except Exception as e:
+                    print(f"🔴 Reload of {path} failed, keeping the current version: {e}")
+                    continue
+                self._watcher.mark_seen(path, signature)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='kb-reloader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.check()
@@ -0,0 +1,113 @@
+import json
+import math
+import re
+from collections import Counter
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Small, domain-neutral stopword list; keeps BM25 focused on content words.
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from have how i in is it me my of on or
+please tell the there this to us we what when where which who will with you your
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    """Rough LLM token estimate (~4 characters per token)."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def serialize_intents(intents):
+    """Compact JSON for the prompt: tag and responses only, no whitespace."""
+    compact = [{'tag': i['tag'], 'responses': i['responses']} for i in intents]
+    return json.dumps(compact, separators=(',', ':'), ensure_ascii=False)
+
+
+class KBRetriever:
+    """
+    BM25 index over knowledge base intents, built once at startup.
+
+    Each intent is one document made of its tag, patterns and responses;
+    patterns are counted twice since they are phrased like user questions.
+    """
+
+    def __init__(self, intents, k1=1.5, b=0.75):
+        self.intents = list(intents)
+        self.k1 = k1
+        self.b = b
+        self._doc_freqs = []
+        self._doc_lengths = []
+        document_frequency = Counter()
+
+        for intent in self.intents:
+            tokens = tokenize(intent['tag'].replace('_', ' '))
+            for pattern in intent.get('patterns', []):
+                tokens += tokenize(pattern) * 2
+            for response in intent.get('responses', []):
+                tokens += tokenize(response)
+            freqs = Counter(tokens)
+            self._doc_freqs.append(freqs)
+            self._doc_lengths.append(len(tokens))
+            document_frequency.update(freqs.keys())
+
+        count = len(self.intents)
+        self._avg_length = (sum(self._doc_lengths) / count) if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+        # What the prompt used to carry: the whole KB, pretty-printed.
+        self.full_kb_tokens = estimate_tokens(json.dumps(self.intents, indent=2, ensure_ascii=False))
+
+    def scores(self, question):
+        terms = [t for t in set(tokenize(question)) if t in self._idf]
+        results = []
+        for freqs, length in zip(self._doc_freqs, self._doc_lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length) if self._avg_length else self.k1
+            for term in terms:
+                tf = freqs.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+    def top_k(self, question, k=3):
+        """Returns up to k intents with a positive score, best first."""
+        scored = [(score, index) for index, score in enumerate(self.scores(question)) if score > 0]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self.intents[index] for _, index in scored[:k]]
+
+    def prompt_context(self, question, k=3):
+        """
+        Returns (context_string, stats) for the top-k intents, where stats
+        reports the estimated prompt tokens saved against the full KB dump.
+        """
+        intents = self.top_k(question, k)
+        context = serialize_intents(intents)
+        prompt_tokens = estimate_tokens(context)
+        stats = {
+            'intents': [i['tag'] for i in intents],
+            'full_kb_tokens': self.full_kb_tokens,
+            'context_tokens': prompt_tokens,
+            'saved_tokens': self.full_kb_tokens - prompt_tokens,
+        }
+        return context, stats
+
+
+# Example usage (offline, no API key needed)
+if __name__ == "__main__":
+    import sys
+
+    with open('knowledge_base.json', 'r', encoding='utf-8') as f:
+        retriever = KBRetriever(json.load(f)['intents'])
+    question = " ".join(sys.argv[1:]) or "How much is the hostel fee for management quota?"
+    context, stats = retriever.prompt_context(question)
+    print(f"Question: {question}")
+    print(f"Context: {context}")
+    print(f"Stats: {stats}")
@@ -0,0 +1,108 @@
+import re
+import threading
+import time
+from functools import lru_cache
+
+
+DEFAULT_LANG = 'en'
+STAGES = ('script', 'default', 'detector')
+
+# Scripts that identify the language on their own: no model needed.
+SCRIPTS = (
+    ('ta', re.compile('[\u0B80-\u0BFF]')),  # Tamil
+    ('ml', re.compile('[\u0D00-\u0D7F]')),  # Malayalam
+)
+_INDIC = re.compile('[\u0B80-\u0BFF\u0D00-\u0D7F]')
+_LETTER = re.compile(r'[^\W\d_]')
+
+
+def langdetect_detector(seed=0):
+    """langdetect's detect() with a fixed seed, so the same text always gets the same answer."""
+    from langdetect import DetectorFactory, detect
+    DetectorFactory.seed = seed
+    return detect
+
+
+class LanguageIdentifier:
+    """
+    Language identification for incoming messages, cheapest stage first:
+
+    1. script: Tamil or Malayalam characters decide it outright.
+    2. default: fewer than `min_letters` letters ("92%", "ok") can't be
+       identified reliably, so they get `default` instead of an exception.
+    3. detector: the seeded statistical detector, behind a bounded LRU cache
+       keyed on the normalized text. Detector errors also fall back to
+       `default`.
+
+    Per-stage call counts and time spent are kept for /stats.
+    """
+
+    def __init__(self, default=DEFAULT_LANG, min_letters=4, cache_size=4096, detector=None, seed=0):
+        self.default = default
+        self.min_letters = min_letters
+        self._detector = detector
+        self._seed = seed
+        self._detect_cached = lru_cache(maxsize=cache_size)(self._detect_uncached)
+        self._stats = {stage: {'calls': 0, 'seconds': 0.0} for stage in STAGES}
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _record(self, stage, started_at):
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            self._stats[stage]['calls'] += 1
+            self._stats[stage]['seconds'] += elapsed
+
+    def _detect_uncached(self, text):
+        if self._detector is None:
+            self._detector = langdetect_detector(self._seed)
+        try:
+            return self._detector(text)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return self.default
+
+    @staticmethod
+    def script_language(text):
+        """'ta' or 'ml' when the text is written in that script (majority wins), else None."""
+        if not _INDIC.search(text):
+            return None
+        counts = [(len(pattern.findall(text)), lang) for lang, pattern in SCRIPTS]
+        return max(counts)[1]
+
+    def identify(self, text):
+        """Returns an ISO 639-1 code; never raises."""
+        started_at = time.perf_counter()
+        text = (text or '').strip()
+        lang = self.script_language(text)
+        if lang is not None:
+            self._record('script', started_at)
+            return lang
+
+        if len(_LETTER.findall(text)) < self.min_letters:
+            self._record('default', started_at)
+            return self.default
+
+        lang = self._detect_cached(' '.join(text.lower().split()))
+        self._record('detector', started_at)
+        return lang
+
+    def stats(self):
+        """Per-stage calls and mean latency (us), plus detector cache counters."""
+        cache = self._detect_cached.cache_info()
+        with self._lock:
+            report = {
+                stage: {
+                    'calls': stats['calls'],
+                    'mean_us': stats['seconds'] * 1e6 / stats['calls'] if stats['calls'] else 0.0,
+                }
+                for stage, stats in self._stats.items()
+            }
+            report['detector_cache'] = {
+                'hits': cache.hits,
+                'misses': cache.misses,
+                'entries': cache.currsize,
+                'errors': self.errors,
+            }
+            return report
@@ -0,0 +1,237 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def normalize_question(text, preprocess=None):
+    """
+    Lowercases and strips punctuation, then applies `preprocess` (normally
+    chatbot_core.preprocess_text, the classifier's own tokenize + lemmatize)
+    so differently worded copies of a question share one cache key.
+    """
+    text = PUNCTUATION.sub(" ", text.lower())
+    tokens = preprocess(text) if preprocess else text.split()
+    return " ".join(tokens)
+
+
+class _Flight:
+    """One in-progress upstream call that concurrent identical misses wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMCache:
+    """
+    Bounded LRU + TTL cache for AI fallback answers, with single-flight.
+
+    Keys are (kb_version, normalized question). With db_path the cache is
+    also persisted to SQLite so it survives restarts. Entries can record the
+    intent tags their answer was built from, so a KB reload only drops
+    answers that depended on an edited intent (see migrate()).
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=24 * 3600, db_path=None, normalizer=normalize_question):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.normalizer = normalizer
+        self._entries = OrderedDict()  # key -> (response, created_at, deps)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, deps TEXT)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(llm_cache)")}
+            if 'deps' not in columns:
+                self._db.execute("ALTER TABLE llm_cache ADD COLUMN deps TEXT")
+            self._db.commit()
+
+    def make_key(self, question, kb_version):
+        return f"{kb_version}:{self.normalizer(question)}"
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                del self._entries[key]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT response, created_at, deps FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._store(key, row[0], row[1], tuple(json.loads(row[2])) if row[2] else None)
+            return row[0]
+
+    def put(self, key, response, deps=None):
+        """Stores a response; deps are the intent tags it was generated from."""
+        now = time.time()
+        deps = tuple(deps) if deps is not None else None
+        with self._lock:
+            self._store(key, response, now, deps)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, created_at, deps) VALUES (?, ?, ?, ?)",
+                    (key, response, now, json.dumps(deps) if deps is not None else None),
+                )
+                self._db.commit()
+
+    def _store(self, key, response, created_at, deps):
+        # Caller holds self._lock.
+        self._entries[key] = (response, created_at, deps)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def lookup(self, question, kb_version):
+        """
+        get() by question that counts toward the hit/miss stats, for callers
+        that generate and put() the answer themselves.
+        """
+        cached = self.get(self.make_key(question, kb_version))
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return cached
+
+    def begin(self, question, kb_version):
+        """
+        Single-flight for callers that produce the response themselves, e.g.
+        by streaming it. Returns (response, None) on a hit, including after
+        waiting for an identical miss already in flight. On a miss returns
+        (None, finish): the caller must call finish(response, deps) once it
+        has the whole response, or finish(error=e) if it gives up, which
+        raises e in the waiting callers.
+        """
+        key = self.make_key(question, kb_version)
+        cached = self.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached, None
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, None
+
+        def finish(response=None, deps=None, error=None):
+            try:
+                if error is not None:
+                    flight.error = error
+                else:
+                    flight.result = response
+                    self.put(key, response, deps)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                flight.done.set()
+
+        return None, finish
+
+    def get_or_generate(self, question, kb_version, generate):
+        """
+        Returns (response, cached). On a miss `generate()` is called once,
+        even when several threads miss on the same key at the same time.
+        generate() returns the response text, or (response, deps).
+        """
+        response, finish = self.begin(question, kb_version)
+        if finish is None:
+            return response, True
+
+        try:
+            result = generate()
+        except BaseException as e:
+            finish(error=e)
+            raise
+        response, deps = result if isinstance(result, tuple) else (result, None)
+        finish(response, deps)
+        return response, False
+
+    def migrate(self, old_version, new_version, changed_tags):
+        """
+        Re-keys entries from old_version to new_version after a KB reload,
+        dropping only those that depended on a changed intent tag (or whose
+        dependencies are unknown). Returns (kept, dropped).
+        """
+        old_prefix, new_prefix = f"{old_version}:", f"{new_version}:"
+        changed_tags = set(changed_tags)
+        kept = dropped = 0
+
+        def still_valid(deps):
+            return deps is not None and not changed_tags.intersection(deps)
+
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(old_prefix)]:
+                response, created_at, deps = self._entries.pop(key)
+                if still_valid(deps):
+                    self._entries[new_prefix + key[len(old_prefix):]] = (response, created_at, deps)
+                    kept += 1
+                else:
+                    dropped += 1
+
+            if self._db is not None:
+                rows = self._db.execute(
+                    "SELECT key, deps FROM llm_cache WHERE substr(key, 1, ?) = ?",
+                    (len(old_prefix), old_prefix),
+                ).fetchall()
+                for key, deps in rows:
+                    if still_valid(json.loads(deps) if deps else None):
+                        self._db.execute(
+                            "UPDATE OR REPLACE llm_cache SET key = ? WHERE key = ?",
+                            (new_prefix + key[len(old_prefix):], key),
+                        )
+                    else:
+                        self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._db.commit()
+        return kept, dropped
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+            }
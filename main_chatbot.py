@@ -1,14 +1,42 @@
 from chatbot_core import Chatbot
-from voice_integration import listen_to_user, speak_response
+from voice_integration import listen_to_user, speak_response, play_audio_file, prefetch_phrases
 from multi_language import translate_text
-from eligibility_checker import check_admission_eligibility
+from eligibility_checker import check_admission_eligibility, categories
 from email_notifier import send_query_email # For query ticketing
+from intent_engine import IntentEngine
+from lang_id import LanguageIdentifier
+from response_bundle import load_bundle
+import os
+import random
 
 # --- Initialize Chatbot ---
 chatbot = Chatbot()
+# Same tiered resolver as the web app: substring index first, then the classifier
+engine = IntentEngine(chatbot.intents, classifier=chatbot, choose_response=random.choice)
+# Serving mode: with RESPONSE_BUNDLE set, KB answers come prebuilt (Tamil text + mp3)
+response_bundle = load_bundle(os.getenv("RESPONSE_BUNDLE")) if os.getenv("RESPONSE_BUNDLE") else None
+
+# Only ask for a category when the admission rules set category cut-offs
+CATEGORY_CHOICES = categories()
+CATEGORY_PROMPT = f"What is your category ({', '.join(CATEGORY_CHOICES)})?" if CATEGORY_CHOICES else None
+
+# Fixed prompts of the dialogue; synthesized once in the background at startup
+FIXED_PROMPTS = [
+    "I didn't catch that. Could you please repeat?",
+    "To check your eligibility, please tell me your 12th standard percentage?",
+    "Which course are you interested in (e.g., CSE, ECE)?",
+    "Do you have a JEE score or a State Entrance Exam rank? If so, please provide it. Otherwise, say 'no'.",
+    "We value your feedback! Please tell me your feedback message.",
+    "What is your name?",
+    "What is your email address (optional)?",
+    "I can help you raise a query ticket. What is your full name?",
+    "What is your email address?",
+    "Please describe your query in detail.",
+] + ([CATEGORY_PROMPT] if CATEGORY_PROMPT else [])
 
 # --- Main Interaction Loop ---
 def start_chatbot():
+    prefetch_phrases(FIXED_PROMPTS, lang='en')
     print("Welcome to Erode Sengunthar Engineering College Chatbot!")
     speak_response("Welcome to Erode Sengunthar Engineering College Chatbot! How can I help you today?")
 
@@ -31,10 +59,14 @@ def start_chatbot():
         
         # You'll need to implement actual language detection here for robust multi-language.
         # For now, let's just translate to English for intent recognition.
-        translated_input_for_nlp = translate_text(user_input, dest_lang='en', src_lang='auto')
+        if response_bundle is not None and LanguageIdentifier.script_language(user_input) is None:
+            translated_input_for_nlp = user_input  # Already English: no translation round-trip
+        else:
+            translated_input_for_nlp = translate_text(user_input, dest_lang='en', src_lang='auto')
         
         # --- Get Chatbot Response (English) ---
-        response_tag = chatbot.model.predict([" ".join(chatbot._preprocess_text(translated_input_for_nlp))])[0]
+        resolution = engine.resolve(translated_input_for_nlp)
+        response_tag = resolution.tag
         
         # Handle special intents (eligibility, feedback, ticketing)
         if response_tag == "admissions": # General admissions query
@@ -65,8 +97,10 @@ def start_chatbot():
                 except ValueError:
                     speak_response("Invalid score/rank. Proceeding without it.")
 
-            speak_response("What is your category (e.g., General, SC, ST, OBC)?")
-            category = listen_to_user()
+            category = None
+            if CATEGORY_PROMPT:
+                speak_response(CATEGORY_PROMPT)
+                category = listen_to_user()
 
             eligible, message = check_admission_eligibility(course, percentage, jee_score, state_exam_score, category)
             english_response = message # Get the eligibility message
@@ -100,13 +134,21 @@ def start_chatbot():
             speak_response("Please describe your query in detail.")
             query_description_ticket = listen_to_user()
 
-            if send_query_email(user_name_ticket, user_email_ticket, query_description_ticket, "your_college_staff_email@erode-sengunthar.ac.in"):
-                english_response = f"Your query has been submitted to our support team. They will contact you shortly at {user_email_ticket}"
+            ticket_id = send_query_email(user_name_ticket, user_email_ticket, query_description_ticket, "your_college_staff_email@erode-sengunthar.ac.in")
+            if ticket_id:
+                english_response = f"Your query has been submitted to our support team as ticket {ticket_id}. They will contact you shortly at {user_email_ticket}"
             else:
                 english_response = "I apologize, but I was unable to submit your query at this time. Please try again later or contact the college directly."
         else:
-            # For other intents, get the response directly from the chatbot core
-            english_response = chatbot.get_response(translated_input_for_nlp)
+            # For other intents, use the response the engine already resolved
+            english_response = resolution.response or "I'm not sure I understand. Could you please rephrase your question or ask something else?"
+            bundled = response_bundle.lookup(response_tag, resolution.response, 'ta') if response_bundle and resolution.tier else None
+            if bundled is not None and bundled.audio_path:
+                # Prebuilt KB answer: a pure lookup, no translation or synthesis
+                print(f"Bot (English): {english_response}")
+                print(f"Bot (Tamil): {bundled.text}")
+                play_audio_file(bundled.audio_path)
+                continue
 
         # --- Translate Response back to User's Language (if needed) ---
         # Here, we're simplifying: if user input was detected as Tamil, respond in Tamil.
@@ -0,0 +1,321 @@
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# Latency buckets (seconds): sub-ms lookups up to slow LLM / TTS calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; observe() is a bisect and three adds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (0.0 if empty)."""
+        counts, _, count = self.snapshot()
+        if not count:
+            return 0.0
+        rank, seen = q * count, 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class _Trace:
+    """Per-request state: labels decided along the way and time per stage."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.labels = {}
+        self.stages = []
+        self.started_at = time.perf_counter()
+
+
+class _Span:
+    __slots__ = ('metrics', 'stage', 'started_at')
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record_stage(self.stage, time.perf_counter() - self.started_at)
+        return False
+
+
+class _Request:
+    __slots__ = ('metrics', 'trace', 'detached')
+
+    def __init__(self, metrics, endpoint):
+        self.metrics = metrics
+        self.trace = _Trace(endpoint)
+        self.detached = False
+
+    def __enter__(self):
+        self.metrics._local.trace = self.trace
+        if self.metrics.profiler is not None:
+            self.metrics.profiler.begin()
+        return self.trace
+
+    def __exit__(self, *exc):
+        self.metrics._local.trace = None
+        if not self.detached:
+            self.metrics.finish_request(self.trace, time.perf_counter() - self.trace.started_at)
+        return False
+
+    def detach(self):
+        """Leaves finishing the request to Metrics.stream(), for responses that stream after the handler returns."""
+        self.detached = True
+        return self.trace
+
+
+class SamplingProfiler:
+    """
+    Opt-in wall-clock sampler for slow requests. While requests are in
+    flight, one thread snapshots their stacks every `interval` seconds; a
+    request that ends up slower than `threshold` has its samples written to
+    `directory` in folded format ("frame;frame;frame count"), which
+    flamegraph.pl and speedscope read directly. Nothing runs while no
+    request is active.
+    """
+
+    def __init__(self, directory='profiles', interval=0.005, threshold=1.0, max_depth=64):
+        self.directory = directory
+        self.interval = interval
+        self.threshold = threshold
+        self.max_depth = max_depth
+        self._active = {}  # thread id -> Counter of folded stacks
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.dumps = 0
+
+    def begin(self):
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def end(self, label, seconds):
+        """Stops sampling this thread; returns the dump's path if the request was slow."""
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if not samples or seconds < self.threshold:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{int(seconds * 1000)}ms.folded")
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{label};{stack} {count}\n")
+        self.dumps += 1
+        return path
+
+    def _fold(self, frame):
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != own:
+                        samples[self._fold(frame)] += 1
+
+
+class Metrics:
+    """
+    In-process request instrumentation, exported as Prometheus text.
+
+        with metrics.request('chat') as trace:
+            with metrics.span('lang_id'):
+                ...
+            trace.labels['path'] = 'kb'
+
+    A streamed response detaches its request and finishes it from the body:
+
+        timing = metrics.request('chat_stream')
+        with timing:
+            ...
+            body = metrics.stream(timing.detach(), events)
+        return Response(body)
+
+    Every span feeds `<namespace>_stage_seconds{stage}`; each request feeds
+    `<namespace>_request_seconds{endpoint, path}`. Spans may nest (the llm
+    stage runs inside resolve), so stage times are not additive. Cache
+    counters are pulled from the caches' own stats() at scrape time, so
+    they cost nothing per request.
+    """
+
+    def __init__(self, namespace='chatbot', buckets=DEFAULT_BUCKETS, slow_seconds=1.0, profiler=None):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.slow_seconds = slow_seconds
+        self.profiler = profiler
+        self._histograms = {}  # (name, sorted label items) -> Histogram
+        self._counters = Counter()  # (name, sorted label items) -> value
+        self._caches = {}  # cache name -> stats() callable returning hits/misses
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def request(self, endpoint):
+        return _Request(self, endpoint)
+
+    def span(self, stage):
+        return _Span(self, stage)
+
+    def stream(self, trace, chunks):
+        """
+        Yields a streamed response body as part of a detached request and
+        finishes the request once the body is done or the client went away,
+        so request_seconds covers the whole stream. Spans opened while the
+        body is produced land in the same trace.
+        """
+        self._local.trace = trace
+        try:
+            yield from chunks
+        finally:
+            self._local.trace = None
+            self.finish_request(trace, time.perf_counter() - trace.started_at)
+
+    def label(self, **labels):
+        """Sets labels (e.g. path) on the current request, if any."""
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.labels.update(labels)
+
+    def _histogram(self, name, labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, name, seconds, **labels):
+        self._histogram(name, labels).observe(seconds)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += amount
+
+    def expose_cache(self, cache, stats):
+        """Exports `stats()['hits']` / `['misses']` as cache_hits_total / cache_misses_total."""
+        self._caches[cache] = stats
+
+    def add_listener(self, callback):
+        """callback(trace, seconds) runs after every request (benchmarks, logging)."""
+        self._listeners.append(callback)
+
+    def record_stage(self, stage, seconds):
+        self.observe('stage_seconds', seconds, stage=stage)
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace.stages.append((stage, seconds))
+
+    def finish_request(self, trace, seconds):
+        self.observe('request_seconds', seconds, endpoint=trace.endpoint, path=trace.labels.get('path', 'none'))
+        for callback in self._listeners:
+            callback(trace, seconds)
+        dump = self.profiler.end(trace.endpoint, seconds) if self.profiler is not None else None
+        if seconds >= self.slow_seconds:
+            stages = ', '.join(f"{stage} {elapsed * 1000:.0f} ms" for stage, elapsed in trace.stages)
+            print(f"🐢 Slow /{trace.endpoint} ({seconds * 1000:.0f} ms, {trace.labels.get('path', 'none')}): {stages}"
+                  + (f" — stacks in {dump}" if dump else ""))
+
+    # --- export ---
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        by_name = {}
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = dict(self._counters)
+        for (name, labels), histogram in sorted(histograms, key=lambda item: item[0]):
+            by_name.setdefault(name, []).append((labels, histogram))
+
+        for name, series in by_name.items():
+            metric = f"{self.namespace}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for labels, histogram in series:
+                counts, total, count = histogram.snapshot()
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{metric}_sum{_labels(labels)} {total}")
+                lines.append(f"{metric}_count{_labels(labels)} {count}")
+
+        for cache, stats in sorted(self._caches.items()):
+            try:
+                report = stats()
+            except Exception:
+                continue
+            for kind in ('hits', 'misses'):
+                counters[(f'cache_{kind}_total', (('cache', cache),))] = report.get(kind, 0)
+
+        typed = set()
+        for (name, labels), value in sorted(counters.items()):
+            metric = f"{self.namespace}_{name}"
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(items):
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
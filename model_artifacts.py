@@ -0,0 +1,195 @@
+"""
+Versioned on-disk artifacts for the Chatbot intent classifier.
+
+Every artifact lives in its own directory named after a digest of its
+stamp (format version, classifier, knowledge base content hash, library
+versions). A changed knowledge_base.json or library upgrade therefore maps
+to a directory that does not exist yet, and the Chatbot retrains instead of
+serving stale intents.
+
+'linear' artifacts are plain .npy arrays (vocabulary, idf, weights, bias)
+loaded with mmap_mode='r', so worker processes share the same pages and
+inference needs only NumPy. 'svc' artifacts keep the pickled sklearn
+Pipeline, since Platt-scaled probabilities are not a linear product.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+from importlib import metadata
+
+
+FORMAT_VERSION = 1
+TRACKED_DISTRIBUTIONS = ('scikit-learn', 'numpy', 'nltk')
+
+
+def intents_hash(intents):
+    """SHA-256 of the intents' JSON, independent of key order and file formatting."""
+    return hashlib.sha256(
+        json.dumps(intents, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+
+
+def library_versions():
+    versions = {'python': '.'.join(map(str, sys.version_info[:3]))}
+    for name in TRACKED_DISTRIBUTIONS:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def make_stamp(intents, classifier):
+    return {
+        'format_version': FORMAT_VERSION,
+        'classifier': classifier,
+        'kb_hash': intents_hash(intents),
+        'libraries': library_versions(),
+    }
+
+
+def stamp_digest(stamp):
+    return hashlib.sha256(json.dumps(stamp, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def artifact_path(root, stamp):
+    return os.path.join(root, f"{stamp['classifier']}-{stamp_digest(stamp)}")
+
+
+class LinearTfidfModel:
+    """
+    TfidfVectorizer + linear classifier inference on raw NumPy arrays.
+
+    predict_proba() reproduces Pipeline.predict_proba for a default
+    TfidfVectorizer followed by LogisticRegression: raw term counts x idf,
+    L2-normalized, times the (features x classes) weights, plus bias, softmax.
+    """
+
+    TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")  # TfidfVectorizer default
+    ARRAYS = ('vocabulary', 'idf', 'weights', 'bias')
+
+    def __init__(self, vocabulary, idf, weights, bias, classes):
+        self.vocabulary = vocabulary    # sorted fixed-width unicode array
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+        self.classes_ = classes
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        import numpy as np
+
+        vectorizer, estimator = pipeline.steps[0][1], pipeline.steps[-1][1]
+        terms = sorted(vectorizer.vocabulary_)
+        order = np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int64)
+        return cls(
+            vocabulary=np.array(terms, dtype=str),
+            idf=vectorizer.idf_[order],
+            weights=np.ascontiguousarray(estimator.coef_.T[order]),
+            bias=estimator.intercept_.copy(),
+            classes=np.array(estimator.classes_),
+        )
+
+    def _csr(self, texts):
+        """TF-IDF matrix for a batch of texts in CSR form: (indptr, column ids, values)."""
+        import numpy as np
+
+        token_lists = [self.TOKEN_PATTERN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        vocabulary_size = len(self.vocabulary)
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        if not lengths.sum() or not vocabulary_size:
+            return indptr, np.empty(0, dtype=np.int64), np.empty(0)
+
+        tokens = np.array([token for tokens in token_lists for token in tokens])
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        positions = np.minimum(np.searchsorted(self.vocabulary, tokens), vocabulary_size - 1)
+        known = self.vocabulary[positions] == tokens
+        # Term counts per row: unique (row, column) keys, sorted row-major
+        keys, counts = np.unique(rows[known] * vocabulary_size + positions[known], return_counts=True)
+        rows, ids = np.divmod(keys, vocabulary_size)
+        values = counts * self.idf[ids]
+        values /= np.sqrt(np.bincount(rows, weights=values * values, minlength=len(texts)))[rows]
+        np.cumsum(np.bincount(rows, minlength=len(texts)), out=indptr[1:])
+        return indptr, ids, values
+
+    def predict_proba(self, texts):
+        import numpy as np
+
+        indptr, ids, values = self._csr(texts)
+        scores = np.tile(np.asarray(self.bias, dtype=np.float64), (len(texts), 1))
+        if len(ids):
+            # X @ weights for the whole batch: one gather, one segmented sum per row
+            nonempty = np.flatnonzero(np.diff(indptr))
+            scores[nonempty] += np.add.reduceat(values[:, None] * self.weights[ids], indptr[nonempty], axis=0)
+        if scores.shape[1] == 1:
+            # Binary logistic regression: sigmoid(s) == softmax([0, s])
+            scores = np.hstack([np.zeros_like(scores), scores])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def save(self, directory):
+        import numpy as np
+
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory, classes):
+        import numpy as np
+
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r') for name in cls.ARRAYS}
+        return cls(classes=np.array(classes), **arrays)
+
+
+def save_artifact(root, stamp, model):
+    """
+    Writes `model` (a LinearTfidfModel or a fitted sklearn Pipeline) under
+    its stamp directory. Written to a temp dir and renamed into place, so
+    readers never see a partial artifact.
+    """
+    os.makedirs(root, exist_ok=True)
+    target = artifact_path(root, stamp)
+    tmp_dir = tempfile.mkdtemp(dir=root, prefix='.tmp-')
+    try:
+        if isinstance(model, LinearTfidfModel):
+            model.save(tmp_dir)
+        else:
+            with open(os.path.join(tmp_dir, 'pipeline.pkl'), 'wb') as f:
+                pickle.dump(model, f)
+        manifest = dict(stamp, classes=[str(c) for c in model.classes_])
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        try:
+            os.rename(tmp_dir, target)
+        except OSError:
+            # Another worker published the same artifact first; keep theirs.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return target
+
+
+def load_artifact(root, stamp):
+    """Returns the model saved for exactly this stamp, or None."""
+    directory = artifact_path(root, stamp)
+    try:
+        with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if any(manifest.get(key) != value for key, value in stamp.items()):
+        return None
+
+    if os.path.exists(os.path.join(directory, 'pipeline.pkl')):
+        with open(os.path.join(directory, 'pipeline.pkl'), 'rb') as f:
+            return pickle.load(f)
+    return LinearTfidfModel.load(directory, manifest['classes'])
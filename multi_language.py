@@ -1,19 +1,245 @@
-from googletrans import Translator
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class GoogleTranslateBackend:
+    """googletrans with a single Translator (and its HTTP session) reused for every call."""
+
+    def __init__(self):
+        from googletrans import Translator
+        self.translator = Translator()
+
+    def translate_batch(self, texts, dest, src):
+        translations = self.translator.translate(list(texts), dest=dest, src=src)
+        return [t.text for t in translations]
+
+
+class TranslationService:
+    """
+    Memoized translation of (text, src, dest).
+
+    Translations live in a bounded in-memory LRU in front of an SQLite file,
+    so fixed strings (KB responses, prompts) are translated once and survive
+    restarts. The file is bounded too: rows older than ttl_seconds are
+    dropped and beyond max_rows the least recently used go first, since
+    free-text user messages would otherwise grow it forever. Misses in a
+    batch are de-duplicated and sent to the backend in one call. `backend`
+    is anything with translate_batch(texts, dest, src); pass
+    fake_backends.FakeTranslator to work offline.
+    """
+
+    def __init__(self, backend=None, db_path=None, max_entries=4096, max_rows=50000, ttl_seconds=30 * 24 * 3600):
+        self._backend = backend
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # (text, src, dest) -> (translation, created_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.evicted = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "text TEXT NOT NULL, src TEXT NOT NULL, dest TEXT NOT NULL, translation TEXT NOT NULL, "
+                "created_at REAL, used_at REAL, PRIMARY KEY (text, src, dest))"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(translations)")}
+            for column in ('created_at', 'used_at'):
+                if column not in columns:
+                    # Files from before eviction: their rows start their lifetime now
+                    self._db.execute(f"ALTER TABLE translations ADD COLUMN {column} REAL")
+                    self._db.execute(f"UPDATE translations SET {column} = ?", (time.time(),))
+            self._db.execute("CREATE INDEX IF NOT EXISTS translations_used_at ON translations (used_at)")
+            self._db.commit()
+            self._prune()
+
+    @property
+    def backend(self):
+        # Created on first use so importing this module never touches the network.
+        if self._backend is None:
+            self._backend = GoogleTranslateBackend()
+        return self._backend
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _lookup(self, key):
+        # Caller holds self._lock.
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._expired(entry[1], now):
+                self._entries.move_to_end(key)
+                return entry[0]
+            del self._entries[key]
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT translation, created_at FROM translations WHERE text = ? AND src = ? AND dest = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1], now):
+            self._db.execute("DELETE FROM translations WHERE text = ? AND src = ? AND dest = ?", key)
+            self._db.commit()
+            return None
+        self._db.execute("UPDATE translations SET used_at = ? WHERE text = ? AND src = ? AND dest = ?",
+                         (now,) + key)
+        self._db.commit()
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def _remember(self, key, translation, created_at):
+        # Caller holds self._lock.
+        self._entries[key] = (translation, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _prune(self):
+        """Drops expired rows, then the least recently used ones beyond max_rows."""
+        evicted = 0
+        if self.ttl_seconds is not None:
+            evicted += self._db.execute(
+                "DELETE FROM translations WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        if self.max_rows is not None:
+            excess = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_rows
+            if excess > 0:
+                evicted += self._db.execute(
+                    "DELETE FROM translations WHERE rowid IN "
+                    "(SELECT rowid FROM translations ORDER BY used_at LIMIT ?)", (excess,)
+                ).rowcount
+        if evicted:
+            self._db.commit()
+            self.evicted += evicted
+
+    def translate_batch(self, texts, dest='en', src='auto'):
+        """Translates a list of strings; on backend errors the originals come back (uncached)."""
+        texts = list(texts)
+        results = list(texts)
+        pending = OrderedDict()  # text -> positions still needing a translation
+        with self._lock:
+            for position, text in enumerate(texts):
+                if not text or not text.strip() or src == dest:
+                    continue
+                translation = self._lookup((text, src, dest))
+                if translation is not None:
+                    self.hits += 1
+                    results[position] = translation
+                else:
+                    self.misses += 1
+                    pending.setdefault(text, []).append(position)
+
+        if not pending:
+            return results
+        try:
+            translations = self.backend.translate_batch(list(pending), dest=dest, src=src)
+        except Exception as e:
+            print(f"Error during translation: {e}")
+            with self._lock:
+                self.errors += 1
+            return results
+
+        now = time.time()
+        with self._lock:
+            for (text, positions), translation in zip(pending.items(), translations):
+                self._remember((text, src, dest), translation, now)
+                for position in positions:
+                    results[position] = translation
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO translations (text, src, dest, translation, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(text, src, dest, translation, now, now) for text, translation in zip(pending, translations)],
+                )
+                self._db.commit()
+                self._prune()
+        return results
+
+    def translate(self, text, dest='en', src='auto'):
+        return self.translate_batch([text], dest=dest, src=src)[0]
+
+    def precompute(self, texts, langs=('ta', 'ml'), src='auto'):
+        """
+        Warms the cache with every text in every language; returns how many
+        were translated. src must match what callers pass (translate_text
+        defaults to 'auto') since it is part of the key.
+        """
+        texts = list(dict.fromkeys(texts))
+        before = self.misses
+        for lang in langs:
+            self.translate_batch(texts, dest=lang, src=src)
+        return self.misses - before
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'evicted': self.evicted,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+            }
+
+
+def kb_responses(knowledge_base_path='knowledge_base.json'):
+    """Every fixed response string in the knowledge base."""
+    with open(knowledge_base_path, 'r', encoding='utf-8') as f:
+        return [response for intent in json.load(f)['intents'] for response in intent['responses']]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_translation_service():
+    """
+    Process-wide TranslationService (TRANSLATION_CACHE_DB, default
+    translation_cache.sqlite3; TRANSLATION_CACHE_ROWS and
+    TRANSLATION_CACHE_TTL_DAYS bound the file).
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TranslationService(
+                db_path=os.getenv("TRANSLATION_CACHE_DB", "translation_cache.sqlite3"),
+                max_rows=int(os.getenv("TRANSLATION_CACHE_ROWS", "50000")),
+                ttl_seconds=int(float(os.getenv("TRANSLATION_CACHE_TTL_DAYS", "30")) * 24 * 3600),
+            )
+        return _service
 
 def translate_text(text, dest_lang='en', src_lang='auto'):
     """
     Translates text from source language to destination language.
     """
-    translator = Translator()
-    try:
-        translation = translator.translate(text, dest=dest_lang, src=src_lang)
-        return translation.text
-    except Exception as e:
-        print(f"Error during translation: {e}")
-        return text # Return original text on error
+    return get_translation_service().translate(text, dest=dest_lang, src=src_lang)
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-language chatbot demo and translation cache tools.")
+    parser.add_argument('--precompute', action='store_true',
+                        help='translate every KB response into --langs and exit')
+    parser.add_argument('--langs', nargs='+', default=['ta', 'ml'])
+    parser.add_argument('--knowledge-base', default='knowledge_base.json')
+    args = parser.parse_args()
+
+    if args.precompute:
+        service = get_translation_service()
+        translated = service.precompute(kb_responses(args.knowledge_base), langs=args.langs)
+        print(f"Translated {translated} new KB responses into {', '.join(args.langs)}; {service.stats()}")
+        return
 
-# Example Usage:
-if __name__ == "__main__":
     from chatbot_core import Chatbot
     from voice_integration import listen_to_user, speak_response
 
@@ -29,23 +255,26 @@ if __name__ == "__main__":
             # Detect language and translate to English for NLP
             translated_to_english = translate_text(user_spoken_input, dest_lang='en')
             print(f"Translated to English for NLP: {translated_to_english}")
-            
+
             # Get response from chatbot in English
             english_response = chatbot.get_response(translated_to_english)
-            
+
             # Translate response back to Tamil (or detected user language)
             # For simplicity, let's assume user wants response in Tamil if they spoke Tamil.
             # A more robust solution would store user's preferred language.
-            
+
             # Here we assume if the original input was likely Tamil, respond in Tamil.
             # This is a simplification; ideally, you'd detect the source language of `user_spoken_input`
             # and use that for `dest_lang` in `speak_response`.
             # For now, let's just translate the English response to Tamil for demonstration.
             tamil_response = translate_text(english_response, dest_lang='ta')
-            
+
             print(f"Bot (English): {english_response}")
             print(f"Bot (Tamil): {tamil_response}")
             speak_response(tamil_response, lang='ta') # Speak in Tamil
         else:
             speak_response("Please say something.")
 
+# Example Usage:
+if __name__ == "__main__":
+    main()
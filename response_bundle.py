@@ -0,0 +1,243 @@
+"""
+Precompiled multilingual response bundle for knowledge base intents.
+
+For every intent, response and language the bundle stores the (translated)
+text and a pre-rendered mp3, so serving a KB hit is a dictionary lookup:
+no translation, synthesis or language routing at request time.
+
+The index is a single compact JSON file:
+
+    {"format": 1, "languages": [...], "audio_dir": ..., "url_prefix": ...,
+     "intents": {tag: {"hash": ..., "responses": {lang: [[text, mp3], ...]}}}}
+
+Builds are incremental: an intent is re-translated and re-rendered only
+when its content hash (kb_reload.intent_hashes) changed, a language was
+added or one of its mp3s went missing.
+
+Usage: python response_bundle.py [--languages en ta ml] [--no-audio]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from kb_reload import intent_hashes
+
+
+FORMAT_VERSION = 1
+BUNDLE_PATH = 'response_bundle.json'
+AUDIO_DIR = os.path.join('static', 'bundle')
+URL_PREFIX = '/static/bundle'
+LANGUAGES = ('en', 'ta', 'ml')
+TTS_TLD = 'co.in'
+
+
+class BundleEntry:
+    """One response in one language."""
+
+    def __init__(self, text, audio_path=None, audio_url=None):
+        self.text = text
+        self.audio_path = audio_path
+        self.audio_url = audio_url
+
+    def __repr__(self):
+        return f"BundleEntry(text={self.text!r}, audio_path={self.audio_path!r})"
+
+
+class ResponseBundle:
+    """Read-only view of a built bundle; lookups never touch the network."""
+
+    def __init__(self, index):
+        self.index = index
+        self.languages = tuple(index['languages'])
+        self.audio_dir = index['audio_dir']
+        self.url_prefix = index['url_prefix']
+        # (tag, English response) -> position, since callers hold the chosen text
+        self._positions = {
+            (tag, text): position
+            for tag, intent in index['intents'].items()
+            for position, (text, _) in enumerate(intent['responses'].get('en', []))
+        }
+
+    @classmethod
+    def load(cls, path=BUNDLE_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('format') != FORMAT_VERSION:
+            raise ValueError(f"unsupported response bundle format {index.get('format')!r}")
+        return cls(index)
+
+    def lookup(self, tag, response, lang='en', intent_hash=None):
+        """
+        Returns the BundleEntry for a KB response in `lang`, or None when the
+        bundle doesn't have it. With intent_hash (e.g. from the live KB
+        snapshot) a bundle built from an older version of the intent misses
+        instead of serving stale text.
+        """
+        intent = self.index['intents'].get(tag)
+        position = self._positions.get((tag, response))
+        if intent is None or position is None:
+            return None
+        if intent_hash is not None and intent['hash'] != intent_hash:
+            return None
+        responses = intent['responses'].get(lang)
+        if not responses:
+            return None
+        text, audio = responses[position]
+        if audio is None:
+            return BundleEntry(text)
+        return BundleEntry(text, os.path.join(self.audio_dir, audio), f"{self.url_prefix}/{audio}")
+
+    def audio_files(self):
+        return {audio for intent in self.index['intents'].values()
+                for responses in intent['responses'].values()
+                for _, audio in responses if audio}
+
+    def stats(self):
+        return {
+            'intents': len(self.index['intents']),
+            'languages': list(self.languages),
+            'audio_files': len(self.audio_files()),
+        }
+
+
+def _load_index(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return index if index.get('format') == FORMAT_VERSION else None
+
+
+def _is_current(entry, content_hash, languages, audio_dir, with_audio):
+    if entry is None or entry['hash'] != content_hash:
+        return False
+    for lang in languages:
+        responses = entry['responses'].get(lang)
+        if responses is None:
+            return False
+        for _, audio in responses:
+            if with_audio and (audio is None or not os.path.exists(os.path.join(audio_dir, audio))):
+                return False
+    return True
+
+
+def build_bundle(knowledge_base_path='knowledge_base.json', bundle_path=BUNDLE_PATH, audio_dir=AUDIO_DIR,
+                 url_prefix=URL_PREFIX, languages=LANGUAGES, translator=None, audio_cache=None,
+                 with_audio=True):
+    """
+    Builds or updates the bundle. `translator` is a
+    multi_language.TranslationService (the process-wide one by default) and
+    `audio_cache` an AudioCache over `audio_dir`. Returns counters.
+    """
+    with open(knowledge_base_path, 'r', encoding='utf-8') as f:
+        intents = json.load(f)['intents']
+    hashes = intent_hashes(intents)
+    languages = list(dict.fromkeys(['en'] + list(languages)))
+
+    old = _load_index(bundle_path) or {'intents': {}}
+    if old.get('audio_dir') != audio_dir:
+        old = {'intents': {}}
+    if translator is None:
+        from multi_language import get_translation_service
+        translator = get_translation_service()
+    if with_audio and audio_cache is None:
+        from audio_cache import AudioCache
+        audio_cache = AudioCache(audio_dir, url_prefix=url_prefix)
+
+    built = {}
+    rebuilt = []
+    for intent in intents:
+        tag = intent['tag']
+        previous = old['intents'].get(tag)
+        if _is_current(previous, hashes[tag], languages, audio_dir, with_audio):
+            built[tag] = {'hash': hashes[tag], 'responses': {lang: previous['responses'][lang] for lang in languages}}
+            continue
+
+        responses = {}
+        for lang in languages:
+            if lang == 'en':
+                texts = list(intent['responses'])
+            else:
+                errors = translator.errors
+                texts = translator.translate_batch(intent['responses'], dest=lang, src='en')
+                if translator.errors != errors:
+                    raise RuntimeError(f"translation of intent {tag!r} into {lang!r} failed")
+            audio = [audio_cache.get_or_create(text, lang=lang, tld=TTS_TLD) if with_audio else None
+                     for text in texts]
+            responses[lang] = [[text, filename] for text, filename in zip(texts, audio)]
+        built[tag] = {'hash': hashes[tag], 'responses': responses}
+        rebuilt.append(tag)
+
+    index = {
+        'format': FORMAT_VERSION,
+        'languages': languages,
+        'audio_dir': audio_dir,
+        'url_prefix': url_prefix,
+        'intents': built,
+    }
+    _write_index(bundle_path, index)
+    removed = sorted(set(old['intents']) - set(built))
+    pruned = _prune_audio(audio_dir, ResponseBundle(index).audio_files()) if with_audio else 0
+    return {'intents': len(built), 'rebuilt': rebuilt, 'reused': len(built) - len(rebuilt),
+            'removed': removed, 'pruned_audio': pruned}
+
+
+def _write_index(path, index):
+    # Temp file + rename: a serving process never reads a half-written bundle.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _prune_audio(audio_dir, referenced):
+    """Deletes bundle mp3s that no intent references any more."""
+    pruned = 0
+    if not os.path.isdir(audio_dir):
+        return pruned
+    for name in os.listdir(audio_dir):
+        if name.endswith('.mp3') and name not in referenced:
+            os.remove(os.path.join(audio_dir, name))
+            pruned += 1
+    return pruned
+
+
+def load_bundle(path):
+    """The bundle at `path`, or None (with a message) if it is missing or unreadable."""
+    try:
+        bundle = ResponseBundle.load(path)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"🔴 Response bundle not loaded ({path}): {e}")
+        return None
+    print(f"✅ Response bundle loaded: {bundle.stats()}")
+    return bundle
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--knowledge-base', default='knowledge_base.json')
+    parser.add_argument('--output', default=BUNDLE_PATH)
+    parser.add_argument('--audio-dir', default=AUDIO_DIR)
+    parser.add_argument('--url-prefix', default=URL_PREFIX)
+    parser.add_argument('--languages', nargs='+', default=list(LANGUAGES))
+    parser.add_argument('--no-audio', action='store_true', help='store translated text only')
+    args = parser.parse_args()
+
+    result = build_bundle(args.knowledge_base, args.output, args.audio_dir, args.url_prefix,
+                          args.languages, with_audio=not args.no_audio)
+    print(f"Bundle {args.output}: {result['intents']} intents, {len(result['rebuilt'])} rebuilt, "
+          f"{result['reused']} reused, {len(result['removed'])} removed, {result['pruned_audio']} mp3s pruned.")
+    if result['rebuilt']:
+        print(f"Rebuilt: {', '.join(result['rebuilt'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ document.addEventListener("DOMContentLoaded", () => {
     const loadingOverlay = document.getElementById("loading-overlay");
 
     let currentLang = 'en-US'; // Default language
+    const USE_STREAMING = typeof ReadableStream !== "undefined" && typeof TextDecoder !== "undefined";
 
     function addMessage(message, sender, audioUrl = null) {
         const messageContainer = document.createElement("div");
@@ -26,21 +27,95 @@ document.addEventListener("DOMContentLoaded", () => {
         } else {
             messageDiv.classList.add("bg-violet-600", "text-white", "rounded-tl-none");
 
-            if (audioUrl) {
-                const speakerBtn = document.createElement("button");
-                speakerBtn.innerHTML = "🔊";
-                speakerBtn.className = "ml-2 text-white hover:text-yellow-300";
-                speakerBtn.onclick = () => {
-                    const audio = new Audio(audioUrl);
-                    audio.play();
-                };
-                messageDiv.appendChild(speakerBtn);
-            }
+            if (audioUrl) addSpeakerButton(messageDiv, audioUrl);
         }
 
         messageContainer.appendChild(messageDiv);
         chatWindow.appendChild(messageContainer);
         chatWindow.scrollTop = chatWindow.scrollHeight;
+        return messageDiv;
+    }
+
+    function addSpeakerButton(messageDiv, audioUrl) {
+        const speakerBtn = document.createElement("button");
+        speakerBtn.innerHTML = "🔊";
+        speakerBtn.className = "ml-2 text-white hover:text-yellow-300";
+        speakerBtn.onclick = () => {
+            const audio = new Audio(audioUrl);
+            audio.play();
+        };
+        messageDiv.appendChild(speakerBtn);
+    }
+
+    // Long-polls /audio/<job_id> until the server has synthesized the audio.
+    async function waitForAudio(statusUrl, attempts = 5) {
+        for (let i = 0; i < attempts; i++) {
+            try {
+                const response = await fetch(`${statusUrl}?wait=10`);
+                if (!response.ok) return null;
+                const data = await response.json();
+                if (data.status === "ready" && data.audio_url) return data.audio_url;
+                if (data.status !== "pending") return null;
+            } catch (error) {
+                console.error("Error polling audio status:", error);
+                return null;
+            }
+        }
+        return null;
+    }
+
+    async function attachAudioWhenReady(messageDiv, statusUrl) {
+        const audioUrl = await waitForAudio(statusUrl);
+        if (audioUrl) addSpeakerButton(messageDiv, audioUrl);
+    }
+
+    // Streamed replies get one clip per sentence; the speaker button plays them in order.
+    function addPlaylistButton(messageDiv, audioUrls) {
+        const speakerBtn = document.createElement("button");
+        speakerBtn.innerHTML = "🔊";
+        speakerBtn.className = "ml-2 text-white hover:text-yellow-300";
+        speakerBtn.onclick = async () => {
+            for (const url of audioUrls.filter(Boolean)) {
+                await new Promise(resolve => {
+                    const audio = new Audio(url);
+                    audio.onended = resolve;
+                    audio.onerror = resolve;
+                    audio.play().catch(resolve);
+                });
+            }
+        };
+        messageDiv.appendChild(speakerBtn);
+    }
+
+    // Reads a text/event-stream response body and calls onEvent(name, data) per event.
+    async function readServerSentEvents(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let name = "message";
+                let data = "";
+                rawEvent.split("\n").forEach(line => {
+                    if (line.startsWith("event:")) name = line.slice(6).trim();
+                    else if (line.startsWith("data:")) data += line.slice(5).trim();
+                });
+                if (data) onEvent(name, JSON.parse(data));
+            }
+        }
+    }
+
+    function addBotReply(data) {
+        const messageDiv = addMessage(data.response, "bot", data.audio_url || null);
+        if (!data.audio_url && data.audio_status_url) {
+            attachAudioWhenReady(messageDiv, data.audio_status_url);
+        }
     }
 
     function addImageMessage(url) {
@@ -84,10 +159,15 @@ document.addEventListener("DOMContentLoaded", () => {
         loadingOverlay.classList.remove("hidden");
 
         try {
+            if (USE_STREAMING) {
+                await streamMessage(message);
+                return;
+            }
+
             const response = await fetch('/chat', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ message, lang: currentLang })
+                body: JSON.stringify({ message, lang: currentLang, async_audio: true })
             });
 
             if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
@@ -97,7 +177,7 @@ document.addEventListener("DOMContentLoaded", () => {
             typingIndicator.classList.add("hidden");
             loadingOverlay.classList.add("hidden");
 
-            addMessage(data.response, "bot", data.audio_url || null);
+            addBotReply(data);
 
             if (data.image_url) addImageMessage(data.image_url);
             if (data.suggestions?.length) displaySuggestionChips(data.suggestions);
@@ -110,6 +190,59 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
 
+    // Renders /chat/stream tokens as they arrive instead of waiting for the whole answer.
+    async function streamMessage(message) {
+        const startedAt = performance.now();
+        const response = await fetch('/chat/stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ message, lang: currentLang })
+        });
+
+        if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+
+        let messageDiv = null;
+        let textNode = null;
+        let speakerAdded = false;
+        const audioUrls = [];
+
+        function ensureBotMessage() {
+            if (messageDiv) return;
+            typingIndicator.classList.add("hidden");
+            loadingOverlay.classList.add("hidden");
+            console.debug(`Time to first token: ${Math.round(performance.now() - startedAt)} ms`);
+            messageDiv = addMessage("", "bot");
+            textNode = messageDiv.appendChild(document.createTextNode(""));
+        }
+
+        await readServerSentEvents(response, (event, data) => {
+            if (event === "token") {
+                ensureBotMessage();
+                textNode.data += data.text;
+                chatWindow.scrollTop = chatWindow.scrollHeight;
+            } else if (event === "audio") {
+                ensureBotMessage();
+                waitForAudio(data.audio_status_url).then(audioUrl => {
+                    audioUrls[data.index] = audioUrl;
+                    if (audioUrl && !speakerAdded) {
+                        speakerAdded = true;
+                        addPlaylistButton(messageDiv, audioUrls);
+                    }
+                });
+            } else if (event === "done") {
+                ensureBotMessage();
+                if (data.audio_url && !speakerAdded) {
+                    speakerAdded = true;
+                    addSpeakerButton(messageDiv, data.audio_url);
+                }
+                if (data.image_url) addImageMessage(data.image_url);
+                if (data.suggestions?.length) displaySuggestionChips(data.suggestions);
+            } else if (event === "error") {
+                throw new Error(data.message);
+            }
+        });
+    }
+
     // Speech recognition
     const recognition = new (window.SpeechRecognition || window.webkitSpeechRecognition)();
     recognition.lang = currentLang;
@@ -144,14 +277,14 @@ document.addEventListener("DOMContentLoaded", () => {
             const response = await fetch('/chat', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ message: 'Initial greeting', lang: currentLang })
+                body: JSON.stringify({ message: 'Initial greeting', lang: currentLang, async_audio: true })
             });
             const data = await response.json();
 
             typingIndicator.classList.add("hidden");
             loadingOverlay.classList.add("hidden");
 
-            addMessage(data.response, "bot", data.audio_url || null);
+            addBotReply(data);
             if (data.suggestions?.length) displaySuggestionChips(data.suggestions);
 
         } catch (error) {
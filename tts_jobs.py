@@ -0,0 +1,95 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}_[a-z]{2,3}$')
+
+
+class TTSJobQueue:
+    """
+    Background TTS synthesis on a bounded thread pool.
+
+    Job ids are the content-addressed audio filename (without '.mp3'), so
+    identical requests that arrive together share one synthesis job, and a
+    job id stays resolvable after the worker that created it restarts.
+    """
+
+    def __init__(self, audio_cache, max_workers=4, max_pending=64, max_failures=256):
+        self.audio_cache = audio_cache
+        self.max_pending = max_pending
+        self.max_failures = max_failures
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts')
+        self._jobs = {}
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path_for(self, job_id):
+        return os.path.join(self.audio_cache.directory, f'{job_id}.mp3')
+
+    def submit(self, text, lang='en', tld='co.in', slow=False, on_done=None):
+        """
+        Schedules synthesis and returns the job id immediately, or None when
+        the queue is full (the caller then answers without audio).
+        on_done(error) runs on the worker once a synthesis started by this
+        call finishes (error is None on success); it is not called when the
+        audio already exists or an identical job is already queued.
+        """
+        job_id = self.audio_cache.filename_for(text, lang, tld, slow)[:-len('.mp3')]
+        if os.path.exists(self._path_for(job_id)):
+            # Already on disk: go through the cache so hit counters and the
+            # audio store's access tracking stay accurate.
+            self.audio_cache.get_or_create(text, lang, tld, slow)
+            return job_id
+
+        with self._lock:
+            if job_id in self._jobs:
+                return job_id
+            if len(self._jobs) >= self.max_pending:
+                return None
+            self._failures.pop(job_id, None)
+            future = self._executor.submit(self.audio_cache.get_or_create, text, lang, tld, slow)
+            self._jobs[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._finish(job_id, f, on_done))
+        return job_id
+
+    def _finish(self, job_id, future, on_done=None):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            error = future.exception()
+            if error is not None:
+                print(f"🔴 TTS job {job_id} failed: {error}")
+                self._failures[job_id] = str(error)
+                while len(self._failures) > self.max_failures:
+                    self._failures.popitem(last=False)
+        if on_done is not None:
+            on_done(error)
+
+    def status(self, job_id, wait=0):
+        """
+        Returns {'status': 'ready'|'pending'|'failed'|'unknown', 'audio_url': ...},
+        optionally blocking up to `wait` seconds for a pending job.
+        """
+        with self._lock:
+            future = self._jobs.get(job_id)
+        if future is not None and wait > 0:
+            try:
+                future.result(timeout=wait)
+            except FutureTimeoutError:
+                pass
+            except Exception:
+                pass
+
+        if os.path.exists(self._path_for(job_id)):
+            return {'status': 'ready', 'audio_url': self.audio_cache.url_for(f'{job_id}.mp3')}
+        with self._lock:
+            if job_id in self._jobs:
+                return {'status': 'pending', 'audio_url': None}
+            if job_id in self._failures:
+                return {'status': 'failed', 'audio_url': None, 'error': self._failures[job_id]}
+        return {'status': 'unknown', 'audio_url': None}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
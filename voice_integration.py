@@ -1,10 +1,7 @@
-import speech_recognition as sr
-from gtts import gTTS
 import os
-import pygame  # For playing audio
-
-# Initialize pygame mixer for audio playback
-pygame.mixer.init()
+import threading
+from audio_capture import CaptureSession, microphone_source, wav_source
+from audio_playback import AudioPlayer, NullSink, PygameSink
 
 # Default language for the bot
 current_language = 'en'  # Options: 'en' (English), 'ta' (Tamil), 'ml' (Malayalam)
@@ -22,6 +19,15 @@ TTS_CODES = {
     'ml': 'ml'
 }
 
+# Speech plays on a background thread from in-memory mp3s; VOICE_AUDIO_SINK=null
+# discards audio (tests, headless machines).
+player = AudioPlayer(sink=NullSink() if os.getenv("VOICE_AUDIO_SINK") == "null" else PygameSink())
+
+# Seconds to wait for the user to finish an utterance
+LISTEN_TIMEOUT = 20
+capture_session = None
+_capture_lock = threading.Lock()
+
 def set_language(lang_code):
     """Set the bot's current language (en, ta, ml)."""
     global current_language
@@ -31,50 +37,64 @@ def set_language(lang_code):
     else:
         print(f"Unsupported language: {lang_code}")
 
-def listen_to_user():
+def get_capture_session():
+    """
+    The shared CaptureSession, started on first use: the microphone is opened
+    and calibrated once per process instead of once per question.
+    VOICE_AUDIO_SOURCE=<file.wav> listens to a recording instead.
+    """
+    global capture_session
+    with _capture_lock:
+        if capture_session is None:
+            wav_path = os.getenv("VOICE_AUDIO_SOURCE")
+            capture_session = CaptureSession(wav_source(wav_path) if wav_path else microphone_source).start()
+        return capture_session
+
+def listen_to_user(timeout=LISTEN_TIMEOUT):
     """
-    Listens to user's speech input from the microphone and converts it to text.
-    Uses Google Speech Recognition API (requires internet connection).
+    Returns the text of the user's next utterance (Google Speech Recognition,
+    requires internet connection), or "" if nothing intelligible was said.
+
+    There is no barge-in: speech that started while the bot was still
+    talking is discarded. Without echo cancellation the microphone also
+    picks up the bot's own voice from the speakers, which the energy VAD
+    can't tell apart from the user, so acting on it would make the bot cut
+    itself off. Users wait for the prompt to finish before answering.
     """
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        print(f"Listening... (Language: {current_language})")
-        recognizer.adjust_for_ambient_noise(source, duration=1)
-        try:
-            audio = recognizer.listen(source, timeout=5)
-            print("Processing audio...")
-            text = recognizer.recognize_google(audio, language=LANGUAGE_CODES[current_language])
-            print(f"You said: {text}")
-            return text
-        except sr.UnknownValueError:
-            print("Sorry, I could not understand audio.")
-            return ""
-        except sr.RequestError as e:
-            print(f"Could not request results from Google Speech Recognition service; {e}")
-            return ""
-        except sr.WaitTimeoutError:
-            print("No speech detected within the timeout period.")
-            return ""
-
-def speak_response(text):
+    session = get_capture_session()
+    print(f"Listening... (Language: {current_language})")
+    text = session.listen(language=LANGUAGE_CODES[current_language], timeout=timeout,
+                          since=player.last_finished_at)
+    if text:
+        print(f"You said: {text}")
+    return text
+
+def speak_response(text, lang=None, block=True):
     """
-    Converts text to speech and plays it.
-    Uses Google Text-to-Speech (gTTS).
+    Converts text to speech (gTTS, cached per phrase) and plays it.
+    lang defaults to the current language. With block=False it returns as
+    soon as the phrase is queued; stop_speaking() cancels it.
     """
-    try:
-        tts = gTTS(text=text, lang=TTS_CODES[current_language], slow=False)
-        audio_file = "temp_response.mp3"
-        tts.save(audio_file)
-        
-        pygame.mixer.music.load(audio_file)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        
-        pygame.mixer.music.unload()
-        os.remove(audio_file)
-    except Exception as e:
-        print(f"Error in text-to-speech: {e}")
+    lang = lang or current_language
+    return player.speak(text, lang=TTS_CODES.get(lang, lang), block=block)
+
+def play_audio_file(path, block=True):
+    """
+    Plays an existing mp3 (e.g. a pre-rendered response bundle file).
+    """
+    return player.play_file(path, block=block)
+
+def stop_speaking():
+    """
+    Stops the current phrase and drops anything queued (e.g. on quit).
+    Nothing calls this on user speech; see listen_to_user() for why.
+    """
+    player.cancel()
+
+def prefetch_phrases(texts, lang=None):
+    """Synthesizes fixed prompts in the background so they play without a gTTS round-trip."""
+    lang = lang or current_language
+    return player.prefetch(texts, lang=TTS_CODES.get(lang, lang))
 
 # Example usage
 if __name__ == "__main__":